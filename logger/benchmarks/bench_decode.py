@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Compare the decode cost per telegram of the dict lookup and the compiled table.
+
+Run with `python -m benchmarks.bench_decode`.
+"""
+
+import datetime as dt
+import logging
+import random
+import timeit
+from enum import Enum
+from typing import Any
+
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import GroupAddress
+
+from logger import orm
+from logger.dtype_matcher import DTYPE2XKNX
+from logger.mapping import compile_mapping
+from logger.util import is_binary, xknx2name
+
+# Typical mix of a home installation: dtype, raw payload
+TRAFFIC = (
+    ("DPST-1-1", DPTBinary(1)),
+    ("DPST-5-1", DPTArray((0x80,))),
+    ("DPST-9-1", DPTArray((0x0C, 0x1A))),
+    ("DPST-9-4", DPTArray((0x2C, 0x8A))),
+    ("DPST-14-56", DPTArray((0x42, 0x28, 0x00, 0x00))),
+)
+GA_COUNT = 500
+TELEGRAMS = 10_000
+
+
+def legacy_decode(mapping: dict, dst: GroupAddress, value_raw: Any) -> tuple:
+    """Decode like the receive callback did before the table was compiled."""
+    meta = mapping[str(dst)]
+    name = meta["name"]
+    dtype = meta["dtype"]
+    xknx_class: Any = DTYPE2XKNX[dtype]
+    value: Any
+    if is_binary(xknx_class):
+        value = int(value_raw)
+    else:
+        value = xknx_class.from_knx(DPTArray(value_raw))
+    if dtype == "DPST-10-1":
+        value = dt.time(hour=value_raw[0] & 0b11111, minute=value_raw[1], second=value_raw[2])
+    elif isinstance(value, Enum):
+        value = value._value_
+    unit = getattr(xknx_class, "unit", None) or ""
+    orm_class = getattr(orm, xknx2name(xknx_class))
+    return orm_class, name, value, unit
+
+
+def main() -> int:
+    """Run the benchmark and print the cost per telegram."""
+    rng = random.Random(0)
+    mapping = {}
+    payloads = {}
+    for idx in range(GA_COUNT):
+        dtype, payload = TRAFFIC[idx % len(TRAFFIC)]
+        address = GroupAddress(idx + 1)
+        mapping[str(address)] = {"dtype": dtype, "name": f"Signal {idx}"}
+        payloads[address] = payload.value
+    telegrams = [rng.choice(list(payloads.items())) for _ in range(TELEGRAMS)]
+    table = compile_mapping(mapping)
+
+    def run_legacy() -> None:
+        for dst, value_raw in telegrams:
+            legacy_decode(mapping, dst, value_raw)
+
+    def run_table() -> None:
+        for dst, value_raw in telegrams:
+            entry = table[dst.raw]
+            entry.decode(value_raw)  # type: ignore [union-attr]
+
+    for name, func in (("dict lookup", run_legacy), ("compiled table", run_table)):
+        best = min(timeit.repeat(func, number=1, repeat=5))
+        logging.info("%-15s %6.2f us/telegram", name, best / TELEGRAMS * 1e6)
+
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""End to end ingest: synthetic telegrams through `get_rx_cb` into sqlite.
+
+Each scenario (in-memory or file database, committing every telegram or
+batched by the `BatchWriter`) runs in a fresh process and reports
+telegrams/s, the p50 and p99 latency of the receive callback and the peak
+RSS. The results are stored as json, pass the json of an earlier run to
+compare:
+
+    python -m benchmarks.bench_ingest --output new.json --compare old.json
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import logging
+import platform
+import resource
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from benchmarks.generator import TrafficGenerator
+from logger.mapping import compile_mapping
+from logger.runner import get_rx_cb
+from logger.util import session_scope
+from logger.writer import BatchWriter
+
+TARGETS = ("memory", "file")
+MODES = ("commit", "batch")
+TELEGRAMS = {"commit": 2_000, "batch": 20_000}
+GA_COUNT = 500
+
+
+def get_addr(target: str, directory: Path) -> str:
+    """Get the database address of a target."""
+    if target == "memory":
+        return "sqlite://"
+    path = directory / "bench_ingest.db"
+    path.unlink(missing_ok=True)
+    return f"sqlite:///{path}"
+
+
+async def ingest(addr: str, mode: str, telegrams: int, seed: int) -> dict[str, Any]:
+    """Feed the telegrams to the receive callback and measure."""
+    generator = TrafficGenerator(GA_COUNT, seed)
+    ga_table = compile_mapping(generator.mapping)
+    traffic = list(generator.telegrams(telegrams))
+    latencies = []
+
+    with session_scope(addr) as session:
+        writer = BatchWriter(session) if mode == "batch" else None
+        if writer is not None:
+            writer.start()
+        rx_cb = await get_rx_cb(ga_table, session, None, writer)
+        start = time.perf_counter()
+        for telegram in traffic:
+            before = time.perf_counter_ns()
+            await rx_cb(telegram)
+            latencies.append(time.perf_counter_ns() - before)
+            # Let the flusher run, like the gaps between telegrams on the bus do
+            await asyncio.sleep(0)
+        if writer is not None:
+            await writer.close()
+        duration = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "telegrams": telegrams,
+        "telegrams_per_s": telegrams / duration,
+        "p50_us": quantiles[49] / 1000,
+        "p99_us": quantiles[98] / 1000,
+        # Kilobytes on linux
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_scenario(target: str, mode: str, directory: Path, seed: int) -> dict[str, Any]:
+    """Run a scenario, in a process of its own for a clean peak RSS."""
+    logging.getLogger().setLevel(logging.WARNING)
+    result = asyncio.run(ingest(get_addr(target, directory), mode, TELEGRAMS[mode], seed))
+    return {"target": target, "mode": mode, **result}
+
+
+def compare(results: list[dict[str, Any]], previous: dict[str, Any]) -> None:
+    """Log the change of each scenario to a previous run."""
+    before = {(result["target"], result["mode"]): result for result in previous["results"]}
+    for result in results:
+        old = before.get((result["target"], result["mode"]))
+        if old is None:
+            continue
+        logging.info(
+            "%-6s %-6s %+7.1f%% telegrams/s %+7.1f%% p99",
+            result["target"],
+            result["mode"],
+            100 * (result["telegrams_per_s"] / old["telegrams_per_s"] - 1),
+            100 * (result["p99_us"] / old["p99_us"] - 1),
+        )
+
+
+def main() -> int:
+    """Run all scenarios and store the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=Path("bench_ingest.json"), help="json file of the results")
+    parser.add_argument("--compare", type=Path, help="json file of an earlier run")
+    parser.add_argument("--directory", type=Path, help="directory of the file database, e.g. on the SD card, defaults to a temporary one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = args.directory or Path(tmp_dir)
+        for target in TARGETS:
+            for mode in MODES:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    result = pool.submit(run_scenario, target, mode, directory, args.seed).result()
+                logging.info(
+                    "%-6s %-6s %9.0f telegrams/s  p50 %7.1fus  p99 %7.1fus  peak rss %6.1f MiB",
+                    target,
+                    mode,
+                    result["telegrams_per_s"],
+                    result["p50_us"],
+                    result["p99_us"],
+                    result["peak_rss_kib"] / 1024,
+                )
+                results.append(result)
+
+    run = {
+        "time": dt.datetime.now(dt.UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlalchemy": version("sqlalchemy"),
+        "xknx": version("xknx"),
+        "ga_count": GA_COUNT,
+        "seed": args.seed,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(run, indent=2), encoding="utf-8")
+    logging.info("Stored the results in %s.", args.output)
+
+    if args.compare is not None:
+        compare(results, json.loads(args.compare.read_text(encoding="utf-8")))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
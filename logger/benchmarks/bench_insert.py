@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Compare rows/s of ORM instances and Core executemany inserts.
+
+Run with `python -m benchmarks.bench_insert [sqlite address]`.
+"""
+
+import logging
+import random
+import sys
+import time
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+from logger.mapping import GroupAddressEntry, compile_mapping
+from logger.util import session_scope, utcnow
+from logger.writer import Row, insert_rows
+
+MAPPING = {
+    "0/0/1": {"dtype": "DPST-1-1", "name": "Switch"},
+    "0/0/2": {"dtype": "DPST-5-1", "name": "Dimmer"},
+    "0/0/3": {"dtype": "DPST-9-1", "name": "Temperature"},
+    "0/0/4": {"dtype": "DPST-9-4", "name": "Brightness"},
+    "0/0/5": {"dtype": "DPST-14-56", "name": "Power"},
+}
+VALUES = {"DPST-1-1": 1, "DPST-5-1": 50, "DPST-9-1": 21.5, "DPST-9-4": 1234.5, "DPST-14-56": 42.0}
+BATCH_SIZE = 500
+BATCHES = 40
+
+
+def get_batches() -> list[list[tuple[GroupAddressEntry, Row]]]:
+    """Get batches of rows spread over the mapped gas."""
+    rng = random.Random(0)
+    entries = [entry for entry in compile_mapping(MAPPING) if entry is not None]
+    batches = []
+    for _ in range(BATCHES):
+        batch = []
+        for _ in range(BATCH_SIZE):
+            entry = rng.choice(entries)
+            values = {"time": utcnow(), "src": "1.1.1", "dst": entry.address, "name": entry.name, "value": VALUES[entry.dtype]}
+            batch.append((entry, (entry.table, values)))
+        batches.append(batch)
+    return batches
+
+
+def flush_orm(session: Session, batch: list[tuple[GroupAddressEntry, Row]]) -> None:
+    """Insert one ORM instance per row."""
+    session.add_all([entry.orm_class(**values) for entry, (_, values) in batch])
+    session.commit()
+
+
+def flush_core(session: Session, batch: list[tuple[GroupAddressEntry, Row]]) -> None:
+    """Insert with one executemany per table."""
+    insert_rows(session, [row for _, row in batch])
+    session.commit()
+
+
+def measure(addr: str, flush: Callable) -> float:
+    """Get rows/s of a flush function."""
+    batches = get_batches()
+    with session_scope(addr) as session:
+        start = time.perf_counter()
+        for batch in batches:
+            flush(session, batch)
+        duration = time.perf_counter() - start
+    return BATCH_SIZE * BATCHES / duration
+
+
+def main() -> int:
+    """Run the benchmark and print rows/s for both paths."""
+    addr = sys.argv[1] if len(sys.argv) > 1 else "sqlite://"
+    for name, flush in (("orm", flush_orm), ("core", flush_core)):
+        logging.info("%-5s %9.0f rows/s", name, measure(addr, flush))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
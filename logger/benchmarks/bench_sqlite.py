@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare inserts/s of sqlite with and without the profile of `logger.util`.
+
+Run with `python -m benchmarks.bench_sqlite [directory]`, the databases are
+created in the directory (defaults to a temporary one), e.g. on the SD card.
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_insert import MAPPING, VALUES
+from logger.mapping import compile_mapping
+from logger.util import session_scope, utcnow
+from logger.writer import Row, insert_rows
+
+ROWS = 2_000
+BATCH_SIZES = (1, 500)
+
+
+def get_rows() -> list[Row]:
+    """Get rows spread over the mapped gas."""
+    entries = [entry for entry in compile_mapping(MAPPING) if entry is not None]
+    rows = []
+    for idx in range(ROWS):
+        entry = entries[idx % len(entries)]
+        values = {**entry.columns, "time": utcnow(), "src": "1.1.1", entry.value_column: VALUES[entry.dtype]}
+        rows.append((entry.table, values))
+    return rows
+
+
+def measure(db_path: Path, batch_size: int, *, sqlite_profile: bool) -> float:
+    """Get inserts/s committing every `batch_size` rows."""
+    rows = get_rows()
+    db_path.unlink(missing_ok=True)
+    with session_scope(f"sqlite:///{db_path}", sqlite_profile=sqlite_profile) as session:
+        start = time.perf_counter()
+        for idx in range(0, len(rows), batch_size):
+            insert_rows(session, rows[idx : idx + batch_size])
+            session.commit()
+        duration = time.perf_counter() - start
+    return len(rows) / duration
+
+
+def main() -> int:
+    """Run the benchmark and print inserts/s per batch size."""
+    with tempfile.TemporaryDirectory(dir=sys.argv[1] if len(sys.argv) > 1 else None) as directory:
+        db_path = Path(directory) / "bench.db"
+        for batch_size in BATCH_SIZES:
+            for sqlite_profile in (False, True):
+                name = "profile" if sqlite_profile else "default"
+                logging.info("%-7s batch %4i %9.0f inserts/s", name, batch_size, measure(db_path, batch_size, sqlite_profile=sqlite_profile))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Synthetic telegram traffic across the dtypes of `DTYPE2XKNX`.
+
+The mix is weighted by the main number of the dtype like the traffic of a
+home installation: mostly switches, sensors and dimmers, a bit of everything
+else. Payloads are random raw values the decoders of `logger.mapping` take.
+"""
+
+import random
+from collections.abc import Iterator
+from typing import Any
+
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram
+from xknx.telegram.apci import GroupValueWrite
+
+from logger.dtype_matcher import DTYPE2XKNX
+from logger.mapping import get_decoder
+from logger.util import is_binary
+
+# Share of the traffic per main number, the dtypes of the rest share `OTHER_WEIGHT`
+MAIN_WEIGHTS = {
+    "1": 30.0,  # Switches, contacts
+    "9": 25.0,  # Temperature, brightness, humidity
+    "5": 15.0,  # Dimmers, blinds
+    "14": 8.0,  # Power, energy
+    "13": 5.0,  # Meters
+    "7": 3.0,  # Counters
+    "12": 2.0,  # Counters
+}
+OTHER_WEIGHT = 12.0
+
+# Random payloads tried per dtype, dtypes without a decodable one are skipped
+PAYLOAD_TRIES = 64
+PAYLOADS = 8
+
+
+def main_number(dtype: str) -> str:
+    """Get the main number of a dtype, e.g. `9` for `DPST-9-1`."""
+    return dtype.split("-")[1]
+
+
+def get_weights() -> dict[str, float]:
+    """Get the share of the traffic of each dtype."""
+    counts: dict[str, int] = {}
+    for dtype in DTYPE2XKNX:
+        counts[main_number(dtype)] = counts.get(main_number(dtype), 0) + 1
+    others = sum(count for main, count in counts.items() if main not in MAIN_WEIGHTS)
+    return {dtype: MAIN_WEIGHTS[main_number(dtype)] / counts[main_number(dtype)] if main_number(dtype) in MAIN_WEIGHTS else OTHER_WEIGHT / others for dtype in DTYPE2XKNX}
+
+
+def random_payloads(dtype: str, rng: random.Random) -> list[DPTBinary | DPTArray]:
+    """Get random payloads of a dtype which decode, empty if none is found."""
+    xknx_class: Any = DTYPE2XKNX[dtype]
+    decode = get_decoder(dtype)
+    payloads: list[DPTBinary | DPTArray] = []
+    for _ in range(PAYLOAD_TRIES):
+        payload: DPTBinary | DPTArray
+        if is_binary(xknx_class):
+            payload = DPTBinary(rng.randint(0, 1 if main_number(dtype) == "1" else 15))
+        else:
+            payload = DPTArray(tuple(rng.randrange(256) for _ in range(xknx_class.payload_length)))
+        try:
+            decode(payload.value)
+        except Exception:  # noqa: S112
+            continue
+        payloads.append(payload)
+        if len(payloads) >= PAYLOADS:
+            break
+    return payloads
+
+
+class TrafficGenerator:
+    """Generate a mapping and telegrams sent to it."""
+
+    def __init__(self, ga_count: int = 500, seed: int = 0) -> None:
+        """Draw the dtypes of `ga_count` group addresses, reproducible by the seed."""
+        self.rng = random.Random(seed)
+        weights = get_weights()
+        payloads = {dtype: random_payloads(dtype, self.rng) for dtype in DTYPE2XKNX}
+        dtypes = [dtype for dtype in DTYPE2XKNX if payloads[dtype]]
+        chosen = self.rng.choices(dtypes, weights=[weights[dtype] for dtype in dtypes], k=ga_count)
+
+        self.mapping: dict[str, dict[str, Any]] = {}
+        self.addresses: list[tuple[GroupAddress, list[DPTBinary | DPTArray]]] = []
+        for idx, dtype in enumerate(chosen):
+            address = GroupAddress(idx + 1)
+            self.mapping[str(address)] = {"dtype": dtype, "name": f"{dtype} {idx}"}
+            self.addresses.append((address, payloads[dtype]))
+
+    def telegrams(self, count: int) -> Iterator[Telegram]:
+        """Generate telegrams to random addresses of the mapping."""
+        for _ in range(count):
+            address, payloads = self.rng.choice(self.addresses)
+            yield Telegram(
+                destination_address=address,
+                source_address=IndividualAddress(self.rng.randrange(1, 2**16)),
+                payload=GroupValueWrite(self.rng.choice(payloads)),
+            )
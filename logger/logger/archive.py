@@ -0,0 +1,309 @@
+"""Move old history out of the database into monthly Parquet files.
+
+Rows older than a number of days are moved from the logging tables into one
+Parquet file per table (i.e. per dtype, or per `dtype_id` of the unified
+schema) and month, e.g. `archive/temperature/2024-01.parquet`:
+
+    python -m logger.archive sqlite:///knx.db archive/ --days 365
+
+The files are sorted by `dst`, `time` and `id_`, so a group address is a
+contiguous range of row groups, and `name`, `src` and `dst` are dictionary
+encoded. A month archived again, e.g. by a daily run, is merged into its
+file. Each file is written completely before its rows are deleted, in
+transactions of `ARCHIVE_CHUNK` rows, so the logger isn't blocked long. If
+the deletion fails the rows are in both places, the next run skips the
+copies already archived.
+
+`logger.export` reads archive and database as one, see `read_archive`.
+Rollups are kept in the database. Needs pyarrow, which is only imported
+once a file is read or written.
+"""
+
+import argparse
+import datetime as dt
+import heapq
+import logging
+import os
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from operator import attrgetter, itemgetter
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from sqlalchemy import ColumnElement, Table, delete, func, select
+from sqlalchemy.orm import Session
+
+from logger.mapping import GroupAddressEntry
+from logger.partition import month_start, month_tables, next_month
+from logger.rollup import is_rollup
+from logger.util import SCHEMAS, get_orm, session_scope, utcnow
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Rows read, written and deleted at once
+ARCHIVE_CHUNK = 50_000
+
+# Python type of a column: name and arguments of its arrow type
+ARROW_TYPES: dict[type, tuple[str, ...]] = {
+    bool: ("bool_",),
+    int: ("int64",),
+    float: ("float64",),
+    str: ("string",),
+    dt.datetime: ("timestamp", "us"),
+    dt.date: ("date32",),
+    dt.time: ("time64", "us"),
+}
+DICTIONARY_COLUMNS = ("name", "src", "dst")
+SORT_KEY = itemgetter("dst", "time", "id_")
+
+
+class ArchivedRow(NamedTuple):
+    """An archived value of a group address, see `read_archive`."""
+
+    entry: GroupAddressEntry
+    time: dt.datetime
+    src: Any
+    value: Any
+
+
+def is_archivable(table: Table) -> bool:
+    """Check if a table is a logging table."""
+    return not is_rollup(table) and all(name in table.columns for name in ("id_", "time", "dst"))
+
+
+def part_directory(root: Path, table: Table, dtype_id: int | None = None) -> Path:
+    """Directory of the files of a table, per dtype for the unified schema."""
+    directory = Path(root) / table.name
+    return directory if dtype_id is None else directory / f"dtype_{dtype_id}"
+
+
+def month_path(directory: Path, month: dt.datetime) -> Path:
+    """File of a month, e.g. `2024-01.parquet`."""
+    return directory / f"{month:%Y-%m}.parquet"
+
+
+def load_pyarrow() -> tuple[ModuleType, ModuleType]:
+    """Import pyarrow and its parquet module, once a file is read or written."""
+    # Not at the top, pyarrow is optional
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.parquet as pq  # noqa: PLC0415
+
+    return pa, pq
+
+
+def arrow_schema(table: Table) -> "pa.Schema":
+    """Get the arrow schema of the columns of a table."""
+    pa, _ = load_pyarrow()
+    fields = []
+    for column in table.columns:
+        name, *args = ARROW_TYPES[column.type.python_type]
+        fields.append((column.name, getattr(pa, name)(*args)))
+    return pa.schema(fields)
+
+
+def read_file(path: Path, chunk_size: int) -> Iterator[dict[str, Any]]:
+    """Read the rows of an archived month, in their order."""
+    _, pq = load_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield from batch.to_pylist()
+
+
+def merge_rows(archived: Iterable[dict[str, Any]], rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Merge sorted rows into archived ones, skipping rows archived already."""
+    previous = None
+    for row in heapq.merge(archived, rows, key=SORT_KEY):
+        key = SORT_KEY(row)
+        if key != previous:
+            yield row
+        previous = key
+
+
+def write_file(path: Path, schema: "pa.Schema", rows: Iterable[dict[str, Any]], chunk_size: int) -> int:
+    """Write sorted rows to a file, replacing it once complete.
+
+    Returns
+    -------
+    int
+        Number of rows in the file.
+
+    """
+    pa, pq = load_pyarrow()
+    tmp_path = path.with_suffix(".tmp")
+    dictionary = [name for name in DICTIONARY_COLUMNS if name in schema.names]
+    count = 0
+    rows = iter(rows)
+    with pq.ParquetWriter(tmp_path, schema, use_dictionary=dictionary, compression="zstd") as writer:
+        while chunk := list(islice(rows, chunk_size)):
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    with tmp_path.open("rb") as file_:
+        os.fsync(file_.fileno())
+    tmp_path.replace(path)
+    return count
+
+
+def archive_month(
+    session: Session,
+    table: Table,
+    directory: Path,
+    month: dt.datetime,
+    *,
+    before: dt.datetime,
+    condition: ColumnElement[bool] | None = None,
+    chunk_size: int = ARCHIVE_CHUNK,
+) -> int:
+    """Move the rows of a month before a time into its file, commits.
+
+    Returns
+    -------
+    int
+        Number of rows moved.
+
+    """
+    selected = [table.c.time >= month, table.c.time < min(next_month(month), before)]
+    if condition is not None:
+        selected.append(condition)
+    max_id = session.scalar(select(func.max(table.c.id_)).where(*selected))
+    if max_id is None:
+        return 0
+    # Rows inserted meanwhile, e.g. by a replay, wait for the next run
+    selected.append(table.c.id_ <= max_id)
+
+    moved = 0
+
+    def rows() -> Iterator[dict[str, Any]]:
+        nonlocal moved
+        # Sorted here, not by the collation of the database
+        for dst in sorted(session.scalars(select(table.c.dst).where(*selected).distinct())):
+            query = select(*table.columns).where(*selected, table.c.dst == dst).order_by(table.c.time, table.c.id_)
+            for row in session.execute(query.execution_options(yield_per=chunk_size)).mappings():
+                moved += 1
+                yield dict(row)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = month_path(directory, month)
+    new_rows = merge_rows(read_file(path, chunk_size), rows()) if path.exists() else rows()
+    write_file(path, arrow_schema(table), new_rows, chunk_size)
+    session.commit()
+
+    # Short transactions, the logger keeps writing meanwhile
+    while True:
+        chunk = select(table.c.id_).where(*selected).limit(chunk_size).scalar_subquery()
+        deleted = session.execute(delete(table).where(table.c.id_.in_(chunk))).rowcount  # type: ignore [attr-defined]
+        session.commit()
+        if deleted < chunk_size:
+            break
+    logging.debug("Archived %i rows of %s in %s.", moved, table.name, path)
+    return moved
+
+
+def archive_table(session: Session, table: Table, root: Path, before: dt.datetime, *, chunk_size: int = ARCHIVE_CHUNK) -> int:
+    """Move the rows of a table before a time into the monthly files, commits.
+
+    Returns
+    -------
+    int
+        Number of rows moved.
+
+    """
+    parts: list[tuple[Path, ColumnElement[bool] | None]] = [(part_directory(root, table), None)]
+    if "dtype_id" in table.columns:
+        dtype_ids = session.scalars(select(table.c.dtype_id).where(table.c.time < before).distinct())
+        parts = [(part_directory(root, table, dtype_id), table.c.dtype_id == dtype_id) for dtype_id in dtype_ids]
+
+    count = 0
+    for directory, condition in parts:
+        query = select(func.min(table.c.time)).where(table.c.time < before)
+        if condition is not None:
+            query = query.where(condition)
+        oldest = session.scalar(query)
+        if oldest is None:
+            continue
+        month = month_start(oldest)
+        while month < before:
+            count += archive_month(session, table, directory, month, before=before, condition=condition, chunk_size=chunk_size)
+            month = next_month(month)
+    return count
+
+
+def archive(db_addr: str, root: Path, days: int, schema: str = "per_dtype", *, chunk_size: int = ARCHIVE_CHUNK) -> int:
+    """Move the rows older than a number of days into the archive.
+
+    Parameters
+    ----------
+    db_addr : str
+        Address of the database, with a sync driver
+    root : Path
+        Directory of the archive
+    days : int
+        Age in days of the rows to keep in the database
+    schema : str
+        Schema the telegrams are stored in, see `logger.util.SCHEMAS`
+    chunk_size : int
+        Rows read, written and deleted at once
+
+    Returns
+    -------
+    int
+        Number of rows moved.
+
+    """
+    before = utcnow() - dt.timedelta(days=days)
+    count = 0
+    with session_scope(db_addr, schema) as session:
+        for table in get_orm(schema).Base.metadata.sorted_tables:
+            if not is_archivable(table):
+                continue
+            # The databases of the months for tables partitioned on sqlite
+            for part in month_tables(session, table, end=before):
+                count += archive_table(session, part, root, before, chunk_size=chunk_size)
+    return count
+
+
+def entry_rows(root: Path, entry: GroupAddressEntry, start: dt.datetime | None, end: dt.datetime | None) -> Iterator[ArchivedRow]:
+    """Read the archived rows of a group address, ordered by time."""
+    _, pq = load_pyarrow()
+    directory = part_directory(root, entry.table, entry.columns.get("dtype_id"))
+    for path in sorted(directory.glob("*.parquet")):
+        month = dt.datetime.strptime(path.stem, "%Y-%m")  # noqa: DTZ007
+        if (start is not None and next_month(month) <= start) or (end is not None and month >= end):
+            continue
+        filters = [("dst", "=", entry.columns["dst"])]
+        if start is not None:
+            filters.append(("time", ">=", start))
+        if end is not None:
+            filters.append(("time", "<", end))
+        # The group address is a few row groups, the others are skipped by their statistics
+        rows = pq.read_table(path, columns=["time", "src", entry.value_column], filters=filters)
+        for time, src, value in zip(*(column.to_pylist() for column in rows.columns), strict=True):
+            yield ArchivedRow(entry, time, src, value)
+
+
+def read_archive(root: Path, entries: list[GroupAddressEntry], start: dt.datetime | None = None, end: dt.datetime | None = None) -> Iterator[ArchivedRow]:
+    """Read the archived rows of the entries from `start` (inclusive) to `end` (exclusive), ordered by time.
+
+    Like `logger.export.query_rows` for the database.
+    """
+    return heapq.merge(*(entry_rows(root, entry, start, end) for entry in entries), key=attrgetter("time"))
+
+
+def main() -> int:
+    """Archive old history from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_addr", help="address of the database, e.g. sqlite:///knx.db")
+    parser.add_argument("archive", type=Path, help="directory of the archive")
+    parser.add_argument("--days", type=int, default=365, help="keep the rows of this many days in the database")
+    parser.add_argument("--schema", choices=SCHEMAS, default="per_dtype")
+    parser.add_argument("--chunk-size", type=int, default=ARCHIVE_CHUNK, help="rows read, written and deleted at once")
+    args = parser.parse_args()
+
+    count = archive(args.db_addr, args.archive, args.days, args.schema, chunk_size=args.chunk_size)
+    logging.info("Archived %i rows.", count)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
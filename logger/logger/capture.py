@@ -0,0 +1,329 @@
+"""Raw capture of telegrams, to be decoded later.
+
+Instead of decoding and storing each telegram, the capture appends it as is
+to a file of fixed size records. That keeps up with a busy bus on small
+hardware, the telegrams are decoded later, e.g. by replaying the files.
+
+There is one file per hour (UTC), `knx-<YYYYmmdd>-<HH>.cap`. It starts with a
+16 byte header (magic, version and record size) followed by the records, 32
+bytes each, little endian:
+
+======  =======  ================================================
+offset  type     field
+======  =======  ================================================
+0       int64    time of reception, microseconds since the epoch
+8       uint16   raw individual address of the source
+10      uint16   raw destination address, see `FLAG_GROUP`
+12      uint16   APCI service, see `xknx.telegram.apci.APCIService`
+14      uint8    flags, see the `FLAG_` constants
+15      uint8    number of payload bytes
+16      16 byte  payload, zero padded
+======  =======  ================================================
+
+The fixed size makes the files memory-mappable, see `CaptureFile`, a record
+is found by its index and a record cut off by a crash is simply ignored.
+"""
+
+import datetime as dt
+import logging
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Self
+
+from xknx.dpt import DPTBinary
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram
+from xknx.telegram.apci import APCI
+
+MAGIC = b"KNXCAP"
+VERSION = 1
+FILE_HEADER = struct.Struct("<6sHH6x")
+RECORD = struct.Struct("<qHHHBB16s")
+PAYLOAD_SIZE = 16
+FILE_GLOB = "knx-*.cap"
+
+# The destination is a group address, otherwise an individual one
+FLAG_GROUP = 0x01
+# The payload is a `DPTBinary`, i.e. its value is the single payload byte
+FLAG_BINARY = 0x02
+# The payload didn't fit and is cut off
+FLAG_TRUNCATED = 0x04
+
+US_PER_HOUR = 3600 * 1_000_000
+EPOCH = dt.datetime(1970, 1, 1)
+
+
+def capture_name(timestamp: int) -> str:
+    """Name of the file of the hour of a timestamp in microseconds, e.g. `knx-20240102-03.cap`."""
+    return f"knx-{EPOCH + dt.timedelta(microseconds=timestamp):%Y%m%d-%H}.cap"
+
+
+def pack(telegram: Telegram, timestamp: int) -> bytes:
+    """Pack a telegram into a record.
+
+    Parameters
+    ----------
+    telegram : Telegram
+        The telegram, as received
+    timestamp : int
+        Time of reception, microseconds since the epoch
+
+    Returns
+    -------
+    bytes
+        The record, `RECORD.size` bytes.
+
+    """
+    flags = FLAG_GROUP if isinstance(telegram.destination_address, GroupAddress) else 0
+    payload = b""
+    apci = 0
+    if isinstance(telegram.payload, APCI):
+        apci = telegram.payload.CODE.value
+        value = getattr(telegram.payload, "value", None)
+        if isinstance(value, DPTBinary):
+            flags |= FLAG_BINARY
+            payload = bytes((value.value,))
+        elif value is not None:
+            payload = bytes(value.value)
+    if len(payload) > PAYLOAD_SIZE:
+        flags |= FLAG_TRUNCATED
+        payload = payload[:PAYLOAD_SIZE]
+
+    return RECORD.pack(
+        timestamp,
+        telegram.source_address.raw,
+        getattr(telegram.destination_address, "raw", 0),
+        apci,
+        flags,
+        len(payload),
+        payload,
+    )
+
+
+class CaptureWriter:
+    """Append telegrams to hourly capture files.
+
+    Writes are buffered and flushed with the first telegram after
+    `flush_interval` seconds. The runner also flushes them every
+    `flush_interval` seconds while the bus is quiet, see
+    `logger.runner.flush_capture`, so a crash loses at most the telegrams
+    since.
+    """
+
+    def __init__(self, directory: Path, *, flush_interval: float = 1.0, buffer_size: int = 2**16) -> None:
+        """Initialize the writer, the directory is created if missing."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.count = 0
+
+        self._file: IO[bytes] | None = None
+        self._hour_end = 0
+        self._last_flush = time.monotonic()
+
+    def telegram_received(self, telegram: Telegram) -> None:
+        """Capture a received telegram, the callback for `xknx.telegram_queue`."""
+        self.append(telegram, time.time_ns() // 1000)
+
+    def append(self, telegram: Telegram, timestamp: int) -> None:
+        """Append a telegram received at a timestamp in microseconds since the epoch."""
+        if timestamp >= self._hour_end or self._file is None:
+            self._rotate(timestamp)
+        self._file.write(pack(telegram, timestamp))  # type: ignore [union-attr]
+        self.count += 1
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _rotate(self, timestamp: int) -> None:
+        """Continue in the file of the hour of a timestamp."""
+        self.close()
+        path = self.directory / capture_name(timestamp)
+        size = path.stat().st_size if path.exists() else 0
+        if size > FILE_HEADER.size and (size - FILE_HEADER.size) % RECORD.size:
+            # Cut off by a crash, drop it so the following records are aligned
+            size -= (size - FILE_HEADER.size) % RECORD.size
+            os.truncate(path, size)
+            logging.warning("Dropped the truncated record at the end of %s.", path)
+        file_ = path.open("ab", buffering=self.buffer_size)
+        if not size:
+            file_.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self._file = file_
+        self._hour_end = (timestamp // US_PER_HOUR + 1) * US_PER_HOUR
+        logging.debug("Capturing to %s.", path)
+
+    def flush(self) -> None:
+        """Hand the buffered records to the operating system."""
+        if self._file is not None:
+            self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush and close the current file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Record:
+    """A record of a capture file, a view into its buffer.
+
+    Fields are read from the buffer when accessed, nothing is copied.
+    """
+
+    __slots__ = ("_buffer", "_offset")
+
+    def __init__(self, buffer: Any, offset: int) -> None:
+        """Initialize the view of the record at the offset of a buffer."""
+        self._buffer = buffer
+        self._offset = offset
+
+    @property
+    def fields(self) -> tuple[int, int, int, int, int, int, bytes]:
+        """All fields at once: timestamp, src, dst, apci, flags, length and padded payload."""
+        return RECORD.unpack_from(self._buffer, self._offset)
+
+    @property
+    def timestamp(self) -> int:
+        """Time of reception, microseconds since the epoch."""
+        return struct.unpack_from("<q", self._buffer, self._offset)[0]
+
+    @property
+    def time(self) -> dt.datetime:
+        """Time of reception, in UTC without tzinfo like `logger.util.utcnow`."""
+        return EPOCH + dt.timedelta(microseconds=self.timestamp)
+
+    @property
+    def src(self) -> int:
+        """Raw individual address of the source."""
+        return struct.unpack_from("<H", self._buffer, self._offset + 8)[0]
+
+    @property
+    def dst(self) -> int:
+        """Raw destination address."""
+        return struct.unpack_from("<H", self._buffer, self._offset + 10)[0]
+
+    @property
+    def apci(self) -> int:
+        """APCI service of the telegram."""
+        return struct.unpack_from("<H", self._buffer, self._offset + 12)[0]
+
+    @property
+    def flags(self) -> int:
+        """Flags of the record."""
+        return self._buffer[self._offset + 14]
+
+    @property
+    def source_address(self) -> IndividualAddress:
+        """The source address."""
+        return IndividualAddress(self.src)
+
+    @property
+    def destination_address(self) -> GroupAddress | IndividualAddress:
+        """The destination address, group or individual."""
+        return GroupAddress(self.dst) if self.flags & FLAG_GROUP else IndividualAddress(self.dst)
+
+    @property
+    def payload(self) -> memoryview:
+        """The payload bytes, a view into the buffer."""
+        start = self._offset + 16
+        return memoryview(self._buffer)[start : start + self._buffer[self._offset + 15]]
+
+    @property
+    def raw_value(self) -> int | tuple[int, ...]:
+        """The value like `telegram.payload.value.value`, i.e. what the decoders of `logger.mapping` take."""
+        if self.flags & FLAG_BINARY:
+            return self._buffer[self._offset + 16]
+        return tuple(self.payload)
+
+    def __repr__(self) -> str:
+        """Render the record."""
+        return f"Record(time={self.time}, src={self.source_address}, dst={self.destination_address}, apci={self.apci:#x}, raw_value={self.raw_value})"
+
+
+class CaptureFile(Sequence[Record]):
+    """A capture file, memory mapped and read as a sequence of records.
+
+    The records and their payloads are views into the mapping, they are
+    invalid once the file is closed. Without closing it, the mapping is
+    released along with the last record.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Map a capture file.
+
+        Raises
+        ------
+        ValueError
+            If it isn't a capture file of this version.
+
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as file_:
+            size = self.path.stat().st_size
+            self._mmap = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        header = self._mmap[: FILE_HEADER.size] if self._mmap is not None else b""
+        if len(header) < FILE_HEADER.size:
+            self.close()
+            error_msg = f"{path} is too short for a capture file."
+            raise ValueError(error_msg)
+        magic, version, record_size = FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            error_msg = f"{path} isn't a capture file of version {VERSION}."
+            raise ValueError(error_msg)
+
+        # A record cut off by a crash is ignored
+        self._count = (size - FILE_HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        """Get the number of records."""
+        return self._count
+
+    def __getitem__(self, index: int) -> Record:  # type: ignore [override]
+        """Get the record at an index."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            error_msg = f"Record {index} out of range."
+            raise IndexError(error_msg)
+        return Record(self._mmap, FILE_HEADER.size + index * RECORD.size)
+
+    def __iter__(self) -> Iterator[Record]:
+        """Iterate the records, oldest first."""
+        for offset in range(FILE_HEADER.size, FILE_HEADER.size + self._count * RECORD.size, RECORD.size):
+            yield Record(self._mmap, offset)
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> Self:
+        """Use the file as context manager."""
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None) -> None:
+        """Unmap the file."""
+        self.close()
+
+
+def capture_files(directory: Path) -> list[Path]:
+    """Get the capture files of a directory, oldest first."""
+    return sorted(Path(directory).glob(FILE_GLOB))
+
+
+def read(directory: Path) -> Iterator[Record]:
+    """Read the records of all capture files of a directory, oldest first.
+
+    A file stays mapped as long as its records are referenced.
+    """
+    for path in capture_files(directory):
+        yield from CaptureFile(path)
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """Generate an ORM for database logging based on xknx datatypes."""
 
+import argparse
 import logging
 import re
 from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from pathlib import Path
 
 from xknx import dpt
@@ -17,6 +19,60 @@ KNXMIXIN = "KNXMixin"
 DBBASEBAME = "Base"
 DTYPE_DOC_SEPERATION = ", "
 ORM_PATH = DST_DIR / "orm.py"
+UNIFIED_ORM_PATH = DST_DIR / "orm_unified.py"
+
+# Value columns of the unified telegram table, by db type of the dpst
+UNIFIED_COLUMNS = {
+    "types.Integer": ("value_int", "types.BigInteger"),
+    "types.Float": ("value_float", "types.Float"),
+    "types.Time": ("value_time", "types.Time"),
+    "types.Date": ("value_date", "types.Date"),
+    "types.DateTime": ("value_datetime", "types.DateTime"),
+    "types.String(14)": ("value_string", "types.String(14)"),
+}
+DTYPE_ID_FACTOR = 100_000
+DTYPE_ID_NO_SUB = DTYPE_ID_FACTOR - 1
+
+
+@dataclass(frozen=True)
+class SchemaOptions:
+    """Options of the generated schemas.
+
+    Attributes
+    ----------
+    int_addresses : bool
+        Store src and dst as raw integers instead of strings, adds helper views
+    name_table : bool
+        Store names in a groupaddress table referenced by dst instead of each row
+    partition_by_month : bool
+        Partition the tables by the month of time, see `logger.partition`
+
+    """
+
+    int_addresses: bool = False
+    name_table: bool = False
+    partition_by_month: bool = False
+
+    @property
+    def key_columns(self) -> str:
+        """Columns id_ and time, time is part of the primary key of partitioned tables."""
+        if self.partition_by_month:
+            # Postgres requires the partition key in the primary key
+            return """id_ = Column(types.Integer, Identity(), primary_key=True)
+    time = Column(types.DateTime, primary_key=True, default=datetime.utcnow)"""
+        return """id_ = Column(types.Integer, primary_key=True)
+    time = Column(types.DateTime, default=datetime.utcnow)"""
+
+    @property
+    def address_type(self) -> str:
+        """Db type of src and dst."""
+        # Integer, as SmallInteger is signed and too small for 16 bit
+        return "types.Integer" if self.int_addresses else "types.String"
+
+    @property
+    def address_python_type(self) -> str:
+        """Python type of src and dst."""
+        return "int" if self.int_addresses else "str"
 
 
 def dpst2db(dpst: str) -> str:
@@ -69,29 +125,45 @@ def dpst2db(dpst: str) -> str:
     raise ValueError(error_msg)
 
 
-def get_mixin() -> str:
+def get_mixin(options: SchemaOptions) -> str:
     """Create KNXMixin for all ORMs.
 
+    Parameters
+    ----------
+    options : SchemaOptions
+        Options of the schema
+
     Returns
     -------
     str
         KNXMixin as string to form foundation for all orms.
 
     """
+    name_repr = "" if options.name_table else "name={self.name}, "
     repr_str = (
         "{self.__class__.__name__}",
-        "(value={self.value}, name={self.name}, time={self.time} ",
+        f"(value={{self.value}}, {name_repr}time={{self.time}} ",
         "src={self.src}, dst={self.dst})",
     )
+    if options.name_table:
+        # Foreign keys of mixins need to be declared attributes
+        address_columns = f"""src = Column({options.address_type})
+
+    @declared_attr
+    def dst(cls) -> Mapped[{options.address_python_type}]:  # noqa: N805
+        \"""Group address, see GroupAddress for its name.\"""
+        return Column({options.address_type}, ForeignKey("groupaddress.address"))"""
+    else:
+        address_columns = f"""src = Column({options.address_type})
+    dst = Column({options.address_type})
+    name = Column(types.String)"""
+
     mixin = f"""
 class {KNXMIXIN}:
     \"""Basic properties of each knx request.\"""
 
-    id_ = Column(types.Integer, primary_key=True)
-    time = Column(types.DateTime, default=datetime.utcnow)
-    src = Column(types.String)
-    dst = Column(types.String)
-    name = Column(types.String)
+    {options.key_columns}
+    {address_columns}
 
     @property
     @abstractmethod
@@ -124,13 +196,14 @@ def get_imports(import_raw: dict[str, set]) -> str:
         For stuff that is not implemented.
 
     """
-    lines = []
+    lines: list[str] = []
     # 1. group: Type (\D+)
     # 2. group: Length restrictions
     # E.g., from 'String(14)' get 'String' in the first group
     expr = re.compile(r"^(\D+)(\(\d+\))?$")
 
-    import_sorted = OrderedDict(sorted(import_raw.items()))
+    # First party imports go last
+    import_sorted = OrderedDict(sorted(import_raw.items(), key=lambda x: (x[0].startswith("logger"), x[0])))
     for key, values in import_sorted.items():
         values_clean = []
         for val in values:
@@ -144,6 +217,9 @@ def get_imports(import_raw: dict[str, set]) -> str:
         # Mimick isort
         additional_newline = "\n" if key == "datetime" else ""
 
+        if key.startswith("logger") and lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+
         if values_clean:
             imports = ", ".join(sorted(set(values_clean)))
             lines.append(f"from {key} import {imports}{additional_newline}")
@@ -207,6 +283,7 @@ class {name}({KNXMIXIN}, {DBBASEBAME}):
     \"""
 
     __tablename__ = "{table_name}"
+    __table_args__ = (Index("ix_{table_name}_dst_time", "dst", "time"),)
     value = Column({db_type})
 """
 
@@ -261,12 +338,154 @@ def get_orms() -> str:
     return "\n".join(orms_sorted.values())
 
 
+def get_groupaddress_orm(options: SchemaOptions, import_dict: defaultdict[str, set[str]]) -> str:
+    """Create the ORM of the group addresses, referenced by dst.
+
+    Attention: The provided import dict is modified.
+
+    Parameters
+    ----------
+    options : SchemaOptions
+        Options of the schema
+    import_dict : Dict[str, set]
+        The imports in the form {module: type}
+
+    Returns
+    -------
+    str
+        Stringified code for the orm class, empty without name table.
+
+    """
+    if not options.name_table:
+        return ""
+    import_dict["sqlalchemy"].add("ForeignKey")
+    return f"""
+class GroupAddress({DBBASEBAME}):
+    \"""Name, dtype and unit of each group address, maintained from the mapping.\"""
+
+    __tablename__ = "groupaddress"
+    address = Column({options.address_type}, primary_key=True)
+    name = Column(types.String)
+    dtype = Column(types.String)
+    unit = Column(types.String)
+
+    def __repr__(self) -> str:
+        \"""Return basic information about this entity (address, name, dtype).\"""
+        return f"('{{self.__class__.__name__}}', '(address={{self.address}}, name={{self.name}}, dtype={{self.dtype}})')"
+""".strip()
+
+
+def get_footer(options: SchemaOptions, import_dict: defaultdict[str, set[str]]) -> str:
+    """Create the statements following the ORMs.
+
+    Attention: The provided import dict is modified.
+
+    Parameters
+    ----------
+    options : SchemaOptions
+        Options of the schema
+    import_dict : Dict[str, set]
+        The imports in the form {module: type}
+
+    Returns
+    -------
+    str
+        Stringified code, might be empty.
+
+    """
+    lines = []
+    if options.int_addresses:
+        import_dict["logger.schema"].add("add_address_views")
+        lines.append(f"add_address_views({DBBASEBAME}.metadata)\n")
+    if options.partition_by_month:
+        import_dict["logger.partition"].add("partition_by_month")
+        lines.append(f"partition_by_month({DBBASEBAME}.metadata)\n")
+    return "".join(lines)
+
+
 def get_doc() -> str:
     """ORM Documentation."""
     file_ = "logger" + __file__.rsplit("logger", maxsplit=1)[1]
     return f'"""Autogenerated by {file_}."""'
 
 
+def dtype_id(dpst: str) -> int:
+    """Get a stable id for a dtype.
+
+    E.g. 900001 for DPST-9-1 and 999999 for DPT-9.
+    """
+    parts = dpst.split("-")
+    main = int(parts[1])
+    sub = int(parts[2]) if len(parts) > 2 else DTYPE_ID_NO_SUB  # noqa: PLR2004
+    return main * DTYPE_ID_FACTOR + sub
+
+
+def get_dtypes() -> str:
+    """Create the mapping of dtypes to id and value column of the unified table.
+
+    Returns
+    -------
+    str
+        Stringified dict {dpst: (dtype_id, value_column)}.
+
+    """
+    lines = ["# dtype: (dtype_id, value column)", "DTYPES = {"]
+    for dpst in sorted(DTYPE2XKNX, key=dtype_id):
+        column, _ = UNIFIED_COLUMNS[dpst2db(dpst)]
+        lines.append(f'    "{dpst}": ({dtype_id(dpst)}, "{column}"),')
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def get_unified_orm(options: SchemaOptions) -> str:
+    """Create a single ORM for telegrams of all dtypes.
+
+    Parameters
+    ----------
+    options : SchemaOptions
+        Options of the schema
+
+    Returns
+    -------
+    str
+        Stringified code for the orm class.
+
+    """
+    name_repr = "" if options.name_table else "name={self.name}, "
+    repr_str = (
+        "{self.__class__.__name__}",
+        f"(dtype_id={{self.dtype_id}}, {name_repr}time={{self.time}} ",
+        "src={self.src}, dst={self.dst})",
+    )
+    if options.name_table:
+        address_columns = f"""src = Column({options.address_type})
+    dst = Column({options.address_type}, ForeignKey("groupaddress.address"))"""
+    else:
+        address_columns = f"""src = Column({options.address_type})
+    dst = Column({options.address_type})
+    name = Column(types.String)"""
+    columns = "\n".join(f"    {column} = Column({db_type})" for column, db_type in UNIFIED_COLUMNS.values())
+    return f"""
+class Telegram({DBBASEBAME}):
+    \"""ORM for telegrams of all dtypes.
+
+    The value is stored in the column of its db type, see DTYPES.
+    \"""
+
+    __tablename__ = "telegram"
+    __table_args__ = (Index("ix_telegram_dst_time", "dst", "time"),)
+
+    {options.key_columns}
+    {address_columns}
+    dtype_id = Column(types.Integer)
+{columns}
+
+    def __repr__(self) -> str:
+        \"""Return basic information about this entity (dtype_id, name, time, src, dst).\"""
+        return f"{repr_str}"
+""".strip()
+
+
 class ORMGenerator:
     """Generate all orms.
 
@@ -274,27 +493,106 @@ class ORMGenerator:
     """
 
     @staticmethod
-    def run() -> None:
-        """Generate the ORMs."""
+    def get_source(options: SchemaOptions) -> str:
+        """Generate the code of the ORMs."""
         # Get used xknx dtypes
         imports: defaultdict[str, set[str]] = defaultdict(set)
 
         imports["abc"].add("abstractmethod")
         imports["datetime"].add("datetime")
         imports["sqlalchemy"].add("Column")
+        imports["sqlalchemy"].add("Index")
         imports["sqlalchemy"].add("types")
 
         orms = get_orms()
         base = get_base(imports)
+        groupaddress = get_groupaddress_orm(options, imports)
+        footer = get_footer(options, imports)
+        if options.partition_by_month:
+            imports["sqlalchemy"].add("Identity")
+        if options.name_table:
+            imports["sqlalchemy.orm"].add("Mapped")
+            imports["sqlalchemy.orm"].add("declared_attr")
+
+        # Combine it
+        parts = [get_doc(), get_imports(imports), base, get_mixin(options), orms]
+        if groupaddress:
+            parts.insert(3, groupaddress + "\n")
+        if footer:
+            parts.append(footer)
+        return "\n\n".join(parts)
 
-        # Combine it and write it to a file
-        combined = "\n\n".join(
-            (get_doc(), get_imports(imports), base, get_mixin(), orms),
-        )
+    @staticmethod
+    def run(options: SchemaOptions) -> None:
+        """Generate the ORMs and write them to a file."""
         with Path(ORM_PATH).open("w", encoding="utf-8") as file_:
-            file_.write(combined)
+            file_.write(ORMGenerator.get_source(options))
+
+
+class UnifiedORMGenerator:
+    """Generate a single orm for all dtypes.
+
+    One narrow table holds the telegrams of all dtypes, with a value
+    column per db type.
+    """
+
+    @staticmethod
+    def get_source(options: SchemaOptions) -> str:
+        """Generate the code of the ORM."""
+        imports: defaultdict[str, set[str]] = defaultdict(set)
+
+        imports["datetime"].add("datetime")
+        imports["sqlalchemy"].add("Column")
+        imports["sqlalchemy"].add("Index")
+        imports["sqlalchemy"].add("types")
+
+        dtypes = get_dtypes()
+        base = get_base(imports)
+        groupaddress = get_groupaddress_orm(options, imports)
+        footer = get_footer(options, imports)
+        if options.partition_by_month:
+            imports["sqlalchemy"].add("Identity")
+
+        parts = [get_doc(), get_imports(imports), base, dtypes + "\n", get_unified_orm(options) + "\n"]
+        if groupaddress:
+            parts.insert(4, groupaddress + "\n")
+        if footer:
+            parts.append(footer)
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def run(options: SchemaOptions) -> None:
+        """Generate the ORM and write it to a file."""
+        with Path(UNIFIED_ORM_PATH).open("w", encoding="utf-8") as file_:
+            file_.write(UnifiedORMGenerator.get_source(options))
+
+
+def main() -> int:
+    """Generate both schemas with the options from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--int-addresses",
+        action="store_true",
+        help="store src and dst as raw integers, with helper views rendering a/b/c and a.b.c",
+    )
+    parser.add_argument(
+        "--name-table",
+        action="store_true",
+        help="store names in a groupaddress table referenced by dst instead of each row",
+    )
+    parser.add_argument(
+        "--partition-by-month",
+        action="store_true",
+        help="partition the tables by month, postgres range partitions or one sqlite file per month",
+    )
+    args = parser.parse_args()
+
+    options = SchemaOptions(int_addresses=args.int_addresses, name_table=args.name_table, partition_by_month=args.partition_by_month)
+    ORMGenerator.run(options)
+    UnifiedORMGenerator.run(options)
+    return 0
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    ORMGenerator.run()
+    raise SystemExit(main())
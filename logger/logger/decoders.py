@@ -0,0 +1,115 @@
+"""Fast decoders for the most frequent dpt families.
+
+The decoders work on the raw telegram value (e.g. the tuple of a `DPTArray`)
+and skip the payload object and the generic validation of xknx. They return
+exactly what `from_knx` of the xknx class returns, invalid payloads raise.
+"""
+
+import struct
+from collections.abc import Callable
+from functools import cache
+from math import ceil, log10
+from typing import Any
+
+from xknx.dpt import DPT2ByteFloat, DPT4ByteFloat, DPTScaling, DPTValue1ByteUnsigned
+from xknx.exceptions import ConversionError
+
+FLOAT32 = struct.Struct(">f")
+
+
+@cache
+def float16_table() -> tuple[float, ...]:
+    """Get the values of all 2 byte floats (DPT 9), indexed by the raw value."""
+    table = []
+    for data in range(2**16):
+        exponent = (data >> 11) & 0x0F
+        significand = data & 0x7FF
+        if data >> 15:
+            significand -= 2048
+        table.append(float(significand << exponent) / 100)
+    return tuple(table)
+
+
+def _byte_table(xknx_class: Any) -> tuple[int | None, ...]:
+    """Get the values of all 1 byte payloads (DPT 5), None if out of range."""
+    table: list[int | None] = []
+    for knx_value in range(2**8):
+        if _implements(xknx_class, DPTScaling):
+            delta = xknx_class.value_max - xknx_class.value_min
+            value = round((knx_value / 255) * delta) + xknx_class.value_min
+        else:
+            value = knx_value
+        table.append(value if xknx_class.value_min <= value <= xknx_class.value_max else None)
+    return tuple(table)
+
+
+def _implements(xknx_class: Any, family: type) -> bool:
+    """Check if a class decodes like the given family, i.e. doesn't override `from_knx`."""
+    return issubclass(xknx_class, family) and xknx_class.from_knx.__func__ is family.from_knx.__func__  # type: ignore [attr-defined]
+
+
+def get_byte_decoder(xknx_class: Any) -> Callable[[Any], int]:
+    """Create a decoder for 1 byte unsigned values (DPT 5)."""
+    table = _byte_table(xknx_class)
+
+    def decode(value_raw: Any) -> int:
+        (knx_value,) = value_raw
+        value = table[knx_value]
+        if value is None:
+            error_msg = f"Could not parse {xknx_class.dpt_name()}"
+            raise ConversionError(error_msg, value=knx_value)
+        return value
+
+    return decode
+
+
+def get_float16_decoder(xknx_class: Any) -> Callable[[Any], float]:
+    """Create a decoder for 2 byte floats (DPT 9)."""
+    table = float16_table()
+    value_min = xknx_class.value_min
+    value_max = xknx_class.value_max
+
+    def decode(value_raw: Any) -> float:
+        high, low = value_raw
+        value = table[high << 8 | low]
+        if not value_min <= value <= value_max:
+            error_msg = f"Could not parse {xknx_class.dpt_name()}"
+            raise ConversionError(error_msg, value=value)
+        return value
+
+    return decode
+
+
+def decode_float32(value_raw: Any) -> float:
+    """Decode a 4 byte float (DPT 14), rounded to 7 digits like xknx does."""
+    (value,) = FLOAT32.unpack(bytes(value_raw))
+    try:
+        return round(value, 7 - ceil(log10(abs(value))))
+    except (ValueError, OverflowError):
+        # 0 and special values
+        return value
+
+
+def get_fast_decoder(xknx_class: Any) -> Callable[[Any], Any] | None:
+    """Get a fast decoder for a xknx class.
+
+    Parameters
+    ----------
+    xknx_class : Any
+        The xknx dpt class
+
+    Returns
+    -------
+    Callable | None
+        Function that takes the raw value of a telegram and returns the same
+        as `xknx_class.from_knx`, None if there is no fast decoder for the class.
+
+    """
+    # DPT 1 is already stored as integer of the raw value, see `logger.mapping`
+    if _implements(xknx_class, DPT2ByteFloat):
+        return get_float16_decoder(xknx_class)
+    if _implements(xknx_class, DPT4ByteFloat):
+        return decode_float32
+    if _implements(xknx_class, DPTValue1ByteUnsigned) or _implements(xknx_class, DPTScaling):
+        return get_byte_decoder(xknx_class)
+    return None
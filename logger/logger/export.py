@@ -0,0 +1,340 @@
+"""Stream the history of group addresses as NDJSON or CSV.
+
+The rows of the requested group addresses and time range are read with
+server-side cursors in chunks of `EXPORT_CHUNK` rows, one per group
+address along the index on `(dst, time)`, and merged by time, so the memory
+stays the same however long the range is and the output starts right away:
+
+    python -m logger.export sqlite:///knx.db mapping.json 1/2/3 1/2/4 --start 2024-01-01 --format csv
+
+The async status server serves the same at `/export`, see
+`logger.statusserver.AsyncStatusServer`. With `--archive` the rows moved to
+the Parquet archive are included, see `logger.archive`.
+"""
+
+import argparse
+import csv
+import datetime as dt
+import heapq
+import io
+import json
+import logging
+import sys
+from collections.abc import Generator, Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from sqlalchemy import Select, Table, select
+from sqlalchemy.orm import Session
+from xknx.exceptions import CouldNotParseAddress
+from xknx.telegram import GroupAddress, IndividualAddress
+
+from logger.archive import read_archive
+from logger.lastvalue import to_json
+from logger.mapping import GATable, GroupAddressEntry, compile_mapping
+from logger.partition import month_tables
+from logger.util import SCHEMAS, session_scope
+
+# Rows fetched at once, and encoded per chunk of the output
+EXPORT_CHUNK = 5_000
+
+FORMATS = ("ndjson", "csv")
+CONTENT_TYPES = {"ndjson": b"application/x-ndjson", "csv": b"text/csv; charset=utf-8"}
+
+
+class ExportRow(NamedTuple):
+    """A stored value of a group address."""
+
+    time: dt.datetime
+    address: str
+    name: str
+    src: str
+    value: Any
+    unit: str
+
+
+def resolve(ga_table: GATable, addresses: Iterable[str]) -> list[GroupAddressEntry]:
+    """Get the entries of group addresses, e.g. `1/2/3`, all mapped ones if there are none.
+
+    Raises
+    ------
+    ValueError
+        In case of an invalid or unmapped address.
+
+    """
+    addresses = list(addresses)
+    if not addresses:
+        return [entry for entry in ga_table if entry is not None]
+
+    entries = []
+    for address in addresses:
+        try:
+            entry = ga_table[GroupAddress(address).raw]
+        except CouldNotParseAddress as err:
+            error_msg = f"Invalid group address {address}."
+            raise ValueError(error_msg) from err
+        if entry is None:
+            error_msg = f"Group address {address} isn't mapped."
+            raise ValueError(error_msg)
+        entries.append(entry)
+    return entries
+
+
+def format_src(src: Any) -> str:
+    """Render a stored source address, raw ones as `a.b.c`."""
+    return str(IndividualAddress(src)) if isinstance(src, int) else src
+
+
+def export_row(entry: GroupAddressEntry, time: dt.datetime, src: Any, value: Any) -> ExportRow:
+    """Get the row of a value stored for an entry."""
+    return ExportRow(time, entry.address, entry.name, format_src(src), value, entry.unit)
+
+
+def entry_query(table: Table, entry: GroupAddressEntry, start: dt.datetime | None, end: dt.datetime | None) -> Select:
+    """Select the rows of an entry stored in a table, ordered by time.
+
+    One group address in a range of time, read in order from the index on
+    `(dst, time)` without sorting the range first.
+    """
+    query = select(table.c.time, table.c.src, table.c[entry.value_column]).where(table.c.dst == entry.columns["dst"])
+    if start is not None:
+        query = query.where(table.c.time >= start)
+    if end is not None:
+        query = query.where(table.c.time < end)
+    return query.order_by(table.c.time)
+
+
+def query_entry(
+    session: Session,
+    table: Table,
+    entry: GroupAddressEntry,
+    *,
+    start: dt.datetime | None,
+    end: dt.datetime | None,
+    chunk_size: int,
+) -> Iterator[ExportRow]:
+    """Read the rows of an entry stored in a table, ordered by time, see `entry_query`."""
+    # A server-side cursor, fetching chunk by chunk
+    for time, src, value in session.execute(entry_query(table, entry, start, end).execution_options(yield_per=chunk_size)):
+        yield export_row(entry, time, src, value)
+
+
+def query_table(
+    session: Session,
+    table: Table,
+    entries: list[GroupAddressEntry],
+    *,
+    start: dt.datetime | None,
+    end: dt.datetime | None,
+    chunk_size: int,
+) -> Iterator[ExportRow]:
+    """Read the rows of the entries stored in a table, ordered by time.
+
+    Each entry is read with a cursor of its own, see `entry_query`. Tables
+    partitioned on sqlite are read month by month, see
+    `logger.partition.month_tables`.
+    """
+    for part in month_tables(session, table, start, end):
+        streams = [query_entry(session, part, entry, start=start, end=end, chunk_size=chunk_size) for entry in entries]
+        yield from heapq.merge(*streams, key=attrgetter("time"))
+
+
+def query_rows(
+    session: Session,
+    entries: list[GroupAddressEntry],
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+    *,
+    chunk_size: int = EXPORT_CHUNK,
+    archive: Path | None = None,
+) -> Iterator[ExportRow]:
+    """Read the rows of the entries from `start` (inclusive) to `end` (exclusive), ordered by time.
+
+    The tables are read with `query_table` and merged. With an `archive`
+    directory the archived rows are merged too, see
+    `logger.archive.read_archive`.
+    """
+    tables: dict[Table, list[GroupAddressEntry]] = {}
+    for entry in entries:
+        tables.setdefault(entry.table, []).append(entry)
+    streams = [query_table(session, table, table_entries, start=start, end=end, chunk_size=chunk_size) for table, table_entries in tables.items()]
+    if archive is not None:
+        streams.append(export_row(*row) for row in read_archive(archive, entries, start, end))
+    return heapq.merge(*streams, key=attrgetter("time"))
+
+
+def check_format(export_format: str) -> None:
+    """Check the format is one of `FORMATS`.
+
+    Raises
+    ------
+    ValueError
+        In case of an unknown format.
+
+    """
+    if export_format not in FORMATS:
+        error_msg = f"Unknown format '{export_format}', use one of {FORMATS}."
+        raise ValueError(error_msg)
+
+
+def encode(rows: Iterable[ExportRow], export_format: str = "ndjson", chunk_size: int = EXPORT_CHUNK) -> Iterator[bytes]:
+    """Encode rows in chunks, csv starts with a header.
+
+    Raises
+    ------
+    ValueError
+        In case of an unknown format, see `FORMATS`.
+
+    """
+    check_format(export_format)
+
+    rows = iter(rows)
+    if export_format == "ndjson":
+        while chunk := list(islice(rows, chunk_size)):
+            yield b"".join(to_json(row._asdict()) + b"\n" for row in chunk)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(ExportRow._fields)
+    yield buffer.getvalue().encode("utf-8")
+    while chunk := list(islice(rows, chunk_size)):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((row.time.isoformat(), row.address, row.name, row.src, row.value.isoformat() if isinstance(row.value, dt.date | dt.time) else row.value, row.unit) for row in chunk)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def export(
+    db_addr: str,
+    entries: list[GroupAddressEntry],
+    *,
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+    export_format: str = "ndjson",
+    schema: str = "per_dtype",
+    chunk_size: int = EXPORT_CHUNK,
+    archive: Path | None = None,
+) -> Generator[bytes, None, None]:
+    """Stream the history of the entries, encoded chunk by chunk.
+
+    The database is only read while the chunks are consumed, closing the
+    iterator closes the cursors. Use a sync driver.
+
+    Parameters
+    ----------
+    db_addr : str
+        Address of the database, e.g. sqlite:///knx.db
+    entries : list[GroupAddressEntry]
+        The group addresses, see `resolve`
+    start : dt.datetime | None
+        First time (UTC) to export, defaults to the beginning
+    end : dt.datetime | None
+        Time (UTC) to export up to, excluded, defaults to the end
+    export_format : str
+        One of `FORMATS`
+    schema : str
+        Schema the telegrams are stored in, see `logger.util.SCHEMAS`
+    chunk_size : int
+        Rows fetched and encoded at once
+    archive : Path | None
+        Directory of the archive to include, see `logger.archive`
+
+    Raises
+    ------
+    ValueError
+        In case of an unknown format.
+
+    """
+    check_format(export_format)
+    return _export(db_addr, entries, start=start, end=end, export_format=export_format, schema=schema, chunk_size=chunk_size, archive=archive)
+
+
+def _export(
+    db_addr: str,
+    entries: list[GroupAddressEntry],
+    *,
+    start: dt.datetime | None,
+    end: dt.datetime | None,
+    export_format: str,
+    schema: str,
+    chunk_size: int,
+    archive: Path | None,
+) -> Generator[bytes, None, None]:
+    # Only reading, the tables are created by the logger
+    with session_scope(db_addr, schema, create=False) as session:
+        yield from encode(query_rows(session, entries, start, end, chunk_size=chunk_size, archive=archive), export_format, chunk_size)
+
+
+@dataclass
+class ExportSource:
+    """A database to export from, e.g. for the status server."""
+
+    db_addr: str
+    ga_table: GATable
+    schema: str = "per_dtype"
+    chunk_size: int = EXPORT_CHUNK
+    archive: Path | None = None
+
+    def export(self, addresses: Iterable[str], start: dt.datetime | None = None, end: dt.datetime | None = None, export_format: str = "ndjson") -> Generator[bytes, None, None]:
+        """Stream the history of group addresses, see `export`.
+
+        Raises
+        ------
+        ValueError
+            In case of an invalid or unmapped address or an unknown format.
+
+        """
+        entries = resolve(self.ga_table, addresses)
+        return export(self.db_addr, entries, start=start, end=end, export_format=export_format, schema=self.schema, chunk_size=self.chunk_size, archive=self.archive)
+
+
+def main() -> int:
+    """Export the history from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_addr", help="address of the database, e.g. sqlite:///knx.db")
+    parser.add_argument("mapping", type=Path, help="json mapping, e.g. examples/ga_mapping.json")
+    parser.add_argument("addresses", nargs="*", help="group addresses, e.g. 1/2/3, defaults to all mapped ones")
+    parser.add_argument("--schema", choices=SCHEMAS, default="per_dtype")
+    parser.add_argument("--start", type=dt.datetime.fromisoformat, help="first time (UTC) to export, e.g. 2024-01-01")
+    parser.add_argument("--end", type=dt.datetime.fromisoformat, help="time (UTC) to export up to, excluded")
+    parser.add_argument("--format", dest="export_format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--output", type=Path, help="file to write to, defaults to stdout")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK, help="rows fetched at once")
+    parser.add_argument("--archive", type=Path, help="directory of the archive to include, see logger.archive")
+    args = parser.parse_args()
+
+    with args.mapping.open(encoding="utf-8") as file_:
+        ga_table = compile_mapping(json.load(file_), args.schema)
+    try:
+        entries = resolve(ga_table, args.addresses)
+    except ValueError as err:
+        parser.error(str(err))
+
+    chunks = export(
+        args.db_addr,
+        entries,
+        start=args.start,
+        end=args.end,
+        export_format=args.export_format,
+        schema=args.schema,
+        chunk_size=args.chunk_size,
+        archive=args.archive,
+    )
+    output = args.output.open("wb") if args.output is not None else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output is not None:
+            output.close()
+    logging.debug("Exported %i group addresses.", len(entries))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+"""Drop telegrams carrying (nearly) the same value before they are stored.
+
+A filter is configured per group address by optional fields of the mapping,
+e.g. `{"dtype": "DPST-9-4", "name": "Brightness", "deadband": 50, "heartbeat": 900}`:
+
+- `deadband`: store only if the value moved more than this from the last stored one
+- `deadband_relative`: same, relative to the last stored value, e.g. 0.05 for 5%
+- `on_change`: store only if the value differs from the last stored one
+- `min_interval`: seconds to wait after a stored value before storing the next
+- `heartbeat`: seconds after which a value is stored even if unchanged
+
+Values are compared to the last stored value, slow drifts are stored once
+they leave the deadband. Every change is stored, so edges of switches are
+kept with `on_change` alone. The latest change held back by `min_interval`
+is stored once the interval ends, see `ValueFilter.release`.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+# Fields of a mapping entry configuring its filter
+FILTER_FIELDS = ("deadband", "deadband_relative", "on_change", "min_interval", "heartbeat")
+
+
+@dataclass(slots=True)
+class ValueFilter:
+    """Filter of a single group address, keeps the last stored value."""
+
+    deadband: float = 0.0
+    deadband_relative: float = 0.0
+    on_change: bool = False
+    min_interval: float = 0.0
+    heartbeat: float | None = None
+
+    last_value: Any = field(default=None, init=False)
+    last_time: float | None = field(default=None, init=False)
+    dropped: int = field(default=0, init=False)
+    # The change held back by min_interval and what to store for it
+    held: tuple[Any, Any] | None = field(default=None, init=False)
+
+    def changed(self, value: Any) -> bool:
+        """Check if a value differs enough from the last stored one."""
+        if not (self.on_change or self.deadband or self.deadband_relative):
+            return True
+        if value is None or self.last_value is None or isinstance(value, bool) or not isinstance(value, int | float):
+            return value != self.last_value
+
+        delta = abs(value - self.last_value)
+        threshold = max(self.deadband, self.deadband_relative * abs(self.last_value))
+        # Within the deadband, or unchanged if only on_change is set
+        return delta > threshold if threshold else delta != 0
+
+    def accept(self, value: Any, now: float | None = None, item: Any = None) -> bool:
+        """Decide if a value is stored and remember it if so.
+
+        A change held back by `min_interval` is kept until `release`,
+        replacing the one held before.
+
+        Parameters
+        ----------
+        value : Any
+            The decoded value
+        now : float | None
+            Monotonic time of reception, defaults to `time.monotonic()`
+        item : Any
+            What to store for a held back value, e.g. its row, defaults to the value
+
+        Returns
+        -------
+            True if the value is stored
+            False if it is dropped
+
+        """
+        now = time.monotonic() if now is None else now
+        changed = True
+        if self.last_time is None:
+            store = True
+        else:
+            elapsed = now - self.last_time
+            heartbeat_due = self.heartbeat is not None and elapsed >= self.heartbeat
+            changed = self.changed(value)
+            store = heartbeat_due or (elapsed >= self.min_interval and changed)
+
+        # Back to the stored value, nothing to hold any more
+        self.held = (value, value if item is None else item) if changed and not store else None
+        if store:
+            self.last_value = value
+            self.last_time = now
+        else:
+            self.dropped += 1
+        return store
+
+    def release(self, now: float | None = None) -> Any:
+        """Take the change held back by `min_interval` once the interval ended.
+
+        The change counts as stored from `now` on.
+
+        Parameters
+        ----------
+        now : float | None
+            Monotonic time, defaults to `time.monotonic()`
+
+        Returns
+        -------
+        Any
+            The item passed along with the change to `accept`, None if none is due.
+
+        """
+        now = time.monotonic() if now is None else now
+        if self.held is None or self.last_time is None or now - self.last_time < self.min_interval:
+            return None
+        self.last_value, item = self.held
+        self.last_time = now
+        self.held = None
+        return item
+
+
+def get_filter(address: str, meta: dict[str, Any]) -> ValueFilter | None:
+    """Create the filter of a mapping entry.
+
+    Parameters
+    ----------
+    address : str
+        Group address of the entry, for error messages only
+    meta : dict
+        The entry of the mapping, see `FILTER_FIELDS`
+
+    Returns
+    -------
+    ValueFilter | None
+        The filter, None if the entry doesn't configure one.
+
+    Raises
+    ------
+    ValueError
+        In case of negative values.
+
+    """
+    options = {key: meta[key] for key in FILTER_FIELDS if meta.get(key) is not None}
+    if not options:
+        return None
+
+    for key, value in options.items():
+        if key != "on_change" and value < 0:
+            error_msg = f"{key} of {address} must not be negative, got {value}."
+            raise ValueError(error_msg)
+    return ValueFilter(**options)
@@ -0,0 +1,83 @@
+"""Last decoded value of each group address, kept in memory.
+
+Updated by the receive callback with every decoded value, filtered or not,
+and served by the status server at `/values` and `/values/<ga>`, so the
+latest value of a group address doesn't need a query of its table.
+"""
+
+import datetime as dt
+import json
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from xknx.telegram import GroupAddress, IndividualAddress
+
+if TYPE_CHECKING:
+    from logger.mapping import GroupAddressEntry
+
+
+@dataclass(frozen=True, slots=True)
+class LastValue:
+    """The last value sent to a group address."""
+
+    address: str
+    name: str
+    value: Any
+    unit: str
+    src: str
+    time: dt.datetime
+
+
+def _json_default(value: Any) -> Any:
+    """Encode times, dates and anything else json doesn't know."""
+    if isinstance(value, dt.date | dt.time):
+        return value.isoformat()
+    return str(value)
+
+
+def to_json(value: Any) -> bytes:
+    """Serialise last values to json."""
+    return json.dumps(value, default=_json_default, ensure_ascii=False).encode("utf-8")
+
+
+class LastValues:
+    """Table of the last values by raw group address."""
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self.values: dict[int, LastValue] = {}
+        self.version = 0
+        self._all: tuple[int, bytes] | None = None
+
+    def update(self, entry: "GroupAddressEntry", raw: int, value: Any, src: IndividualAddress, time: dt.datetime) -> None:
+        """Keep a decoded value as the last one of its group address."""
+        self.values[raw] = LastValue(entry.address, entry.name, value, entry.unit, str(src), time)
+        self.version += 1
+
+    def get(self, address: str | int) -> LastValue | None:
+        """Get the last value of a group address, e.g. `1/2/3`, None if there is none.
+
+        Raises
+        ------
+        CouldNotParseAddress
+            In case of an invalid address.
+
+        """
+        return self.values.get(GroupAddress(address).raw)
+
+    def __iter__(self) -> Iterator[LastValue]:
+        """Iterate the last values, ordered by group address."""
+        values = self.values
+        return (values[raw] for raw in sorted(values))
+
+    def __len__(self) -> int:
+        """Get the number of group addresses with a value."""
+        return len(self.values)
+
+    def json(self) -> bytes:
+        """Get all last values as json object by group address, reused until a value changes."""
+        version = self.version
+        if self._all is None or self._all[0] != version:
+            self._all = (version, to_json({value.address: asdict(value) for value in self}))
+        return self._all[1]
@@ -0,0 +1,246 @@
+"""Compile a ga mapping into a table of ready-made decoders."""
+
+import datetime as dt
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from types import ModuleType
+from typing import Any
+
+from sqlalchemy import Integer, Table
+from xknx.dpt import DPTArray
+from xknx.dpt.dpt_18 import SceneControl
+from xknx.dpt.dpt_20 import HVACStatus
+from xknx.dpt.dpt_235 import TariffActiveEnergy
+from xknx.telegram import GroupAddress, IndividualAddress
+
+from logger.decoders import get_fast_decoder
+from logger.dtype_matcher import DTYPE2XKNX
+from logger.filters import ValueFilter, get_filter
+from logger.util import get_orm, is_binary, xknx2name
+
+# Number of possible (raw) group addresses
+GA_COUNT = 2**16
+
+
+@dataclass(frozen=True, slots=True)
+class GroupAddressEntry:
+    """Everything needed to store a telegram sent to one group address."""
+
+    address: str
+    name: str
+    dtype: str
+    unit: str
+    decode: Callable[[Any], Any]
+    orm_class: type
+    value_column: str
+    columns: dict[str, Any]
+    format_src: Callable[[IndividualAddress], Any] = str
+    filter: ValueFilter | None = None
+
+    @property
+    def table(self) -> Table:
+        """Table the telegrams are inserted to."""
+        return self.orm_class.__table__  # type: ignore [attr-defined]
+
+    def row(self, value: Any, src: IndividualAddress, time: dt.datetime) -> tuple[Table, dict[str, Any]]:
+        """Get the row storing a decoded value sent from src at time, see `logger.writer.Row`."""
+        return (self.table, {**self.columns, "time": time, "src": self.format_src(src), self.value_column: value})
+
+
+# Indexed by the raw group address, None for unmapped addresses
+GATable = list[GroupAddressEntry | None]
+
+
+def to_db_value(value: Any) -> Any:
+    """Translate a value decoded by xknx into something storable."""
+    # Catch remaining enums. Damn you HVAC control...
+    if isinstance(value, Enum):
+        return value._value_
+
+    if isinstance(value, HVACStatus):
+        # Note: Dropping the status flags
+        return 0
+
+    if isinstance(value, SceneControl):
+        # Note: Dropping the "learn" info.
+        return value.scene_number
+
+    if isinstance(value, TariffActiveEnergy):
+        # Note: Dropping the tariff
+        return value.energy
+
+    return value
+
+
+def get_decoder(dtype: str) -> Callable[[Any], Any]:
+    """Create a decoder from raw telegram value to db value for a dtype.
+
+    Parameters
+    ----------
+    dtype : str
+        Datapoint type (in knx notation), e.g. DPST-9-1
+
+    Returns
+    -------
+    Callable
+        Function that takes the raw value of a telegram and returns the value to store.
+
+    """
+    xknx_class: Any = DTYPE2XKNX[dtype]
+
+    if is_binary(xknx_class):
+        # Keep the binary as integer for easier storage
+        return int
+
+    # Skip xknx for the frequent families
+    fast_decoder = get_fast_decoder(xknx_class)
+    if fast_decoder is not None:
+        return fast_decoder
+
+    def from_knx(value_raw: Any) -> Any:
+        """Decode by xknx, raises for invalid payloads."""
+        return xknx_class.from_knx(DPTArray(value_raw))
+
+    # Translate time_struct to datetime objects
+    # xknx is still called for validation, its result is dropped
+    if dtype == "DPST-10-1":
+
+        def decode_time(value_raw: Any) -> dt.time:
+            from_knx(value_raw)
+            return dt.time(hour=value_raw[0] & 0b11111, minute=value_raw[1], second=value_raw[2])
+
+        return decode_time
+
+    if dtype == "DPST-11-1":
+
+        def decode_date(value_raw: Any) -> dt.date:
+            from_knx(value_raw)
+            return dt.date(day=value_raw[0], month=value_raw[1], year=value_raw[2])
+
+        return decode_date
+
+    if dtype == "DPST-19-1":
+
+        def decode_datetime(value_raw: Any) -> dt.datetime:
+            from_knx(value_raw)
+            return dt.datetime(
+                year=value_raw[0],
+                month=value_raw[1],
+                day=value_raw[2],
+                hour=value_raw[3] & 0b11111,
+                minute=value_raw[4],
+                second=value_raw[5],
+            )
+
+        return decode_datetime
+
+    # Translate RGB(W), XYY colors values to int
+    if dtype == "DPST-242-600":
+
+        def decode_xyy(value_raw: Any) -> int:
+            from_knx(value_raw)
+            return value_raw[1] << 8 | value_raw[0]
+
+        return decode_xyy
+
+    if dtype == "DPST-232-600":
+
+        def decode_rgb(value_raw: Any) -> int:
+            from_knx(value_raw)
+            return value_raw[2] << 16 | value_raw[1] << 8 | value_raw[0]
+
+        return decode_rgb
+
+    if dtype == "DPST-251-600":
+
+        def decode_rgbw(value_raw: Any) -> int:
+            from_knx(value_raw)
+            return value_raw[3] << 24 | value_raw[2] << 16 | value_raw[1] << 8 | value_raw[0]
+
+        return decode_rgbw
+
+    def decode(value_raw: Any) -> Any:
+        return to_db_value(xknx_class.from_knx(DPTArray(value_raw)))
+
+    return decode
+
+
+def get_unit(dtype: str) -> str:
+    """Get the unit of a dtype, empty if it has none."""
+    return getattr(DTYPE2XKNX[dtype], "unit", None) or ""
+
+
+def raw_address(address: IndividualAddress) -> int:
+    """Get the raw integer of an address."""
+    return address.raw
+
+
+def compile_mapping(mapping: dict, schema: str | ModuleType = "per_dtype") -> GATable:
+    """Compile a mapping into a table indexed by the raw group address.
+
+    Parameters
+    ----------
+    mapping : dict
+        A mapping from group address to name and dtype, see `get_mapping`.
+        Optional fields configure a filter, see `logger.filters`.
+    schema : str | ModuleType
+        Schema the telegrams are stored in, see `logger.util.get_orm`
+
+    Returns
+    -------
+    GATable
+        A table with an entry for every raw group address, None if unmapped.
+
+    Raises
+    ------
+    ValueError
+        In case a dtype is not covered or a filter is invalid.
+
+    """
+    orm_module = get_orm(schema)
+    table: GATable = [None] * GA_COUNT
+    for address, meta in mapping.items():
+        dtype = meta["dtype"]
+        try:
+            xknx_class = DTYPE2XKNX[dtype]
+        except KeyError as err:
+            error_msg = f"{dtype} of {address} not covered by DTYPE2XKNX."
+            raise ValueError(error_msg) from err
+
+        group_address = GroupAddress(address)
+        columns: dict[str, Any] = {"name": meta["name"]}
+        # The unified schema has a single table, see logger.orm_unified
+        if hasattr(orm_module, "DTYPES"):
+            # All value columns are set, executemany needs the same keys for each row
+            orm_class = orm_module.Telegram
+            dtype_id, value_column = orm_module.DTYPES[dtype]
+            columns.update(dict.fromkeys(column.name for column in orm_class.__table__.columns if column.name.startswith("value_")))
+            columns["dtype_id"] = dtype_id
+        else:
+            orm_class = getattr(orm_module, xknx2name(xknx_class))
+            value_column = "value"
+
+        # Addresses are either stored as raw integers or strings
+        table_columns = orm_class.__table__.columns
+        int_addresses = isinstance(table_columns["dst"].type, Integer)
+        columns["dst"] = group_address.raw if int_addresses else str(group_address)
+
+        # Names might be stored in the groupaddress table instead, see `logger.schema.sync_groupaddresses`
+        if "name" not in table_columns:
+            del columns["name"]
+
+        table[group_address.raw] = GroupAddressEntry(
+            address=str(group_address),
+            name=meta["name"],
+            dtype=dtype,
+            unit=get_unit(dtype),
+            decode=get_decoder(dtype),
+            orm_class=orm_class,
+            value_column=value_column,
+            columns=columns,
+            format_src=raw_address if int_addresses else str,
+            filter=get_filter(address, meta),
+        )
+
+    return table
@@ -0,0 +1,107 @@
+"""In-process counters of the logger, rendered in the Prometheus text format.
+
+The counters are plain integers updated from the hot path, i.e. the receive
+callback on the loop and the writer on its thread, without locks. They are
+only rendered on request, see `/metrics` of `logger.statusserver`.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+PREFIX = "knx_logger"
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Connection pool statistics, if the pool has them, e.g. the `QueuePool`
+POOL_STATS = ("size", "checkedin", "checkedout", "overflow")
+
+
+class Histogram:
+    """Counts of observed values per bucket."""
+
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize the histogram with the upper bounds of its buckets."""
+        self.buckets = buckets
+        # The last one counts the values above all bounds
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Count a value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def render(self, name: str) -> list[str]:
+        """Render the cumulative buckets, sum and count."""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+def escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def pool_stats(pool: Any) -> dict[str, int]:
+    """Get the statistics of a connection pool, see `POOL_STATS`."""
+    return {name: getattr(pool, name)() for name in POOL_STATS if callable(getattr(pool, name, None))}
+
+
+@dataclass
+class Metrics:
+    """Counters, histograms and gauges of the logger."""
+
+    received: int = 0
+    ignored: int = 0
+    filtered: int = 0
+    written: int = 0
+    decoded: Counter = field(default_factory=Counter)
+    failed: Counter = field(default_factory=Counter)
+    decode_latency: Histogram = field(default_factory=Histogram)
+    commit_latency: Histogram = field(default_factory=Histogram)
+    gauges: dict[str, float] = field(default_factory=dict)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines: list[str] = []
+
+        def add(name: str, kind: str, description: str, samples: list[str]) -> None:
+            lines.append(f"# HELP {PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            lines.extend(f"{PREFIX}_{sample}" for sample in samples)
+
+        add("telegrams_received_total", "counter", "Telegrams received.", [f"telegrams_received_total {self.received}"])
+        add("telegrams_ignored_total", "counter", "Telegrams ignored, i.e. not a group write.", [f"telegrams_ignored_total {self.ignored}"])
+        add(
+            "telegrams_decoded_total",
+            "counter",
+            "Telegrams decoded per dtype.",
+            [f'telegrams_decoded_total{{dtype="{escape(dtype)}"}} {count}' for dtype, count in sorted(self.decoded.items())],
+        )
+        add("telegrams_filtered_total", "counter", "Decoded values dropped by their filter.", [f"telegrams_filtered_total {self.filtered}"])
+        add("rows_written_total", "counter", "Rows committed to the database.", [f"rows_written_total {self.written}"])
+        add(
+            "failures_total",
+            "counter",
+            "Telegrams or rows failed per reason.",
+            [f'failures_total{{reason="{escape(reason)}"}} {count}' for reason, count in sorted(self.failed.items())],
+        )
+        add("decode_seconds", "histogram", "Latency of decoding a telegram.", self.decode_latency.render("decode_seconds"))
+        add("commit_seconds", "histogram", "Latency of committing a batch.", self.commit_latency.render("commit_seconds"))
+        for name, value in sorted(self.gauges.items()):
+            add(name, "gauge", name.replace("_", " ").capitalize() + ".", [f"{name} {value}"])
+        return "\n".join(lines) + "\n"
@@ -3,7 +3,7 @@
 from abc import abstractmethod
 from datetime import datetime
 
-from sqlalchemy import Column, types
+from sqlalchemy import Column, Index, types
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -35,6 +35,7 @@ class AbsoluteHumidity(KNXMixin, Base):
     """
 
     __tablename__ = "absolutehumidity"
+    __table_args__ = (Index("ix_absolutehumidity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -45,6 +46,7 @@ class AbsoluteTemperature(KNXMixin, Base):
     """
 
     __tablename__ = "absolutetemperature"
+    __table_args__ = (Index("ix_absolutetemperature_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -55,6 +57,7 @@ class Acceleration(KNXMixin, Base):
     """
 
     __tablename__ = "acceleration"
+    __table_args__ = (Index("ix_acceleration_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -65,6 +68,7 @@ class AccelerationAngular(KNXMixin, Base):
     """
 
     __tablename__ = "accelerationangular"
+    __table_args__ = (Index("ix_accelerationangular_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -75,6 +79,7 @@ class Ack(KNXMixin, Base):
     """
 
     __tablename__ = "ack"
+    __table_args__ = (Index("ix_ack_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -85,6 +90,7 @@ class ActivationEnergy(KNXMixin, Base):
     """
 
     __tablename__ = "activationenergy"
+    __table_args__ = (Index("ix_activationenergy_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -95,6 +101,7 @@ class ActiveEnergy(KNXMixin, Base):
     """
 
     __tablename__ = "activeenergy"
+    __table_args__ = (Index("ix_activeenergy_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -105,6 +112,7 @@ class ActiveEnergyMWh(KNXMixin, Base):
     """
 
     __tablename__ = "activeenergymwh"
+    __table_args__ = (Index("ix_activeenergymwh_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -115,6 +123,7 @@ class ActiveEnergykWh(KNXMixin, Base):
     """
 
     __tablename__ = "activeenergykwh"
+    __table_args__ = (Index("ix_activeenergykwh_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -125,6 +134,7 @@ class Activity(KNXMixin, Base):
     """
 
     __tablename__ = "activity"
+    __table_args__ = (Index("ix_activity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -135,6 +145,7 @@ class AirFlow(KNXMixin, Base):
     """
 
     __tablename__ = "airflow"
+    __table_args__ = (Index("ix_airflow_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -145,6 +156,7 @@ class Alarm(KNXMixin, Base):
     """
 
     __tablename__ = "alarm"
+    __table_args__ = (Index("ix_alarm_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -155,6 +167,7 @@ class Amplitude(KNXMixin, Base):
     """
 
     __tablename__ = "amplitude"
+    __table_args__ = (Index("ix_amplitude_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -165,6 +178,7 @@ class Angle(KNXMixin, Base):
     """
 
     __tablename__ = "angle"
+    __table_args__ = (Index("ix_angle_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -175,6 +189,7 @@ class AngleDeg(KNXMixin, Base):
     """
 
     __tablename__ = "angledeg"
+    __table_args__ = (Index("ix_angledeg_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -185,6 +200,7 @@ class AngleRad(KNXMixin, Base):
     """
 
     __tablename__ = "anglerad"
+    __table_args__ = (Index("ix_anglerad_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -195,6 +211,7 @@ class AngularFrequency(KNXMixin, Base):
     """
 
     __tablename__ = "angularfrequency"
+    __table_args__ = (Index("ix_angularfrequency_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -205,6 +222,7 @@ class AngularMomentum(KNXMixin, Base):
     """
 
     __tablename__ = "angularmomentum"
+    __table_args__ = (Index("ix_angularmomentum_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -215,6 +233,7 @@ class AngularVelocity(KNXMixin, Base):
     """
 
     __tablename__ = "angularvelocity"
+    __table_args__ = (Index("ix_angularvelocity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -225,6 +244,7 @@ class ApparantEnergy(KNXMixin, Base):
     """
 
     __tablename__ = "apparantenergy"
+    __table_args__ = (Index("ix_apparantenergy_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -235,6 +255,7 @@ class ApparantEnergykVAh(KNXMixin, Base):
     """
 
     __tablename__ = "apparantenergykvah"
+    __table_args__ = (Index("ix_apparantenergykvah_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -245,6 +266,7 @@ class ApparentPower(KNXMixin, Base):
     """
 
     __tablename__ = "apparentpower"
+    __table_args__ = (Index("ix_apparentpower_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -255,6 +277,7 @@ class Area(KNXMixin, Base):
     """
 
     __tablename__ = "area"
+    __table_args__ = (Index("ix_area_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -265,6 +288,7 @@ class Binary(KNXMixin, Base):
     """
 
     __tablename__ = "binary"
+    __table_args__ = (Index("ix_binary_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -275,6 +299,7 @@ class BinaryValue(KNXMixin, Base):
     """
 
     __tablename__ = "binaryvalue"
+    __table_args__ = (Index("ix_binaryvalue_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -285,6 +310,7 @@ class Bool(KNXMixin, Base):
     """
 
     __tablename__ = "bool"
+    __table_args__ = (Index("ix_bool_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -295,6 +321,7 @@ class Brightness(KNXMixin, Base):
     """
 
     __tablename__ = "brightness"
+    __table_args__ = (Index("ix_brightness_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -305,6 +332,7 @@ class Capacitance(KNXMixin, Base):
     """
 
     __tablename__ = "capacitance"
+    __table_args__ = (Index("ix_capacitance_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -315,6 +343,7 @@ class ChargeDensitySurface(KNXMixin, Base):
     """
 
     __tablename__ = "chargedensitysurface"
+    __table_args__ = (Index("ix_chargedensitysurface_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -325,6 +354,7 @@ class ChargeDensityVolume(KNXMixin, Base):
     """
 
     __tablename__ = "chargedensityvolume"
+    __table_args__ = (Index("ix_chargedensityvolume_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -335,6 +365,7 @@ class ColorRGB(KNXMixin, Base):
     """
 
     __tablename__ = "colorrgb"
+    __table_args__ = (Index("ix_colorrgb_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -345,6 +376,7 @@ class ColorRGBW(KNXMixin, Base):
     """
 
     __tablename__ = "colorrgbw"
+    __table_args__ = (Index("ix_colorrgbw_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -355,6 +387,7 @@ class ColorTemperature(KNXMixin, Base):
     """
 
     __tablename__ = "colortemperature"
+    __table_args__ = (Index("ix_colortemperature_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -365,6 +398,7 @@ class ColorXYY(KNXMixin, Base):
     """
 
     __tablename__ = "colorxyy"
+    __table_args__ = (Index("ix_colorxyy_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -375,6 +409,7 @@ class CommonTemperature(KNXMixin, Base):
     """
 
     __tablename__ = "commontemperature"
+    __table_args__ = (Index("ix_commontemperature_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -385,6 +420,7 @@ class Compressibility(KNXMixin, Base):
     """
 
     __tablename__ = "compressibility"
+    __table_args__ = (Index("ix_compressibility_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -395,6 +431,7 @@ class ConcentrationUGM3(KNXMixin, Base):
     """
 
     __tablename__ = "concentrationugm3"
+    __table_args__ = (Index("ix_concentrationugm3_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -405,6 +442,7 @@ class Conductance(KNXMixin, Base):
     """
 
     __tablename__ = "conductance"
+    __table_args__ = (Index("ix_conductance_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -415,6 +453,7 @@ class ConsumerProducer(KNXMixin, Base):
     """
 
     __tablename__ = "consumerproducer"
+    __table_args__ = (Index("ix_consumerproducer_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -425,6 +464,7 @@ class ControlBlinds(KNXMixin, Base):
     """
 
     __tablename__ = "controlblinds"
+    __table_args__ = (Index("ix_controlblinds_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -435,6 +475,7 @@ class ControlDimming(KNXMixin, Base):
     """
 
     __tablename__ = "controldimming"
+    __table_args__ = (Index("ix_controldimming_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -445,6 +486,7 @@ class Current(KNXMixin, Base):
     """
 
     __tablename__ = "current"
+    __table_args__ = (Index("ix_current_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -455,6 +497,7 @@ class Date(KNXMixin, Base):
     """
 
     __tablename__ = "date"
+    __table_args__ = (Index("ix_date_dst_time", "dst", "time"),)
     value = Column(types.Date)
 
 
@@ -465,6 +508,7 @@ class DateTime(KNXMixin, Base):
     """
 
     __tablename__ = "datetime"
+    __table_args__ = (Index("ix_datetime_dst_time", "dst", "time"),)
     value = Column(types.DateTime)
 
 
@@ -475,6 +519,7 @@ class DayNight(KNXMixin, Base):
     """
 
     __tablename__ = "daynight"
+    __table_args__ = (Index("ix_daynight_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -485,6 +530,7 @@ class DecimalFactor(KNXMixin, Base):
     """
 
     __tablename__ = "decimalfactor"
+    __table_args__ = (Index("ix_decimalfactor_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -495,6 +541,7 @@ class DeltaTime100Msec(KNXMixin, Base):
     """
 
     __tablename__ = "deltatime100msec"
+    __table_args__ = (Index("ix_deltatime100msec_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -505,6 +552,7 @@ class DeltaTime10Msec(KNXMixin, Base):
     """
 
     __tablename__ = "deltatime10msec"
+    __table_args__ = (Index("ix_deltatime10msec_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -515,6 +563,7 @@ class DeltaTimeHrs(KNXMixin, Base):
     """
 
     __tablename__ = "deltatimehrs"
+    __table_args__ = (Index("ix_deltatimehrs_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -525,6 +574,7 @@ class DeltaTimeMin(KNXMixin, Base):
     """
 
     __tablename__ = "deltatimemin"
+    __table_args__ = (Index("ix_deltatimemin_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -535,6 +585,7 @@ class DeltaTimeMsec(KNXMixin, Base):
     """
 
     __tablename__ = "deltatimemsec"
+    __table_args__ = (Index("ix_deltatimemsec_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -545,6 +596,7 @@ class DeltaTimeSec(KNXMixin, Base):
     """
 
     __tablename__ = "deltatimesec"
+    __table_args__ = (Index("ix_deltatimesec_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -555,6 +607,7 @@ class Density(KNXMixin, Base):
     """
 
     __tablename__ = "density"
+    __table_args__ = (Index("ix_density_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -565,6 +618,7 @@ class DimSendStyle(KNXMixin, Base):
     """
 
     __tablename__ = "dimsendstyle"
+    __table_args__ = (Index("ix_dimsendstyle_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -575,6 +629,7 @@ class ElectricCharge(KNXMixin, Base):
     """
 
     __tablename__ = "electriccharge"
+    __table_args__ = (Index("ix_electriccharge_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -585,6 +640,7 @@ class ElectricCurrent(KNXMixin, Base):
     """
 
     __tablename__ = "electriccurrent"
+    __table_args__ = (Index("ix_electriccurrent_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -595,6 +651,7 @@ class ElectricCurrentDensity(KNXMixin, Base):
     """
 
     __tablename__ = "electriccurrentdensity"
+    __table_args__ = (Index("ix_electriccurrentdensity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -605,6 +662,7 @@ class ElectricDipoleMoment(KNXMixin, Base):
     """
 
     __tablename__ = "electricdipolemoment"
+    __table_args__ = (Index("ix_electricdipolemoment_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -615,6 +673,7 @@ class ElectricDisplacement(KNXMixin, Base):
     """
 
     __tablename__ = "electricdisplacement"
+    __table_args__ = (Index("ix_electricdisplacement_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -625,6 +684,7 @@ class ElectricFieldStrength(KNXMixin, Base):
     """
 
     __tablename__ = "electricfieldstrength"
+    __table_args__ = (Index("ix_electricfieldstrength_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -635,6 +695,7 @@ class ElectricFlux(KNXMixin, Base):
     """
 
     __tablename__ = "electricflux"
+    __table_args__ = (Index("ix_electricflux_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -645,6 +706,7 @@ class ElectricFluxDensity(KNXMixin, Base):
     """
 
     __tablename__ = "electricfluxdensity"
+    __table_args__ = (Index("ix_electricfluxdensity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -655,6 +717,7 @@ class ElectricPolarization(KNXMixin, Base):
     """
 
     __tablename__ = "electricpolarization"
+    __table_args__ = (Index("ix_electricpolarization_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -665,6 +728,7 @@ class ElectricPotential(KNXMixin, Base):
     """
 
     __tablename__ = "electricpotential"
+    __table_args__ = (Index("ix_electricpotential_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -675,6 +739,7 @@ class ElectricPotentialDifference(KNXMixin, Base):
     """
 
     __tablename__ = "electricpotentialdifference"
+    __table_args__ = (Index("ix_electricpotentialdifference_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -685,6 +750,7 @@ class ElectricalConductivity(KNXMixin, Base):
     """
 
     __tablename__ = "electricalconductivity"
+    __table_args__ = (Index("ix_electricalconductivity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -695,6 +761,7 @@ class ElectromagneticMoment(KNXMixin, Base):
     """
 
     __tablename__ = "electromagneticmoment"
+    __table_args__ = (Index("ix_electromagneticmoment_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -705,6 +772,7 @@ class ElectromotiveForce(KNXMixin, Base):
     """
 
     __tablename__ = "electromotiveforce"
+    __table_args__ = (Index("ix_electromotiveforce_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -715,6 +783,7 @@ class Enable(KNXMixin, Base):
     """
 
     __tablename__ = "enable"
+    __table_args__ = (Index("ix_enable_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -725,6 +794,7 @@ class Energy(KNXMixin, Base):
     """
 
     __tablename__ = "energy"
+    __table_args__ = (Index("ix_energy_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -735,6 +805,7 @@ class EnergyDirection(KNXMixin, Base):
     """
 
     __tablename__ = "energydirection"
+    __table_args__ = (Index("ix_energydirection_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -745,6 +816,7 @@ class Enthalpy(KNXMixin, Base):
     """
 
     __tablename__ = "enthalpy"
+    __table_args__ = (Index("ix_enthalpy_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -755,6 +827,7 @@ class FlowRateM3H(KNXMixin, Base):
     """
 
     __tablename__ = "flowratem3h"
+    __table_args__ = (Index("ix_flowratem3h_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -765,6 +838,7 @@ class Force(KNXMixin, Base):
     """
 
     __tablename__ = "force"
+    __table_args__ = (Index("ix_force_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -775,6 +849,7 @@ class FourByteFloat(KNXMixin, Base):
     """
 
     __tablename__ = "fourbytefloat"
+    __table_args__ = (Index("ix_fourbytefloat_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -785,6 +860,7 @@ class FourByteSigned(KNXMixin, Base):
     """
 
     __tablename__ = "fourbytesigned"
+    __table_args__ = (Index("ix_fourbytesigned_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -795,6 +871,7 @@ class FourByteUnsigned(KNXMixin, Base):
     """
 
     __tablename__ = "fourbyteunsigned"
+    __table_args__ = (Index("ix_fourbyteunsigned_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -805,6 +882,7 @@ class Frequency(KNXMixin, Base):
     """
 
     __tablename__ = "frequency"
+    __table_args__ = (Index("ix_frequency_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -815,6 +893,7 @@ class HVACContrMode(KNXMixin, Base):
     """
 
     __tablename__ = "hvaccontrmode"
+    __table_args__ = (Index("ix_hvaccontrmode_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -825,6 +904,7 @@ class HVACMode(KNXMixin, Base):
     """
 
     __tablename__ = "hvacmode"
+    __table_args__ = (Index("ix_hvacmode_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -835,6 +915,7 @@ class HVACStatus(KNXMixin, Base):
     """
 
     __tablename__ = "hvacstatus"
+    __table_args__ = (Index("ix_hvacstatus_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -845,6 +926,7 @@ class HeatCapacity(KNXMixin, Base):
     """
 
     __tablename__ = "heatcapacity"
+    __table_args__ = (Index("ix_heatcapacity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -855,6 +937,7 @@ class HeatCool(KNXMixin, Base):
     """
 
     __tablename__ = "heatcool"
+    __table_args__ = (Index("ix_heatcool_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -865,6 +948,7 @@ class HeatFlowRate(KNXMixin, Base):
     """
 
     __tablename__ = "heatflowrate"
+    __table_args__ = (Index("ix_heatflowrate_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -875,6 +959,7 @@ class HeatQuantity(KNXMixin, Base):
     """
 
     __tablename__ = "heatquantity"
+    __table_args__ = (Index("ix_heatquantity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -885,6 +970,7 @@ class Humidity(KNXMixin, Base):
     """
 
     __tablename__ = "humidity"
+    __table_args__ = (Index("ix_humidity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -895,6 +981,7 @@ class Impedance(KNXMixin, Base):
     """
 
     __tablename__ = "impedance"
+    __table_args__ = (Index("ix_impedance_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -905,6 +992,7 @@ class InputSource(KNXMixin, Base):
     """
 
     __tablename__ = "inputsource"
+    __table_args__ = (Index("ix_inputsource_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -915,6 +1003,7 @@ class Invert(KNXMixin, Base):
     """
 
     __tablename__ = "invert"
+    __table_args__ = (Index("ix_invert_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -925,6 +1014,7 @@ class KelvinPerPercent(KNXMixin, Base):
     """
 
     __tablename__ = "kelvinperpercent"
+    __table_args__ = (Index("ix_kelvinperpercent_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -935,6 +1025,7 @@ class Latin1(KNXMixin, Base):
     """
 
     __tablename__ = "latin1"
+    __table_args__ = (Index("ix_latin1_dst_time", "dst", "time"),)
     value = Column(types.String(14))
 
 
@@ -945,6 +1036,7 @@ class Length(KNXMixin, Base):
     """
 
     __tablename__ = "length"
+    __table_args__ = (Index("ix_length_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -955,6 +1047,7 @@ class LengthM(KNXMixin, Base):
     """
 
     __tablename__ = "lengthm"
+    __table_args__ = (Index("ix_lengthm_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -965,6 +1058,7 @@ class LengthMm(KNXMixin, Base):
     """
 
     __tablename__ = "lengthmm"
+    __table_args__ = (Index("ix_lengthmm_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -975,6 +1069,7 @@ class LightQuantity(KNXMixin, Base):
     """
 
     __tablename__ = "lightquantity"
+    __table_args__ = (Index("ix_lightquantity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -985,6 +1080,7 @@ class LogicalFunction(KNXMixin, Base):
     """
 
     __tablename__ = "logicalfunction"
+    __table_args__ = (Index("ix_logicalfunction_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -995,6 +1091,7 @@ class LongDeltaTimeSec(KNXMixin, Base):
     """
 
     __tablename__ = "longdeltatimesec"
+    __table_args__ = (Index("ix_longdeltatimesec_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1005,6 +1102,7 @@ class LongTimePeriodHrs(KNXMixin, Base):
     """
 
     __tablename__ = "longtimeperiodhrs"
+    __table_args__ = (Index("ix_longtimeperiodhrs_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1015,6 +1113,7 @@ class LongTimePeriodMin(KNXMixin, Base):
     """
 
     __tablename__ = "longtimeperiodmin"
+    __table_args__ = (Index("ix_longtimeperiodmin_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1025,6 +1124,7 @@ class LongTimePeriodSec(KNXMixin, Base):
     """
 
     __tablename__ = "longtimeperiodsec"
+    __table_args__ = (Index("ix_longtimeperiodsec_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1035,6 +1135,7 @@ class Luminance(KNXMixin, Base):
     """
 
     __tablename__ = "luminance"
+    __table_args__ = (Index("ix_luminance_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1045,6 +1146,7 @@ class LuminousFlux(KNXMixin, Base):
     """
 
     __tablename__ = "luminousflux"
+    __table_args__ = (Index("ix_luminousflux_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1055,6 +1157,7 @@ class LuminousIntensity(KNXMixin, Base):
     """
 
     __tablename__ = "luminousintensity"
+    __table_args__ = (Index("ix_luminousintensity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1065,6 +1168,7 @@ class Lux(KNXMixin, Base):
     """
 
     __tablename__ = "lux"
+    __table_args__ = (Index("ix_lux_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1075,6 +1179,7 @@ class MagneticFieldStrength(KNXMixin, Base):
     """
 
     __tablename__ = "magneticfieldstrength"
+    __table_args__ = (Index("ix_magneticfieldstrength_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1085,6 +1190,7 @@ class MagneticFlux(KNXMixin, Base):
     """
 
     __tablename__ = "magneticflux"
+    __table_args__ = (Index("ix_magneticflux_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1095,6 +1201,7 @@ class MagneticFluxDensity(KNXMixin, Base):
     """
 
     __tablename__ = "magneticfluxdensity"
+    __table_args__ = (Index("ix_magneticfluxdensity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1105,6 +1212,7 @@ class MagneticMoment(KNXMixin, Base):
     """
 
     __tablename__ = "magneticmoment"
+    __table_args__ = (Index("ix_magneticmoment_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1115,6 +1223,7 @@ class MagneticPolarization(KNXMixin, Base):
     """
 
     __tablename__ = "magneticpolarization"
+    __table_args__ = (Index("ix_magneticpolarization_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1125,6 +1234,7 @@ class Magnetization(KNXMixin, Base):
     """
 
     __tablename__ = "magnetization"
+    __table_args__ = (Index("ix_magnetization_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1135,6 +1245,7 @@ class MagnetomotiveForce(KNXMixin, Base):
     """
 
     __tablename__ = "magnetomotiveforce"
+    __table_args__ = (Index("ix_magnetomotiveforce_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1145,6 +1256,7 @@ class Mass(KNXMixin, Base):
     """
 
     __tablename__ = "mass"
+    __table_args__ = (Index("ix_mass_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1155,6 +1267,7 @@ class MassFlux(KNXMixin, Base):
     """
 
     __tablename__ = "massflux"
+    __table_args__ = (Index("ix_massflux_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1165,6 +1278,7 @@ class Mol(KNXMixin, Base):
     """
 
     __tablename__ = "mol"
+    __table_args__ = (Index("ix_mol_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1175,6 +1289,7 @@ class Momentum(KNXMixin, Base):
     """
 
     __tablename__ = "momentum"
+    __table_args__ = (Index("ix_momentum_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1185,6 +1300,7 @@ class Occupancy(KNXMixin, Base):
     """
 
     __tablename__ = "occupancy"
+    __table_args__ = (Index("ix_occupancy_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1195,6 +1311,7 @@ class OpenClose(KNXMixin, Base):
     """
 
     __tablename__ = "openclose"
+    __table_args__ = (Index("ix_openclose_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1205,6 +1322,7 @@ class PartsPerMillion(KNXMixin, Base):
     """
 
     __tablename__ = "partspermillion"
+    __table_args__ = (Index("ix_partspermillion_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1215,6 +1333,7 @@ class PercentU8(KNXMixin, Base):
     """
 
     __tablename__ = "percentu8"
+    __table_args__ = (Index("ix_percentu8_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1225,6 +1344,7 @@ class PercentV16(KNXMixin, Base):
     """
 
     __tablename__ = "percentv16"
+    __table_args__ = (Index("ix_percentv16_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1235,6 +1355,7 @@ class PercentV8(KNXMixin, Base):
     """
 
     __tablename__ = "percentv8"
+    __table_args__ = (Index("ix_percentv8_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1245,6 +1366,7 @@ class PhaseAngleDeg(KNXMixin, Base):
     """
 
     __tablename__ = "phaseangledeg"
+    __table_args__ = (Index("ix_phaseangledeg_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1255,6 +1377,7 @@ class PhaseAngleRad(KNXMixin, Base):
     """
 
     __tablename__ = "phaseanglerad"
+    __table_args__ = (Index("ix_phaseanglerad_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1265,6 +1388,7 @@ class Power(KNXMixin, Base):
     """
 
     __tablename__ = "power"
+    __table_args__ = (Index("ix_power_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1275,6 +1399,7 @@ class PowerDensity(KNXMixin, Base):
     """
 
     __tablename__ = "powerdensity"
+    __table_args__ = (Index("ix_powerdensity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1285,6 +1410,7 @@ class PowerFactor(KNXMixin, Base):
     """
 
     __tablename__ = "powerfactor"
+    __table_args__ = (Index("ix_powerfactor_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1295,6 +1421,7 @@ class Pressure(KNXMixin, Base):
     """
 
     __tablename__ = "pressure"
+    __table_args__ = (Index("ix_pressure_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1305,6 +1432,7 @@ class PropDataType(KNXMixin, Base):
     """
 
     __tablename__ = "propdatatype"
+    __table_args__ = (Index("ix_propdatatype_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1315,6 +1443,7 @@ class RainAmount(KNXMixin, Base):
     """
 
     __tablename__ = "rainamount"
+    __table_args__ = (Index("ix_rainamount_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1325,6 +1454,7 @@ class Ramp(KNXMixin, Base):
     """
 
     __tablename__ = "ramp"
+    __table_args__ = (Index("ix_ramp_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1335,6 +1465,7 @@ class Reactance(KNXMixin, Base):
     """
 
     __tablename__ = "reactance"
+    __table_args__ = (Index("ix_reactance_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1345,6 +1476,7 @@ class ReactiveEnergy(KNXMixin, Base):
     """
 
     __tablename__ = "reactiveenergy"
+    __table_args__ = (Index("ix_reactiveenergy_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1355,6 +1487,7 @@ class ReactiveEnergykVARh(KNXMixin, Base):
     """
 
     __tablename__ = "reactiveenergykvarh"
+    __table_args__ = (Index("ix_reactiveenergykvarh_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1365,6 +1498,7 @@ class Reset(KNXMixin, Base):
     """
 
     __tablename__ = "reset"
+    __table_args__ = (Index("ix_reset_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1375,6 +1509,7 @@ class Resistance(KNXMixin, Base):
     """
 
     __tablename__ = "resistance"
+    __table_args__ = (Index("ix_resistance_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1385,6 +1520,7 @@ class Resistivity(KNXMixin, Base):
     """
 
     __tablename__ = "resistivity"
+    __table_args__ = (Index("ix_resistivity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1395,6 +1531,7 @@ class RotationAngle(KNXMixin, Base):
     """
 
     __tablename__ = "rotationangle"
+    __table_args__ = (Index("ix_rotationangle_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1405,6 +1542,7 @@ class Scaling(KNXMixin, Base):
     """
 
     __tablename__ = "scaling"
+    __table_args__ = (Index("ix_scaling_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1415,6 +1553,7 @@ class SceneAB(KNXMixin, Base):
     """
 
     __tablename__ = "sceneab"
+    __table_args__ = (Index("ix_sceneab_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1425,6 +1564,7 @@ class SceneControl(KNXMixin, Base):
     """
 
     __tablename__ = "scenecontrol"
+    __table_args__ = (Index("ix_scenecontrol_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1435,6 +1575,7 @@ class SceneNumber(KNXMixin, Base):
     """
 
     __tablename__ = "scenenumber"
+    __table_args__ = (Index("ix_scenenumber_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1445,6 +1586,7 @@ class SelfInductance(KNXMixin, Base):
     """
 
     __tablename__ = "selfinductance"
+    __table_args__ = (Index("ix_selfinductance_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1455,6 +1597,7 @@ class ShutterBlindsMode(KNXMixin, Base):
     """
 
     __tablename__ = "shutterblindsmode"
+    __table_args__ = (Index("ix_shutterblindsmode_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1465,6 +1608,7 @@ class SignedRelativeValue(KNXMixin, Base):
     """
 
     __tablename__ = "signedrelativevalue"
+    __table_args__ = (Index("ix_signedrelativevalue_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1475,6 +1619,7 @@ class SolidAngle(KNXMixin, Base):
     """
 
     __tablename__ = "solidangle"
+    __table_args__ = (Index("ix_solidangle_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1485,6 +1630,7 @@ class SoundIntensity(KNXMixin, Base):
     """
 
     __tablename__ = "soundintensity"
+    __table_args__ = (Index("ix_soundintensity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1495,6 +1641,7 @@ class Speed(KNXMixin, Base):
     """
 
     __tablename__ = "speed"
+    __table_args__ = (Index("ix_speed_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1505,6 +1652,7 @@ class Start(KNXMixin, Base):
     """
 
     __tablename__ = "start"
+    __table_args__ = (Index("ix_start_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1515,6 +1663,7 @@ class State(KNXMixin, Base):
     """
 
     __tablename__ = "state"
+    __table_args__ = (Index("ix_state_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1525,6 +1674,7 @@ class Step(KNXMixin, Base):
     """
 
     __tablename__ = "step"
+    __table_args__ = (Index("ix_step_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1535,6 +1685,7 @@ class Stress(KNXMixin, Base):
     """
 
     __tablename__ = "stress"
+    __table_args__ = (Index("ix_stress_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1545,6 +1696,7 @@ class String(KNXMixin, Base):
     """
 
     __tablename__ = "string"
+    __table_args__ = (Index("ix_string_dst_time", "dst", "time"),)
     value = Column(types.String(14))
 
 
@@ -1555,6 +1707,7 @@ class SurfaceTension(KNXMixin, Base):
     """
 
     __tablename__ = "surfacetension"
+    __table_args__ = (Index("ix_surfacetension_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1565,6 +1718,7 @@ class Switch(KNXMixin, Base):
     """
 
     __tablename__ = "switch"
+    __table_args__ = (Index("ix_switch_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1575,6 +1729,7 @@ class Tariff(KNXMixin, Base):
     """
 
     __tablename__ = "tariff"
+    __table_args__ = (Index("ix_tariff_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1585,6 +1740,7 @@ class TariffActiveEnergy(KNXMixin, Base):
     """
 
     __tablename__ = "tariffactiveenergy"
+    __table_args__ = (Index("ix_tariffactiveenergy_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1595,6 +1751,7 @@ class Temperature(KNXMixin, Base):
     """
 
     __tablename__ = "temperature"
+    __table_args__ = (Index("ix_temperature_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1605,6 +1762,7 @@ class TemperatureA(KNXMixin, Base):
     """
 
     __tablename__ = "temperaturea"
+    __table_args__ = (Index("ix_temperaturea_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1615,6 +1773,7 @@ class TemperatureDifference(KNXMixin, Base):
     """
 
     __tablename__ = "temperaturedifference"
+    __table_args__ = (Index("ix_temperaturedifference_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1625,6 +1784,7 @@ class TemperatureF(KNXMixin, Base):
     """
 
     __tablename__ = "temperaturef"
+    __table_args__ = (Index("ix_temperaturef_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1635,6 +1795,7 @@ class ThermalCapacity(KNXMixin, Base):
     """
 
     __tablename__ = "thermalcapacity"
+    __table_args__ = (Index("ix_thermalcapacity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1645,6 +1806,7 @@ class ThermalConductivity(KNXMixin, Base):
     """
 
     __tablename__ = "thermalconductivity"
+    __table_args__ = (Index("ix_thermalconductivity_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1655,6 +1817,7 @@ class ThermoelectricPower(KNXMixin, Base):
     """
 
     __tablename__ = "thermoelectricpower"
+    __table_args__ = (Index("ix_thermoelectricpower_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1665,6 +1828,7 @@ class Time(KNXMixin, Base):
     """
 
     __tablename__ = "time"
+    __table_args__ = (Index("ix_time_dst_time", "dst", "time"),)
     value = Column(types.Time)
 
 
@@ -1675,6 +1839,7 @@ class Time1(KNXMixin, Base):
     """
 
     __tablename__ = "time1"
+    __table_args__ = (Index("ix_time1_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1685,6 +1850,7 @@ class Time2(KNXMixin, Base):
     """
 
     __tablename__ = "time2"
+    __table_args__ = (Index("ix_time2_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1695,6 +1861,7 @@ class TimePeriod100Msec(KNXMixin, Base):
     """
 
     __tablename__ = "timeperiod100msec"
+    __table_args__ = (Index("ix_timeperiod100msec_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1705,6 +1872,7 @@ class TimePeriod10Msec(KNXMixin, Base):
     """
 
     __tablename__ = "timeperiod10msec"
+    __table_args__ = (Index("ix_timeperiod10msec_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1715,6 +1883,7 @@ class TimePeriodHrs(KNXMixin, Base):
     """
 
     __tablename__ = "timeperiodhrs"
+    __table_args__ = (Index("ix_timeperiodhrs_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1725,6 +1894,7 @@ class TimePeriodMin(KNXMixin, Base):
     """
 
     __tablename__ = "timeperiodmin"
+    __table_args__ = (Index("ix_timeperiodmin_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1735,6 +1905,7 @@ class TimePeriodMsec(KNXMixin, Base):
     """
 
     __tablename__ = "timeperiodmsec"
+    __table_args__ = (Index("ix_timeperiodmsec_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1745,6 +1916,7 @@ class TimePeriodSec(KNXMixin, Base):
     """
 
     __tablename__ = "timeperiodsec"
+    __table_args__ = (Index("ix_timeperiodsec_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1755,6 +1927,7 @@ class TimeSeconds(KNXMixin, Base):
     """
 
     __tablename__ = "timeseconds"
+    __table_args__ = (Index("ix_timeseconds_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1765,6 +1938,7 @@ class Torque(KNXMixin, Base):
     """
 
     __tablename__ = "torque"
+    __table_args__ = (Index("ix_torque_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1775,6 +1949,7 @@ class Trigger(KNXMixin, Base):
     """
 
     __tablename__ = "trigger"
+    __table_args__ = (Index("ix_trigger_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1785,6 +1960,7 @@ class TwoByteFloat(KNXMixin, Base):
     """
 
     __tablename__ = "twobytefloat"
+    __table_args__ = (Index("ix_twobytefloat_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1795,6 +1971,7 @@ class TwoByteSigned(KNXMixin, Base):
     """
 
     __tablename__ = "twobytesigned"
+    __table_args__ = (Index("ix_twobytesigned_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1805,6 +1982,7 @@ class TwoByteUnsigned(KNXMixin, Base):
     """
 
     __tablename__ = "twobyteunsigned"
+    __table_args__ = (Index("ix_twobyteunsigned_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1815,6 +1993,7 @@ class TwoUcount(KNXMixin, Base):
     """
 
     __tablename__ = "twoucount"
+    __table_args__ = (Index("ix_twoucount_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1825,6 +2004,7 @@ class UElCurrentmA(KNXMixin, Base):
     """
 
     __tablename__ = "uelcurrentma"
+    __table_args__ = (Index("ix_uelcurrentma_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1835,6 +2015,7 @@ class UpDown(KNXMixin, Base):
     """
 
     __tablename__ = "updown"
+    __table_args__ = (Index("ix_updown_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1845,6 +2026,7 @@ class Value1ByteUnsigned(KNXMixin, Base):
     """
 
     __tablename__ = "value1byteunsigned"
+    __table_args__ = (Index("ix_value1byteunsigned_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1855,6 +2037,7 @@ class Value1Count(KNXMixin, Base):
     """
 
     __tablename__ = "value1count"
+    __table_args__ = (Index("ix_value1count_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1865,6 +2048,7 @@ class Value1Ucount(KNXMixin, Base):
     """
 
     __tablename__ = "value1ucount"
+    __table_args__ = (Index("ix_value1ucount_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1875,6 +2059,7 @@ class Value2Count(KNXMixin, Base):
     """
 
     __tablename__ = "value2count"
+    __table_args__ = (Index("ix_value2count_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1885,6 +2070,7 @@ class Value4Count(KNXMixin, Base):
     """
 
     __tablename__ = "value4count"
+    __table_args__ = (Index("ix_value4count_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1895,6 +2081,7 @@ class Value4Ucount(KNXMixin, Base):
     """
 
     __tablename__ = "value4ucount"
+    __table_args__ = (Index("ix_value4ucount_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1905,6 +2092,7 @@ class Voltage(KNXMixin, Base):
     """
 
     __tablename__ = "voltage"
+    __table_args__ = (Index("ix_voltage_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1915,6 +2103,7 @@ class Volume(KNXMixin, Base):
     """
 
     __tablename__ = "volume"
+    __table_args__ = (Index("ix_volume_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1925,6 +2114,7 @@ class VolumeFlow(KNXMixin, Base):
     """
 
     __tablename__ = "volumeflow"
+    __table_args__ = (Index("ix_volumeflow_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1935,6 +2125,7 @@ class VolumeFlux(KNXMixin, Base):
     """
 
     __tablename__ = "volumeflux"
+    __table_args__ = (Index("ix_volumeflux_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1945,6 +2136,7 @@ class VolumeLiquidLitre(KNXMixin, Base):
     """
 
     __tablename__ = "volumeliquidlitre"
+    __table_args__ = (Index("ix_volumeliquidlitre_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1955,6 +2147,7 @@ class VolumeM3(KNXMixin, Base):
     """
 
     __tablename__ = "volumem3"
+    __table_args__ = (Index("ix_volumem3_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1965,6 +2158,7 @@ class Weight(KNXMixin, Base):
     """
 
     __tablename__ = "weight"
+    __table_args__ = (Index("ix_weight_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1975,6 +2169,7 @@ class WindowDoor(KNXMixin, Base):
     """
 
     __tablename__ = "windowdoor"
+    __table_args__ = (Index("ix_windowdoor_dst_time", "dst", "time"),)
     value = Column(types.Integer)
 
 
@@ -1985,6 +2180,7 @@ class Work(KNXMixin, Base):
     """
 
     __tablename__ = "work"
+    __table_args__ = (Index("ix_work_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -1995,6 +2191,7 @@ class Wsp(KNXMixin, Base):
     """
 
     __tablename__ = "wsp"
+    __table_args__ = (Index("ix_wsp_dst_time", "dst", "time"),)
     value = Column(types.Float)
 
 
@@ -2005,4 +2202,5 @@ class WspKmh(KNXMixin, Base):
     """
 
     __tablename__ = "wspkmh"
+    __table_args__ = (Index("ix_wspkmh_dst_time", "dst", "time"),)
     value = Column(types.Float)
@@ -0,0 +1,248 @@
+"""Autogenerated by logger/codegen/gen_orm.py."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Index, types
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+# dtype: (dtype_id, value column)
+DTYPES = {
+    "DPST-1-1": (100001, "value_int"),
+    "DPST-1-2": (100002, "value_int"),
+    "DPST-1-3": (100003, "value_int"),
+    "DPST-1-4": (100004, "value_int"),
+    "DPST-1-5": (100005, "value_int"),
+    "DPST-1-6": (100006, "value_int"),
+    "DPST-1-7": (100007, "value_int"),
+    "DPST-1-8": (100008, "value_int"),
+    "DPST-1-9": (100009, "value_int"),
+    "DPST-1-10": (100010, "value_int"),
+    "DPST-1-11": (100011, "value_int"),
+    "DPST-1-12": (100012, "value_int"),
+    "DPST-1-13": (100013, "value_int"),
+    "DPST-1-14": (100014, "value_int"),
+    "DPST-1-15": (100015, "value_int"),
+    "DPST-1-16": (100016, "value_int"),
+    "DPST-1-17": (100017, "value_int"),
+    "DPST-1-18": (100018, "value_int"),
+    "DPST-1-19": (100019, "value_int"),
+    "DPST-1-21": (100021, "value_int"),
+    "DPST-1-22": (100022, "value_int"),
+    "DPST-1-23": (100023, "value_int"),
+    "DPST-1-24": (100024, "value_int"),
+    "DPST-1-100": (100100, "value_int"),
+    "DPST-1-1200": (101200, "value_int"),
+    "DPST-1-1201": (101201, "value_int"),
+    "DPT-1": (199999, "value_int"),
+    "DPST-2-1": (200001, "value_int"),
+    "DPST-2-2": (200002, "value_int"),
+    "DPST-3-7": (300007, "value_int"),
+    "DPST-3-8": (300008, "value_int"),
+    "DPST-5-1": (500001, "value_int"),
+    "DPST-5-3": (500003, "value_int"),
+    "DPST-5-4": (500004, "value_int"),
+    "DPST-5-5": (500005, "value_int"),
+    "DPST-5-6": (500006, "value_int"),
+    "DPST-5-10": (500010, "value_int"),
+    "DPT-5": (599999, "value_int"),
+    "DPST-6-1": (600001, "value_int"),
+    "DPST-6-10": (600010, "value_int"),
+    "DPST-6-20": (600020, "value_int"),
+    "DPT-6": (699999, "value_int"),
+    "DPST-7-1": (700001, "value_int"),
+    "DPST-7-2": (700002, "value_int"),
+    "DPST-7-3": (700003, "value_int"),
+    "DPST-7-4": (700004, "value_int"),
+    "DPST-7-5": (700005, "value_int"),
+    "DPST-7-6": (700006, "value_int"),
+    "DPST-7-7": (700007, "value_int"),
+    "DPST-7-10": (700010, "value_int"),
+    "DPST-7-11": (700011, "value_int"),
+    "DPST-7-12": (700012, "value_int"),
+    "DPST-7-13": (700013, "value_int"),
+    "DPST-7-600": (700600, "value_int"),
+    "DPT-7": (799999, "value_int"),
+    "DPST-8-1": (800001, "value_float"),
+    "DPST-8-2": (800002, "value_float"),
+    "DPST-8-3": (800003, "value_float"),
+    "DPST-8-4": (800004, "value_float"),
+    "DPST-8-5": (800005, "value_float"),
+    "DPST-8-6": (800006, "value_float"),
+    "DPST-8-7": (800007, "value_float"),
+    "DPST-8-10": (800010, "value_float"),
+    "DPST-8-11": (800011, "value_float"),
+    "DPST-8-12": (800012, "value_float"),
+    "DPT-8": (899999, "value_float"),
+    "DPST-9-1": (900001, "value_float"),
+    "DPST-9-2": (900002, "value_float"),
+    "DPST-9-3": (900003, "value_float"),
+    "DPST-9-4": (900004, "value_float"),
+    "DPST-9-5": (900005, "value_float"),
+    "DPST-9-6": (900006, "value_float"),
+    "DPST-9-7": (900007, "value_float"),
+    "DPST-9-8": (900008, "value_float"),
+    "DPST-9-9": (900009, "value_float"),
+    "DPST-9-10": (900010, "value_float"),
+    "DPST-9-11": (900011, "value_float"),
+    "DPST-9-20": (900020, "value_float"),
+    "DPST-9-21": (900021, "value_float"),
+    "DPST-9-22": (900022, "value_float"),
+    "DPST-9-23": (900023, "value_float"),
+    "DPST-9-24": (900024, "value_float"),
+    "DPST-9-25": (900025, "value_float"),
+    "DPST-9-26": (900026, "value_float"),
+    "DPST-9-27": (900027, "value_float"),
+    "DPST-9-28": (900028, "value_float"),
+    "DPST-9-29": (900029, "value_float"),
+    "DPST-9-30": (900030, "value_float"),
+    "DPST-9-60000": (960000, "value_float"),
+    "DPT-9": (999999, "value_float"),
+    "DPST-10-1": (1000001, "value_time"),
+    "DPST-11-1": (1100001, "value_date"),
+    "DPST-12-1": (1200001, "value_int"),
+    "DPST-12-100": (1200100, "value_int"),
+    "DPST-12-101": (1200101, "value_int"),
+    "DPST-12-102": (1200102, "value_int"),
+    "DPST-12-1200": (1201200, "value_int"),
+    "DPST-12-1201": (1201201, "value_int"),
+    "DPT-12": (1299999, "value_int"),
+    "DPST-13-1": (1300001, "value_int"),
+    "DPST-13-2": (1300002, "value_int"),
+    "DPST-13-10": (1300010, "value_int"),
+    "DPST-13-11": (1300011, "value_int"),
+    "DPST-13-12": (1300012, "value_int"),
+    "DPST-13-13": (1300013, "value_int"),
+    "DPST-13-14": (1300014, "value_int"),
+    "DPST-13-15": (1300015, "value_int"),
+    "DPST-13-16": (1300016, "value_int"),
+    "DPST-13-100": (1300100, "value_int"),
+    "DPT-13": (1399999, "value_int"),
+    "DPST-14-0": (1400000, "value_float"),
+    "DPST-14-1": (1400001, "value_float"),
+    "DPST-14-2": (1400002, "value_float"),
+    "DPST-14-3": (1400003, "value_float"),
+    "DPST-14-4": (1400004, "value_float"),
+    "DPST-14-5": (1400005, "value_float"),
+    "DPST-14-6": (1400006, "value_float"),
+    "DPST-14-7": (1400007, "value_float"),
+    "DPST-14-8": (1400008, "value_float"),
+    "DPST-14-9": (1400009, "value_float"),
+    "DPST-14-10": (1400010, "value_float"),
+    "DPST-14-11": (1400011, "value_float"),
+    "DPST-14-12": (1400012, "value_float"),
+    "DPST-14-13": (1400013, "value_float"),
+    "DPST-14-14": (1400014, "value_float"),
+    "DPST-14-15": (1400015, "value_float"),
+    "DPST-14-16": (1400016, "value_float"),
+    "DPST-14-17": (1400017, "value_float"),
+    "DPST-14-18": (1400018, "value_float"),
+    "DPST-14-19": (1400019, "value_float"),
+    "DPST-14-20": (1400020, "value_float"),
+    "DPST-14-21": (1400021, "value_float"),
+    "DPST-14-22": (1400022, "value_float"),
+    "DPST-14-23": (1400023, "value_float"),
+    "DPST-14-24": (1400024, "value_float"),
+    "DPST-14-25": (1400025, "value_float"),
+    "DPST-14-26": (1400026, "value_float"),
+    "DPST-14-27": (1400027, "value_float"),
+    "DPST-14-28": (1400028, "value_float"),
+    "DPST-14-29": (1400029, "value_float"),
+    "DPST-14-30": (1400030, "value_float"),
+    "DPST-14-31": (1400031, "value_float"),
+    "DPST-14-32": (1400032, "value_float"),
+    "DPST-14-33": (1400033, "value_float"),
+    "DPST-14-34": (1400034, "value_float"),
+    "DPST-14-35": (1400035, "value_float"),
+    "DPST-14-36": (1400036, "value_float"),
+    "DPST-14-37": (1400037, "value_float"),
+    "DPST-14-38": (1400038, "value_float"),
+    "DPST-14-39": (1400039, "value_float"),
+    "DPST-14-40": (1400040, "value_float"),
+    "DPST-14-41": (1400041, "value_float"),
+    "DPST-14-42": (1400042, "value_float"),
+    "DPST-14-43": (1400043, "value_float"),
+    "DPST-14-44": (1400044, "value_float"),
+    "DPST-14-45": (1400045, "value_float"),
+    "DPST-14-46": (1400046, "value_float"),
+    "DPST-14-47": (1400047, "value_float"),
+    "DPST-14-48": (1400048, "value_float"),
+    "DPST-14-49": (1400049, "value_float"),
+    "DPST-14-50": (1400050, "value_float"),
+    "DPST-14-51": (1400051, "value_float"),
+    "DPST-14-52": (1400052, "value_float"),
+    "DPST-14-53": (1400053, "value_float"),
+    "DPST-14-54": (1400054, "value_float"),
+    "DPST-14-55": (1400055, "value_float"),
+    "DPST-14-56": (1400056, "value_float"),
+    "DPST-14-57": (1400057, "value_float"),
+    "DPST-14-58": (1400058, "value_float"),
+    "DPST-14-59": (1400059, "value_float"),
+    "DPST-14-60": (1400060, "value_float"),
+    "DPST-14-61": (1400061, "value_float"),
+    "DPST-14-62": (1400062, "value_float"),
+    "DPST-14-63": (1400063, "value_float"),
+    "DPST-14-64": (1400064, "value_float"),
+    "DPST-14-65": (1400065, "value_float"),
+    "DPST-14-66": (1400066, "value_float"),
+    "DPST-14-67": (1400067, "value_float"),
+    "DPST-14-68": (1400068, "value_float"),
+    "DPST-14-69": (1400069, "value_float"),
+    "DPST-14-70": (1400070, "value_float"),
+    "DPST-14-71": (1400071, "value_float"),
+    "DPST-14-72": (1400072, "value_float"),
+    "DPST-14-73": (1400073, "value_float"),
+    "DPST-14-74": (1400074, "value_float"),
+    "DPST-14-75": (1400075, "value_float"),
+    "DPST-14-76": (1400076, "value_float"),
+    "DPST-14-77": (1400077, "value_float"),
+    "DPST-14-78": (1400078, "value_float"),
+    "DPST-14-79": (1400079, "value_float"),
+    "DPST-14-80": (1400080, "value_float"),
+    "DPT-14": (1499999, "value_float"),
+    "DPST-16-0": (1600000, "value_string"),
+    "DPST-16-1": (1600001, "value_string"),
+    "DPST-17-1": (1700001, "value_int"),
+    "DPST-18-1": (1800001, "value_int"),
+    "DPST-19-1": (1900001, "value_datetime"),
+    "DPST-20-102": (2000102, "value_int"),
+    "DPST-20-105": (2000105, "value_int"),
+    "DPST-20-60102": (2060102, "value_int"),
+    "DPST-21-1": (2100001, "value_int"),
+    "DPT-22": (2299999, "value_int"),
+    "DPST-27-1": (2700001, "value_int"),
+    "DPST-232-600": (23200600, "value_int"),
+    "DPST-235-1": (23500001, "value_int"),
+    "DPST-238-600": (23800600, "value_int"),
+    "DPST-242-600": (24200600, "value_int"),
+    "DPST-251-600": (25100600, "value_int"),
+}
+
+
+class Telegram(Base):
+    """ORM for telegrams of all dtypes.
+
+    The value is stored in the column of its db type, see DTYPES.
+    """
+
+    __tablename__ = "telegram"
+    __table_args__ = (Index("ix_telegram_dst_time", "dst", "time"),)
+
+    id_ = Column(types.Integer, primary_key=True)
+    time = Column(types.DateTime, default=datetime.utcnow)
+    src = Column(types.String)
+    dst = Column(types.String)
+    name = Column(types.String)
+    dtype_id = Column(types.Integer)
+    value_int = Column(types.BigInteger)
+    value_float = Column(types.Float)
+    value_time = Column(types.Time)
+    value_date = Column(types.Date)
+    value_datetime = Column(types.DateTime)
+    value_string = Column(types.String(14))
+
+    def __repr__(self) -> str:
+        """Return basic information about this entity (dtype_id, name, time, src, dst)."""
+        return f"('{self.__class__.__name__}', '(dtype_id={self.dtype_id}, name={self.name}, time={self.time} ', 'src={self.src}, dst={self.dst})')"
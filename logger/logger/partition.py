@@ -0,0 +1,325 @@
+"""Monthly partitions of the logging tables.
+
+Schemas generated with `gen_orm --partition-by-month` are partitioned by
+the month of `time`. Postgres gets declarative range partitions of each
+table, e.g. `temperature_2024_01`. Sqlite gets one database file per month,
+e.g. `knx_2024_01.db` next to `knx.db`, attached as `month_2024_01`. Rows
+are routed to the file of their month by `logger.writer.insert_rows`, and
+read month by month, see `month_tables`.
+
+Either way retention is dropping a partition instead of deleting rows.
+"""
+
+import argparse
+import datetime as dt
+import logging
+from collections.abc import Iterable, Iterator
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Column, Connection, Index, MetaData, PrimaryKeyConstraint, Table, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.compiler import DDLCompiler
+
+from logger.util import SCHEMAS, get_orm, session_scope, utcnow
+
+PARTITION_BY = "partition_by"
+MONTH = "month"
+DDL_PARTITION = "CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+
+# Months attached per connection, sqlite allows 10 databases at most
+MAX_ATTACHED = 8
+ATTACHED = "logger_attached"
+
+
+def partition_by_month(metadata: MetaData) -> None:
+    """Partition all tables with a `time` primary key by month.
+
+    Called by the generated schemas, the tables need `time` in their
+    primary key as postgres requires the partition key in it.
+    """
+    for table in metadata.tables.values():
+        if "time" in table.primary_key.columns:
+            table.info[PARTITION_BY] = MONTH
+            table.dialect_kwargs["postgresql_partition_by"] = "RANGE (time)"
+
+
+def is_partitioned(table: Table) -> bool:
+    """Check if a table is partitioned by month."""
+    return table.info.get(PARTITION_BY) == MONTH
+
+
+def partitioned_tables(metadata: MetaData) -> list[Table]:
+    """Get the tables partitioned by month."""
+    return [table for table in metadata.sorted_tables if is_partitioned(table)]
+
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _sqlite_primary_key(constraint: PrimaryKeyConstraint, compiler: DDLCompiler, **kw: Any) -> str:
+    """Keep `id_` the rowid on sqlite, `time` is only in the key for postgres."""
+    if constraint.table is None or not is_partitioned(constraint.table):
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+    columns = ", ".join(compiler.preparer.quote(column.name) for column in constraint.columns if column.name != "time")
+    return f"PRIMARY KEY ({columns})"
+
+
+def month_start(time: dt.datetime) -> dt.datetime:
+    """Get the start of the month of a time."""
+    return dt.datetime(time.year, time.month, 1)
+
+
+def next_month(month: dt.datetime) -> dt.datetime:
+    """Get the start of the month following a month."""
+    return dt.datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(table: Table, month: dt.datetime) -> str:
+    """Name of the postgres partition of a table, e.g. `temperature_2024_01`."""
+    return f"{table.name}_{month:%Y_%m}"
+
+
+def sqlite_schema(month: dt.datetime) -> str:
+    """Name of the attached sqlite database of a month, e.g. `month_2024_01`."""
+    return f"month_{month:%Y_%m}"
+
+
+def sqlite_path(database: str | None, month: dt.datetime) -> str:
+    """Path of the sqlite database of a month, e.g. `knx_2024_01.db` for `knx.db`."""
+    if not database or database == ":memory:":
+        return ":memory:"
+    path = Path(database)
+    return str(path.with_name(f"{path.stem}_{month:%Y_%m}{path.suffix}"))
+
+
+@cache
+def sqlite_table(table: Table, schema: str) -> Table:
+    """Get the copy of a table in an attached sqlite database.
+
+    Without foreign keys, sqlite can't reference other databases. `id_`
+    is the only primary key, i.e. the rowid.
+    """
+    columns = [Column(column.name, column.type, primary_key=column.primary_key and column.name != "time") for column in table.columns]
+    copy = Table(table.name, MetaData(), *columns, schema=schema, info=dict(table.info))
+    for index in table.indexes:
+        Index(index.name, *(copy.columns[column.name] for column in index.columns))
+    return copy
+
+
+def detach_month(connection: Connection, schema: str) -> None:
+    """Detach the sqlite database of a month, if attached.
+
+    Needs to run outside of a transaction using it.
+    """
+    if schema in {row[1] for row in connection.exec_driver_sql("PRAGMA database_list")}:
+        connection.exec_driver_sql(f"DETACH DATABASE {schema}")
+    connection.connection.info.get(ATTACHED, {}).pop(schema, None)
+
+
+def attach_month(session: Session, metadata: MetaData, month: dt.datetime, keep: Iterable[str] = ()) -> str:
+    """Attach the sqlite database of a month and create its tables.
+
+    Attached databases are per connection, each connection attaches the
+    months it uses. Beyond `MAX_ATTACHED` the least recently used months
+    are detached, except the current and the next one and the ones to
+    `keep`. Needs to run outside of a transaction using the detached ones.
+
+    Returns
+    -------
+    str
+        Name of the attached database.
+
+    """
+    schema = sqlite_schema(month)
+    connection = session.connection()
+    # Least recently used first
+    attached: dict[str, None] = connection.connection.info.setdefault(ATTACHED, {})
+    if schema in attached:
+        attached[schema] = attached.pop(schema)
+        return schema
+
+    path = sqlite_path(connection.engine.url.database, month)
+    if path != ":memory:":
+        # In memory months would be lost
+        current = month_start(utcnow())
+        keep = {*keep, sqlite_schema(current), sqlite_schema(next_month(current))}
+        stale = [name for name in attached if name not in keep]
+        while stale and len(attached) >= MAX_ATTACHED:
+            detach_month(connection, stale.pop(0))
+
+    if schema not in {row[1] for row in connection.exec_driver_sql("PRAGMA database_list")}:
+        connection.exec_driver_sql(f"ATTACH DATABASE ? AS {schema}", (path,))
+        # Same journal as the main database, see `logger.util.SQLITE_PRAGMAS`
+        journal_mode = connection.exec_driver_sql("PRAGMA main.journal_mode").scalar_one()
+        connection.exec_driver_sql(f"PRAGMA {schema}.journal_mode={journal_mode}")
+    # One query instead of one per table, months are attached again and again when read
+    existing = set(connection.exec_driver_sql(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'").scalars())  # noqa: S608
+    for table in metadata.tables.values():
+        if is_partitioned(table) and table.name not in existing:
+            sqlite_table(table, schema).create(connection)
+    attached[schema] = None
+    return schema
+
+
+def route_rows(session: Session, grouped: dict[Table, list[dict[str, Any]]]) -> dict[Table, list[dict[str, Any]]]:
+    """Route the rows of partitioned tables to the sqlite database of their month.
+
+    Other dialects and tables are passed through, postgres routes itself.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        return grouped
+
+    routed: dict[Table, list[dict[str, Any]]] = {}
+    schemas: dict[tuple[int, int], str] = {}
+    for table, rows in grouped.items():
+        if not is_partitioned(table):
+            routed[table] = rows
+            continue
+        for row in rows:
+            time = row["time"]
+            schema = schemas.get((time.year, time.month))
+            if schema is None:
+                schema = schemas[time.year, time.month] = attach_month(session, table.metadata, month_start(time), schemas.values())
+            routed.setdefault(sqlite_table(table, schema), []).append(row)
+    return routed
+
+
+def sqlite_months(session: Session) -> list[dt.datetime]:
+    """Get the months with a sqlite database, attached or next to the main one, oldest first."""
+    connection = session.connection()
+    names = [schema.removeprefix("month_") for schema in connection.connection.info.get(ATTACHED, {})]
+    database = connection.engine.url.database
+    if database and database != ":memory:":
+        path = Path(database)
+        names.extend(file_.stem.removeprefix(f"{path.stem}_") for file_ in path.parent.glob(f"{path.stem}_*{path.suffix}"))
+
+    months = set()
+    for name in names:
+        try:
+            months.add(dt.datetime.strptime(name, "%Y_%m"))  # noqa: DTZ007
+        except ValueError:
+            continue
+    return sorted(months)
+
+
+def month_tables(session: Session, table: Table, start: dt.datetime | None = None, end: dt.datetime | None = None) -> Iterator[Table]:
+    """Get the tables to read a table from, from `start` to `end` (exclusive).
+
+    For sqlite the copies of a partitioned table in the databases of the
+    months, oldest first. Each month is attached once requested, so read it
+    before the next one. Other dialects and tables are read as they are.
+    """
+    if not is_partitioned(table) or session.get_bind().dialect.name != "sqlite":
+        yield table
+        return
+    for month in sqlite_months(session):
+        if (start is not None and next_month(month) <= start) or (end is not None and month >= end):
+            continue
+        yield sqlite_table(table, attach_month(session, table.metadata, month))
+
+
+def create_partitions(session: Session, metadata: MetaData, month: dt.datetime) -> list[str]:
+    """Create the partitions of a month, doesn't commit.
+
+    Existing partitions are kept, so this can run any time, e.g. by the
+    runner ahead of each month.
+
+    Returns
+    -------
+    list
+        Names of the partitions, the attached database for sqlite.
+
+    """
+    tables = partitioned_tables(metadata)
+    if not tables:
+        return []
+
+    dialect = session.get_bind().dialect
+    if dialect.name == "sqlite":
+        return [attach_month(session, metadata, month)]
+    if dialect.name != "postgresql":
+        error_msg = f"Partitions aren't supported by {dialect.name}."
+        raise NotImplementedError(error_msg)
+
+    preparer = dialect.identifier_preparer
+    names = []
+    for table in tables:
+        name = partition_name(table, month)
+        sql = DDL_PARTITION.format(
+            partition=preparer.quote(name),
+            table=preparer.format_table(table),
+            start=month.isoformat(sep=" "),
+            end=next_month(month).isoformat(sep=" "),
+        )
+        session.execute(text(sql))
+        names.append(name)
+    return names
+
+
+def drop_partitions(session: Session, metadata: MetaData, month: dt.datetime) -> list[str]:
+    """Drop the partitions of a month including their rows, doesn't commit.
+
+    The sqlite file is detached from this connection and removed, other
+    connections still attaching it keep it open until they are closed.
+
+    Returns
+    -------
+    list
+        Names of the dropped partitions, the attached database for sqlite.
+
+    """
+    tables = partitioned_tables(metadata)
+    if not tables:
+        return []
+
+    dialect = session.get_bind().dialect
+    if dialect.name == "sqlite":
+        schema = sqlite_schema(month)
+        connection = session.connection()
+        detach_month(connection, schema)
+        path = sqlite_path(connection.engine.url.database, month)
+        if path != ":memory:":
+            Path(path).unlink(missing_ok=True)
+        return [schema]
+
+    names = [partition_name(table, month) for table in tables]
+    for name in names:
+        session.execute(text(f"DROP TABLE IF EXISTS {dialect.identifier_preparer.quote(name)}"))
+    return names
+
+
+def ensure_partitions(session: Session, metadata: MetaData, now: dt.datetime | None = None) -> list[str]:
+    """Create the partitions of the current and the next month, doesn't commit."""
+    month = month_start(now or utcnow())
+    return create_partitions(session, metadata, month) + create_partitions(session, metadata, next_month(month))
+
+
+def parse_month(value: str) -> dt.datetime:
+    """Parse a month like `2024-01`, naive like the times of the ORM."""
+    return dt.datetime.strptime(value, "%Y-%m")  # noqa: DTZ007
+
+
+def main() -> int:
+    """Create or drop the partitions of a month from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("action", choices=("create", "drop"))
+    parser.add_argument("db_addr", help="address of the database, e.g. sqlite:///knx.db")
+    parser.add_argument("month", type=parse_month, help="month of the partitions, e.g. 2024-01")
+    parser.add_argument("--schema", choices=SCHEMAS, default="per_dtype")
+    args = parser.parse_args()
+
+    metadata = get_orm(args.schema).Base.metadata
+    month = month_start(args.month)
+    with session_scope(args.db_addr, args.schema) as session:
+        if args.action == "create":
+            names = create_partitions(session, metadata, month)
+        else:
+            names = drop_partitions(session, metadata, month)
+    logging.info("%s %s", args.action, ", ".join(names) or "nothing, the schema isn't partitioned")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
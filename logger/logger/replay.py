@@ -0,0 +1,299 @@
+"""Decode capture files and load them into the database, in parallel.
+
+The capture files of `logger.capture` are replayed by a pool of processes,
+one file (i.e. hour) at a time per worker. Each worker decodes the group
+writes like `logger.runner.get_rx_cb` and bulk loads them, see
+`logger.writer.write_rows`, e.g. to re-ingest the history after fixing the
+mapping:
+
+    python -m logger.replay sqlite:///knx.db mapping.json captures/ --workers 4
+
+The group addresses of a name table and the partitions of the captured
+months are created ahead of the workers. Filters of the mapping start
+afresh with each file, changes held back by
+`min_interval` at the end of a file are stored. Rows are committed in
+chunks, if a file fails the rows committed before stay. Rollups aren't
+updated, run `python -m logger.rollup` afterwards.
+
+Replaying a file again stores its rows again, e.g. next to the ones the
+logger stored live. With `--replace` the stored rows in the time range of
+each file are deleted first, and the file is committed as a whole.
+"""
+
+import argparse
+import datetime as dt
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from types import ModuleType
+
+from sqlalchemy import MetaData, delete
+from sqlalchemy.orm import Session
+from xknx.telegram.apci import APCIService
+
+from logger.capture import FLAG_GROUP, FLAG_TRUNCATED, CaptureFile, Record, capture_files
+from logger.mapping import GATable, compile_mapping
+from logger.partition import create_partitions, month_start, month_tables
+from logger.rollup import is_rollup
+from logger.schema import sync_groupaddresses
+from logger.util import SCHEMAS, get_orm, session_scope
+from logger.writer import Row, write_rows
+
+# Rows per commit
+REPLAY_CHUNK = 10_000
+
+# Wait for the other workers' commits instead of failing, in milliseconds
+SQLITE_BUSY_TIMEOUT = 60_000
+
+
+def decode_records(records: Iterable[Record], ga_table: GATable, stats: Counter, *, filters: bool = True) -> Iterator[Row]:
+    """Decode the group writes of records into rows.
+
+    Parameters
+    ----------
+    records : Iterable[Record]
+        The captured telegrams
+    ga_table : GATable
+        The compiled mapping, see `logger.mapping.compile_mapping`
+    stats : Counter
+        Counts the `rows`, `ignored` (not a group write), `unmapped`, `failed` and `filtered` records
+    filters : bool
+        Apply the filters of the mapping, with the times of the records
+
+    Yields
+    ------
+    Row
+        A row per decoded telegram.
+
+    """
+    for record in records:
+        timestamp, _, dst, apci, flags, _, _ = record.fields
+        if apci != APCIService.GROUP_WRITE.value or not flags & FLAG_GROUP or flags & FLAG_TRUNCATED:
+            stats["ignored"] += 1
+            continue
+
+        entry = ga_table[dst]
+        if entry is None:
+            stats["unmapped"] += 1
+            continue
+
+        try:
+            value = entry.decode(record.raw_value)
+        except Exception:
+            logging.warning("Couldn't decode %s.", record)
+            stats["failed"] += 1
+            continue
+
+        row = entry.row(value, record.source_address, record.time)
+        if filters and entry.filter is not None:
+            # A change held back by min_interval goes first once due
+            held = entry.filter.release(timestamp / 1e6)
+            if held is not None:
+                stats["rows"] += 1
+                yield held
+            if not entry.filter.accept(value, timestamp / 1e6, row):
+                stats["filtered"] += 1
+                continue
+
+        stats["rows"] += 1
+        yield row
+
+    # The last changes held back
+    if filters:
+        for held_entry in ga_table:
+            held = held_entry.filter.release(math.inf) if held_entry is not None and held_entry.filter is not None else None
+            if held is not None:
+                stats["rows"] += 1
+                yield held
+
+
+def delete_range(session: Session, metadata: MetaData, start: dt.datetime, end: dt.datetime) -> int:
+    """Delete the rows from `start` to `end` (inclusive) of all logging tables, doesn't commit.
+
+    Returns
+    -------
+    int
+        Number of deleted rows.
+
+    """
+    count = 0
+    for table in metadata.sorted_tables:
+        if is_rollup(table) or "time" not in table.columns or "dst" not in table.columns:
+            continue
+        for part in month_tables(session, table, start, end + dt.timedelta(microseconds=1)):
+            count += session.execute(delete(part).where(part.c.time >= start, part.c.time <= end)).rowcount  # type: ignore [attr-defined]
+    return count
+
+
+def replay_file(
+    path: Path,
+    db_addr: str,
+    mapping: dict,
+    schema: str | ModuleType = "per_dtype",
+    *,
+    chunk_size: int = REPLAY_CHUNK,
+    filters: bool = True,
+    replace: bool = False,
+) -> Counter:
+    """Decode a capture file and load it into the database, the task of a worker.
+
+    With `replace` the stored rows in the time range of the file are
+    deleted first, in the same transaction as the whole file.
+
+    Returns
+    -------
+    Counter
+        Statistics of the file, see `decode_records`, plus the number of `replaced` rows.
+
+    """
+    # Compiled per file, so the filters start afresh
+    ga_table = compile_mapping(mapping, schema)
+    stats: Counter = Counter()
+    # The write-ahead log lets the workers write alongside each other
+    with CaptureFile(path) as capture, session_scope(db_addr, schema, sqlite_profile=True) as session:
+        if session.get_bind().dialect.name == "sqlite":
+            session.connection().exec_driver_sql(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        if replace and len(capture):
+            stats["replaced"] += delete_range(session, get_orm(schema).Base.metadata, capture[0].time, capture[-1].time)
+
+        batch: list[Row] = []
+        for row in decode_records(capture, ga_table, stats, filters=filters):
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                write_rows(session, batch)
+                if not replace:
+                    session.commit()
+                batch = []
+        if batch:
+            write_rows(session, batch)
+    return stats
+
+
+def capture_paths(paths: Iterable[Path]) -> list[Path]:
+    """Expand directories to their capture files."""
+    files: list[Path] = []
+    for path in paths:
+        files.extend(capture_files(path) if Path(path).is_dir() else [Path(path)])
+    return files
+
+
+def capture_months(files: Iterable[Path]) -> list[dt.datetime]:
+    """Get the months of the records of capture files, oldest first."""
+    months: set[dt.datetime] = set()
+    for path in files:
+        with CaptureFile(path) as capture:
+            if len(capture):
+                months.update((month_start(capture[0].time), month_start(capture[-1].time)))
+    return sorted(months)
+
+
+def prepare(session: Session, metadata: MetaData, ga_table: GATable, months: Iterable[dt.datetime]) -> None:
+    """Create what the workers write to, doesn't commit.
+
+    The group addresses of a name table, see `logger.schema.sync_groupaddresses`,
+    and the partitions of the replayed months, see `logger.partition.create_partitions`.
+    """
+    sync_groupaddresses(session, ga_table)
+    for month in months:
+        create_partitions(session, metadata, month)
+
+
+def replay(
+    paths: Iterable[Path],
+    db_addr: str,
+    mapping: dict,
+    schema: str = "per_dtype",
+    *,
+    workers: int | None = None,
+    chunk_size: int = REPLAY_CHUNK,
+    filters: bool = True,
+    replace: bool = False,
+) -> Counter:
+    """Replay capture files with a pool of workers.
+
+    Parameters
+    ----------
+    paths : Iterable[Path]
+        Capture files or directories of them
+    db_addr : str
+        Address of the database, with a sync driver
+    mapping : dict
+        The mapping, see `logger.runner.get_mapping`
+    schema : str
+        Schema the telegrams are stored in, see `logger.util.SCHEMAS`
+    workers : int | None
+        Number of processes, defaults to the number of cpus
+    chunk_size : int
+        Rows per commit
+    filters : bool
+        Apply the filters of the mapping
+    replace : bool
+        Delete the stored rows in the time range of each file first, see `replay_file`
+
+    Returns
+    -------
+    Counter
+        Statistics of all files, see `replay_file`, plus the number of `files` and `failed_files`.
+
+    Raises
+    ------
+    ValueError
+        In case the mapping is invalid.
+
+    """
+    # Validate the mapping and create the tables once, ahead of the workers
+    ga_table = compile_mapping(mapping, schema)
+    files = capture_paths(paths)
+    with session_scope(db_addr, schema, sqlite_profile=True) as session:
+        prepare(session, get_orm(schema).Base.metadata, ga_table, capture_months(files))
+
+    total: Counter = Counter()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(replay_file, path, db_addr, mapping, schema, chunk_size=chunk_size, filters=filters, replace=replace): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                stats = future.result()
+            except Exception:
+                logging.exception("Couldn't replay %s.", path)
+                total["failed_files"] += 1
+                continue
+            total.update(stats)
+            total["files"] += 1
+            logging.info("Replayed %s: %i rows.", path, stats["rows"])
+
+    duration = time.perf_counter() - start
+    logging.info("Replayed %i rows of %i files in %.1fs (%.0f rows/s).", total["rows"], total["files"], duration, total["rows"] / duration if duration else 0)
+    return total
+
+
+def main() -> int:
+    """Replay capture files from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_addr", help="address of the database, e.g. sqlite:///knx.db")
+    parser.add_argument("mapping", type=Path, help="json mapping, e.g. examples/ga_mapping.json")
+    parser.add_argument("captures", type=Path, nargs="+", help="capture files or directories of them")
+    parser.add_argument("--schema", choices=SCHEMAS, default="per_dtype")
+    parser.add_argument("--workers", type=int, help="number of processes, defaults to the number of cpus")
+    parser.add_argument("--chunk-size", type=int, default=REPLAY_CHUNK, help="rows per commit")
+    parser.add_argument("--no-filters", dest="filters", action="store_false", help="store every value, ignoring the filters of the mapping")
+    parser.add_argument("--replace", action="store_true", help="delete the stored rows in the time range of each file first")
+    args = parser.parse_args()
+
+    with args.mapping.open(encoding="utf-8") as file_:
+        mapping = json.load(file_)
+    stats = replay(args.captures, args.db_addr, mapping, args.schema, workers=args.workers, chunk_size=args.chunk_size, filters=args.filters, replace=args.replace)
+    logging.info(", ".join(f"{key}: {value}" for key, value in sorted(stats.items())))
+    return 1 if stats["failed_files"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
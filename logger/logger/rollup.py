@@ -0,0 +1,311 @@
+"""Per group address rollups of the numeric values at minute and hour resolution.
+
+The tables `rollup_minute` and `rollup_hour` hold count, min, max, sum and
+average of each group address per bucket. Only quantities are rolled up,
+e.g. 9.x and 14.x floats, 5.001 scaling and counters, see `is_numeric`. They are updated incrementally
+by the writers with each flushed batch, see `update_rollups`, and can be
+computed from the existing history with `python -m logger.rollup`.
+"""
+
+import argparse
+import datetime as dt
+import logging
+import math
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+from sqlalchemy import Column, ColumnElement, DateTime, Float, Integer, MetaData, Table, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ColumnCollection
+from xknx import dpt
+
+from logger.dtype_matcher import DTYPE2XKNX
+from logger.partition import month_tables
+from logger.util import SCHEMAS, get_orm, session_scope, xknx2name
+
+# Bucket of a time per resolution
+RESOLUTIONS = {
+    "minute": lambda time: time.replace(second=0, microsecond=0),
+    "hour": lambda time: time.replace(minute=0, second=0, microsecond=0),
+}
+
+# Rows read at once by the backfill
+BACKFILL_CHUNK = 10_000
+
+# A value to roll up: dst, time and value
+Sample = tuple[Any, dt.datetime, float]
+
+# Main numbers of the numeric dpts rolled up
+NUMERIC_DPTS = (5, 6, 7, 8, 9, 12, 13, 14, 29)
+
+# Numeric dpt classes identifying something, without a meaningful average
+IDENTIFIERS = (dpt.DPTSceneNumber, dpt.DPTTariff)
+
+
+@dataclass(slots=True)
+class Aggregate:
+    """Running aggregate of the values of a bucket."""
+
+    value_count: int
+    value_min: float
+    value_max: float
+    value_sum: float
+
+    def add(self, value: float) -> None:
+        """Add a value to the aggregate."""
+        self.value_count += 1
+        self.value_min = min(self.value_min, value)
+        self.value_max = max(self.value_max, value)
+        self.value_sum += value
+
+
+def rollup_tables(metadata: MetaData) -> dict[str, Table]:
+    """Get the rollup tables of a schema by resolution, added if missing.
+
+    `dst` has the type of the logging tables, i.e. string or raw integer.
+    """
+    dst_type = next(table.columns["dst"].type for table in metadata.sorted_tables if "dst" in table.columns and "time" in table.columns)
+    tables = {}
+    for resolution in RESOLUTIONS:
+        name = f"rollup_{resolution}"
+        if name not in metadata.tables:
+            Table(
+                name,
+                metadata,
+                Column("dst", dst_type, primary_key=True),
+                Column("bucket", DateTime, primary_key=True),
+                Column("value_count", Integer, nullable=False),
+                Column("value_min", Float),
+                Column("value_max", Float),
+                Column("value_sum", Float),
+                Column("value_avg", Float),
+            )
+        tables[resolution] = metadata.tables[name]
+    return tables
+
+
+def is_rollup(table: Table) -> bool:
+    """Check if a table is a rollup table."""
+    return table.name.startswith("rollup_")
+
+
+def is_numeric(dtype: str) -> bool:
+    """Check if the values of a dtype are quantities worth rolling up.
+
+    E.g. 9.x and 14.x floats, 5.001 scaling and counters, but no booleans,
+    enums, colors or scene numbers.
+    """
+    xknx_class = DTYPE2XKNX[dtype]
+    main = int(dtype.split("-")[1])
+    return main in NUMERIC_DPTS and issubclass(xknx_class, dpt.DPTNumeric) and not issubclass(xknx_class, IDENTIFIERS)
+
+
+@cache
+def numeric_tables() -> tuple[frozenset[str], frozenset[int]]:
+    """Get the names of the per dtype tables and the `dtype_id`s of the unified table rolled up."""
+    dtypes = [dtype for dtype in DTYPE2XKNX if is_numeric(dtype)]
+    names = frozenset(xknx2name(DTYPE2XKNX[dtype]).lower() for dtype in dtypes)
+    dtype_ids = frozenset(get_orm("unified").DTYPES[dtype][0] for dtype in dtypes)
+    return names, dtype_ids
+
+
+def is_rolled_up(table: Table, values: dict[str, Any]) -> bool:
+    """Check if a row is of a numeric dtype, see `is_numeric`."""
+    names, dtype_ids = numeric_tables()
+    if "dtype_id" in values:
+        return values["dtype_id"] in dtype_ids
+    return table.name in names
+
+
+def row_value(values: dict[str, Any]) -> float | None:
+    """Get the numeric value of a row, None for other values.
+
+    Booleans, times, strings and NaN aren't rolled up.
+    """
+    if "value" in values:
+        value = values["value"]
+    else:
+        # The unified schema sets one of its value columns
+        value = next((value for key, value in values.items() if key.startswith("value_") and value is not None), None)
+    if isinstance(value, bool) or not isinstance(value, int | float) or math.isnan(value):
+        return None
+    return value
+
+
+def aggregate(samples: Iterable[Sample], resolution: str) -> dict[tuple[Any, dt.datetime], Aggregate]:
+    """Aggregate samples by group address and bucket."""
+    get_bucket = RESOLUTIONS[resolution]
+    aggregates: dict[tuple[Any, dt.datetime], Aggregate] = {}
+    for dst, time, value in samples:
+        key = (dst, get_bucket(time))
+        current = aggregates.get(key)
+        if current is None:
+            aggregates[key] = Aggregate(1, value, value, value)
+        else:
+            current.add(value)
+    return aggregates
+
+
+def merged_values(
+    table: Table,
+    excluded: ColumnCollection[str, Any],
+    least: Callable[..., ColumnElement[Any]],
+    greatest: Callable[..., ColumnElement[Any]],
+) -> dict[str, ColumnElement[Any]]:
+    """Get the values of a bucket merged with the `excluded` one of an upsert."""
+    return {
+        "value_count": table.c.value_count + excluded.value_count,
+        "value_min": least(table.c.value_min, excluded.value_min),
+        "value_max": greatest(table.c.value_max, excluded.value_max),
+        "value_sum": table.c.value_sum + excluded.value_sum,
+        "value_avg": (table.c.value_sum + excluded.value_sum) / (table.c.value_count + excluded.value_count),
+    }
+
+
+def upsert(session: Session, table: Table, aggregates: dict[tuple[Any, dt.datetime], Aggregate]) -> None:
+    """Merge aggregates into a rollup table, doesn't commit.
+
+    Raises
+    ------
+    NotImplementedError
+        For dialects other than postgres and sqlite.
+
+    """
+    if not aggregates:
+        return
+
+    dialect = session.get_bind().dialect.name
+    index_elements = [table.c.dst, table.c.bucket]
+    statement: postgresql.Insert | sqlite.Insert
+    if dialect == "postgresql":
+        pg_insert = postgresql.insert(table)
+        statement = pg_insert.on_conflict_do_update(index_elements=index_elements, set_=merged_values(table, pg_insert.excluded, func.least, func.greatest))
+    elif dialect == "sqlite":
+        sqlite_insert = sqlite.insert(table)
+        # The scalar, multi argument min and max
+        statement = sqlite_insert.on_conflict_do_update(index_elements=index_elements, set_=merged_values(table, sqlite_insert.excluded, func.min, func.max))
+    else:
+        error_msg = f"Rollups aren't supported by {dialect}."
+        raise NotImplementedError(error_msg)
+
+    rows = [
+        {
+            "dst": dst,
+            "bucket": bucket,
+            "value_count": agg.value_count,
+            "value_min": agg.value_min,
+            "value_max": agg.value_max,
+            "value_sum": agg.value_sum,
+            "value_avg": agg.value_sum / agg.value_count,
+        }
+        for (dst, bucket), agg in aggregates.items()
+    ]
+    session.execute(statement, rows)
+
+
+def update_samples(session: Session, metadata: MetaData, samples: list[Sample]) -> None:
+    """Merge samples into the rollups of all resolutions, doesn't commit."""
+    if not samples:
+        return
+    for resolution, table in rollup_tables(metadata).items():
+        upsert(session, table, aggregate(samples, resolution))
+
+
+def update_rollups(session: Session, batch: list[tuple[Table, dict[str, Any]]]) -> None:
+    """Merge a batch of rows into the rollups, doesn't commit.
+
+    Called by the writers along with the insert of the batch, i.e. in the
+    same transaction, see `logger.writer.BaseWriter`.
+    """
+    if not batch:
+        return
+    samples = []
+    for table, values in batch:
+        value = row_value(values) if is_rolled_up(table, values) else None
+        if value is not None:
+            samples.append((values["dst"], values["time"], value))
+    update_samples(session, batch[0][0].metadata, samples)
+
+
+def value_columns(table: Table) -> list[Column]:
+    """Get the numeric value columns of a logging table."""
+    return [column for column in table.columns if column.name.startswith("value") and isinstance(column.type, Integer | Float)]
+
+
+def backfill(session: Session, metadata: MetaData, since: dt.datetime | None = None) -> int:
+    """Compute the rollups from the stored history, doesn't commit.
+
+    Tables partitioned on sqlite are read from the databases of the months,
+    committing after each month, see `logger.partition.month_tables`.
+    Rollups from the hour of `since` on are replaced, so a backfill can be
+    repeated. The logger should be stopped meanwhile, or rows of the
+    current hour might be counted twice.
+
+    Returns
+    -------
+    int
+        Number of rolled up rows.
+
+    """
+    rollups = rollup_tables(metadata)
+    metadata.create_all(session.connection(), tables=list(rollups.values()))
+
+    start = RESOLUTIONS["hour"](since) if since is not None else None
+    for table in rollups.values():
+        statement = delete(table)
+        if start is not None:
+            statement = statement.where(table.c.bucket >= start)
+        session.execute(statement)
+
+    names, dtype_ids = numeric_tables()
+    count = 0
+    for table in metadata.sorted_tables:
+        columns = value_columns(table)
+        if is_rollup(table) or not columns or "dst" not in table.columns or "time" not in table.columns:
+            continue
+        if "dtype_id" not in table.columns and table.name not in names:
+            continue
+        for part in month_tables(session, table, start):
+            query = select(part.c.dst, part.c.time, *(part.c[column.name] for column in columns))
+            if "dtype_id" in part.columns:
+                query = query.where(part.c.dtype_id.in_(dtype_ids))
+            if start is not None:
+                query = query.where(part.c.time >= start)
+            result = session.execute(query.execution_options(yield_per=BACKFILL_CHUNK))
+            for rows in result.partitions():
+                samples = []
+                for dst, time, *values in rows:
+                    value = row_value({column.name: value for column, value in zip(columns, values, strict=True)})
+                    if value is not None:
+                        samples.append((dst, time, value))
+                update_samples(session, metadata, samples)
+                count += len(samples)
+            if part is not table:
+                # A sqlite month can only be detached once committed
+                session.commit()
+        logging.debug("Rolled up %s.", table.name)
+    return count
+
+
+def main() -> int:
+    """Backfill the rollups from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_addr", help="address of the database, e.g. sqlite:///knx.db")
+    parser.add_argument("--schema", choices=SCHEMAS, default="per_dtype")
+    parser.add_argument("--since", type=dt.datetime.fromisoformat, help="only recompute from this time (UTC) on, e.g. 2024-01-01")
+    args = parser.parse_args()
+
+    metadata = get_orm(args.schema).Base.metadata
+    rollup_tables(metadata)
+    with session_scope(args.db_addr, args.schema) as session:
+        count = backfill(session, metadata, args.since)
+    logging.info("Rolled up %i rows.", count)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    raise SystemExit(main())
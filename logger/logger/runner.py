@@ -2,46 +2,63 @@
 
 """Log all knx telegrams to database."""
 
+import asyncio
 import datetime as dt
 import json
 import logging
+import math
+import struct
+import time
 import typing
-from collections.abc import Callable
-from enum import Enum
+from collections.abc import Callable, Coroutine
 from pathlib import Path
 from threading import Thread
 
 from sqlalchemy.orm import Session
-from xknx import XKNX, dpt
-from xknx.dpt import DPTArray
-from xknx.dpt.dpt_18 import SceneControl
-from xknx.dpt.dpt_20 import HVACStatus
-from xknx.dpt.dpt_235 import TariffActiveEnergy
+from xknx import XKNX
 from xknx.io import ConnectionConfig, ConnectionType
 from xknx.telegram import Telegram
 from xknx.telegram.apci import GroupValueWrite
 
-from logger import orm
+from logger.capture import CaptureWriter
 from logger.dtype_matcher import DTYPE2XKNX
+from logger.export import ExportSource
+from logger.filters import ValueFilter
+from logger.mapping import GATable, compile_mapping
+from logger.partition import ensure_partitions, partitioned_tables
+from logger.rollup import rollup_tables
+from logger.schema import sync_groupaddresses
+from logger.sharedvalues import SharedValues
+from logger.spool import Spool
 from logger.statusserver import Data
-from logger.util import is_binary, session_scope, xknx2name
+from logger.util import async_session_scope, get_orm, is_async_addr, session_scope, utcnow
+from logger.writer import AsyncBatchWriter, BaseWriter, ThreadedBatchWriter, insert_rows
 
+# Seconds between the checks for the partitions of the next month
+PARTITION_INTERVAL = 6 * 60 * 60
 
-async def get_mapping(mapping_path: Path) -> dict:
-    """Load mapping and validate it.
+# Seconds between the checks for changes held back by `min_interval`
+RELEASE_INTERVAL = 1.0
 
-    Load mapping from given json path and ensure that all used
-    dtypes are covered by the xknx mapping.
+
+async def get_mapping(mapping_path: Path, schema: str = "per_dtype") -> GATable:
+    """Load mapping, validate and compile it.
+
+    Load mapping from given json path, ensure that all used
+    dtypes are covered by the xknx mapping and compile it into
+    a table of decoders, see `logger.mapping.compile_mapping`.
 
     Parameters
     ----------
     mapping_path : Path
         Path to a json mapping
+    schema : str
+        Schema the telegrams are stored in, see `logger.util.SCHEMAS`
 
     Returns
     -------
-    dict
-        A mapping loaded and validated to match the used dtypes.
+    GATable
+        A mapping loaded, validated to match the used dtypes and compiled.
 
     Raises
     ------
@@ -64,15 +81,28 @@ async def get_mapping(mapping_path: Path) -> dict:
         error_msg = "Not all dpst that are needed are covered."
         raise ValueError(error_msg)
 
-    return mapping
+    return compile_mapping(mapping, schema)
 
 
 async def get_rx_cb(
-    mapping: dict,
-    db_session: Session,
+    mapping: dict | GATable,
+    db_session: Session | None,
     status: Data | None,
+    writer: BaseWriter | None = None,
+    shared: SharedValues | None = None,
 ) -> Callable:
-    """Yield a msg receive callback."""
+    """Yield a msg receive callback.
+
+    The mapping is compiled unless it already is, see `get_mapping`.
+    Without a writer every telegram is committed on its own, otherwise
+    the rows are handed to the writer and committed in batches. Values
+    dropped by the filter of their entry aren't stored, see `logger.filters`.
+    With `shared` the numeric values are also published to other processes,
+    see `logger.sharedvalues`.
+    """
+    ga_table = compile_mapping(mapping) if isinstance(mapping, dict) else mapping
+    # Counted for `/metrics` of the status server, see `logger.metrics`
+    metrics = status.metrics if status is not None else None
 
     @typing.no_type_check
     async def telegram_rx_cb(telegram: Telegram) -> bool:
@@ -90,124 +120,102 @@ async def get_rx_cb(
 
         """
         logging.debug("Telegram rx: %s", telegram)
+        if metrics is not None:
+            metrics.received += 1
 
         # Only act on write requests
         if not isinstance(telegram.payload, GroupValueWrite):
             logging.debug("Ignored non-write request: %s", telegram.payload)
+            if metrics is not None:
+                metrics.ignored += 1
             return False
 
         # Extract info from telegram
         try:
-            src = str(telegram.source_address)
-            dst = str(telegram.destination_address)
+            dst_raw = telegram.destination_address.raw
             value_raw = telegram.payload.value.value
         except Exception as err:
             logging.exception("Couldn't extract necessary information from telegram.")
             logging.exception(err)
+            if metrics is not None:
+                metrics.failed["extract"] += 1
             return False
 
         # Map telegram information to knx a-priori information
+        entry = ga_table[dst_raw]
+        if entry is None:
+            logging.error("No mapping for %s.", telegram.destination_address)
+            if metrics is not None:
+                metrics.failed["unmapped"] += 1
+            return False
+
+        src = telegram.source_address
+        dst = entry.address
+        name = entry.name
+        unit = entry.unit
+        # Time of reception, not of the (batched) commit
+        now = utcnow()
         try:
-            meta = mapping[str(dst)]
-
-            name = meta["name"]
-            dtype = meta["dtype"]
-            xknx_class = DTYPE2XKNX[dtype]
-
-            # Calculate value
-            # Also translate hvac enum
-            if xknx_class in (
-                dpt.DPTHVACContrMode,
-                dpt.DPTHVACMode,
-                dpt.DPTHVACStatus,
-            ):
-                # This is an enum, just take the raw value
-                value = value_raw[0]
-            if is_binary(xknx_class):
-                # Keep the binary as integer for easier storage
-                value = int(value_raw)
-            else:
-                value = xknx_class.from_knx(DPTArray(value_raw))
-
-            # Translate time_struct to datetime objects
-            if dtype == "DPST-10-1":
-                # value_raw is a tuple with 3 elements
-                value = dt.time(
-                    hour=value_raw[0] & 0b11111,
-                    minute=value_raw[1],
-                    second=value_raw[2],
-                )
-            elif dtype == "DPST-11-1":
-                value = dt.date(day=value_raw[0], month=value_raw[1], year=value_raw[2])
-            elif dtype == "DPST-19-1":
-                # value_raw is a tuple with 8 elements
-                value = dt.datetime(
-                    year=value_raw[0],
-                    month=value_raw[1],
-                    day=value_raw[2],
-                    hour=value_raw[3] & 0b11111,
-                    minute=value_raw[4],
-                    second=value_raw[5],
-                )
-            # Translate RGB(W), XYY colors values to int
-            elif dtype == "DPST-242-600":
-                value = value_raw[1] << 8 | value_raw[0]
-            elif dtype == "DPST-232-600":
-                value = value_raw[2] << 16 | value_raw[1] << 8 | value_raw[0]
-            elif dtype == "DPST-251-600":
-                value = value_raw[3] << 24 | value_raw[2] << 16 | value_raw[1] << 8 | value_raw[0]
-
-            # TODO: Restructure
-            # Catch remaining enums. Damn you HVAC control...
-            elif isinstance(value, Enum):
-                value = value._value_
-
-            elif isinstance(value, HVACStatus):
-                # TODO: Proper implementation
-                value = value.as_dict()
-                value = 0
-
-            elif isinstance(value, SceneControl):
-                # Note: Dropping the "learn" info.
-                value = value.scene_number
-
-            elif isinstance(value, TariffActiveEnergy):
-                # Note: Dropping the tariff
-                value = value.energy
-
-            # Get unit (if existent)
-            try:
-                unit = xknx_class.unit
-            except AttributeError:
-                unit = ""
-            if unit is None:
-                unit = ""
+            start = time.perf_counter()
+            value = entry.decode(value_raw)
+            if metrics is not None:
+                metrics.decode_latency.observe(time.perf_counter() - start)
+                metrics.decoded[entry.dtype] += 1
             logging.info("%s sent %s%s from %s to %s.", name, value, unit, src, dst)
         except Exception as err:
             logging.exception(
                 "Couldn't map received telegram to a-priori knx information.",
             )
             logging.exception(err)
+            if metrics is not None:
+                metrics.failed["decode"] += 1
             return False
 
-        # Translate information to db ORM
-        try:
-            orm_name = xknx2name(xknx_class)
-            orm_class = getattr(orm, orm_name)
-            orm_instance = orm_class(src=src, dst=dst, name=name, value=value)
-        except Exception as err:
-            logging.exception("Couldn't map info to ORM.")
-            logging.exception(err)
-            return False
+        # The latest value, stored or not, see `logger.lastvalue`
+        if status is not None:
+            status.values.update(entry, dst_raw, value, src, now)
+            # Live subscribers, see `logger.stream`
+            status.stream.publish(entry, dst_raw, value, src, now)
+        if shared is not None:
+            try:
+                shared.update(dst_raw, value, src, now)
+            except (struct.error, OverflowError) as err:
+                # Still stored, only the shared value is stale
+                logging.warning("Couldn't share %s%s of %s: %s", value, unit, dst, err)
+
+        # Translate information to a row of the ORM's table
+        row = entry.row(value, src, now)
+        rows = [row]
+        if entry.filter is not None:
+            # A change held back by min_interval goes first once due
+            held = entry.filter.release()
+            # Drop values that didn't change enough, see logger.filters
+            rows = [] if held is None else [held]
+            if entry.filter.accept(value, item=row):
+                rows.append(row)
+            else:
+                logging.debug("Filtered %s%s to %s.", value, unit, dst)
+                if metrics is not None:
+                    metrics.filtered += 1
 
         # Save to db
-        try:
-            db_session.add(orm_instance)
-            db_session.commit()
-        except Exception as err:
-            logging.exception("Couldn't save instance of orm: %s", orm_instance)
-            logging.exception(err)
-            return False
+        for row_ in rows:
+            try:
+                if writer is None:
+                    start = time.perf_counter()
+                    insert_rows(db_session, [row_])
+                    db_session.commit()
+                    if metrics is not None:
+                        metrics.commit_latency.observe(time.perf_counter() - start)
+                        metrics.written += 1
+                else:
+                    await writer.put(row_)
+            except Exception as err:
+                logging.exception("Couldn't save row: %s", row_)
+                logging.exception(err)
+                if metrics is not None:
+                    metrics.failed["queue" if writer is not None else "commit"] += 1
+                return False
 
         # Populate status
         if status is not None:
@@ -237,26 +245,87 @@ async def run(
     knx_connection_type: ConnectionType = ConnectionType.AUTOMATIC,
     status_server: bool = False,
     status_server_port: int = 8080,
+    status_server_async: bool = False,
+    db_batch_size: int = 500,
+    db_batch_max_age: float = 0.25,
+    db_schema: str = "per_dtype",
+    db_rollups: bool = False,
+    db_spool: Path | None = None,
+    db_spool_max_bytes: int = 2**30,
+    capture_dir: Path | None = None,
+    capture_only: bool = False,
+    shared_values: Path | None = None,
 ) -> None:
-    """Write all logged knx telegrams to a db."""
+    """Write all logged knx telegrams to a db.
+
+    Telegrams are committed in batches of up to `db_batch_size` rows,
+    a row waits at most `db_batch_max_age` seconds for its commit. The
+    commits are done by a writer thread, the event loop only decodes.
+    For async drivers (e.g. `sqlite+aiosqlite://`, `postgresql+asyncpg://`)
+    the commits are awaited on the event loop instead. Postgres with
+    psycopg2 or psycopg gets the batches streamed with `COPY`, sqlite the
+    pragmas of `logger.util.apply_sqlite_profile`.
+
+    With `db_schema="unified"` all telegrams go into the single table
+    of `logger.orm_unified` instead of one table per dtype. Schemas with
+    a groupaddress table get it updated from the mapping at startup.
+    Schemas partitioned by month get the partitions of the current and
+    the next month at startup and then regularly, see `maintain_partitions`.
+
+    With `db_rollups` each batch also updates the per minute and hour
+    rollups of the numeric values, see `logger.rollup`.
+
+    With a `db_spool` directory batches failing to commit are kept on disk,
+    up to `db_spool_max_bytes`, and replayed once the database is back,
+    see `logger.spool`.
+
+    With `status_server_async` the status server runs on the event loop
+    instead of a thread, see `logger.statusserver.AsyncStatusServer`. It
+    also serves the history, unless the driver is async, see `logger.export`.
+
+    With a `capture_dir` every telegram is also appended undecoded to the
+    hourly capture files, see `logger.capture`. With `capture_only` that is
+    all, no mapping is loaded and nothing is decoded or stored in the db.
+
+    With `shared_values` the last numeric value of each group address is
+    published in a memory mapped file, e.g. `logger.sharedvalues.DEFAULT_PATH`,
+    for other local processes, see `logger.sharedvalues.SharedValuesReader`.
+
+    Raises
+    ------
+    ValueError
+        If `capture_only` is set without a `capture_dir`.
+
+    """
+    if capture_only and capture_dir is None:
+        error_msg = "capture_only needs a capture_dir."
+        raise ValueError(error_msg)
+    capture = CaptureWriter(capture_dir) if capture_dir is not None else None
+
     # Get validated mapping
-    mapping = await get_mapping(knx_mapping)
+    mapping = None if capture_only else await get_mapping(knx_mapping, db_schema)
 
     # Get up a status server
     status = None
     if status_server:
         logging.info("Status Server enabled.")
-        from logger.statusserver import StatusServer
+        from logger.statusserver import AsyncStatusServer, StatusServer
 
         status = Data(
             last_rx_time=dt.datetime(year=2000, month=1, day=1),
             max_delta=dt.timedelta(minutes=5),
             data_dict={},
         )
-        server = StatusServer(port=status_server_port, data=status)
-        Thread(target=server.run).start()
-
-    # Get session with scope
+        if status_server_async:
+            # The history at `/export` needs a sync driver
+            export = ExportSource(db_addr, mapping, db_schema) if mapping is not None and not is_async_addr(db_addr) else None
+            # Serves until the loop ends
+            await AsyncStatusServer(status, port=status_server_port, export=export).start()
+        else:
+            server = StatusServer(port=status_server_port, data=status)
+            Thread(target=server.run).start()
+
+    # Get knx connection
     connection_conf = ConnectionConfig(
         connection_type=knx_connection_type,
         local_ip=knx_local_ip,
@@ -270,8 +339,199 @@ async def run(
         daemon_mode=True,
         connection_config=connection_conf,
     )
-    with session_scope(db_addr) as session:
-        rx_cb = await get_rx_cb(mapping, session, status)
-        xknx.telegram_queue.register_telegram_received_cb(rx_cb)
+
+    if mapping is None:
+        if capture is not None:
+            await capture_telegrams(xknx, capture, status)
+        return
+
+    # Async drivers are awaited on the loop, everything else gets a thread
+    writer: BaseWriter
+    metadata = get_orm(db_schema).Base.metadata
+    if db_rollups:
+        # Created along with the other tables by the session scopes
+        rollup_tables(metadata)
+    spool = Spool(db_spool, metadata, max_bytes=db_spool_max_bytes) if db_spool is not None else None
+    shared = SharedValues(shared_values) if shared_values is not None else None
+    if is_async_addr(db_addr):
+        async with async_session_scope(db_addr, db_schema, sqlite_profile=True) as session:
+            await session.run_sync(sync_groupaddresses, mapping)
+            await session.run_sync(ensure_partitions, metadata)
+            await session.commit()
+            writer = AsyncBatchWriter(
+                session,
+                batch_size=db_batch_size,
+                max_age=db_batch_max_age,
+                status=status,
+                rollups=db_rollups,
+                spool=spool,
+            )
+            await log_telegrams(xknx, mapping, status, writer, maintenance=maintain_partitions(db_addr, db_schema), capture=capture, shared=shared)
+    else:
+        with session_scope(db_addr, db_schema, sqlite_profile=True) as session:
+            sync_groupaddresses(session, mapping)
+            ensure_partitions(session, metadata)
+        writer = ThreadedBatchWriter(
+            db_addr,
+            schema=db_schema,
+            sqlite_profile=True,
+            batch_size=db_batch_size,
+            max_age=db_batch_max_age,
+            status=status,
+            rollups=db_rollups,
+            spool=spool,
+        )
+        await log_telegrams(xknx, mapping, status, writer, maintenance=maintain_partitions(db_addr, db_schema), capture=capture, shared=shared)
+
+
+def create_partitions(db_addr: str, db_schema: str) -> list[str]:
+    """Create the partitions of the current and the next month."""
+    with session_scope(db_addr, db_schema, sqlite_profile=True) as session:
+        return ensure_partitions(session, get_orm(db_schema).Base.metadata)
+
+
+async def maintain_partitions(db_addr: str, db_schema: str, interval: float = PARTITION_INTERVAL) -> None:
+    """Create the partitions of the next month ahead of time, until cancelled.
+
+    Returns right away if the schema isn't partitioned. Failures are
+    logged and retried with the next check.
+    """
+    metadata = get_orm(db_schema).Base.metadata
+    if not partitioned_tables(metadata):
+        return
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if is_async_addr(db_addr):
+                async with async_session_scope(db_addr, db_schema, sqlite_profile=True) as session:
+                    names = await session.run_sync(ensure_partitions, metadata)
+            else:
+                names = await asyncio.to_thread(create_partitions, db_addr, db_schema)
+            logging.debug("Partitions available: %s", ", ".join(names))
+        except Exception as err:
+            logging.exception("Couldn't create partitions.")
+            logging.exception(err)
+
+
+def held_filters(mapping: GATable) -> list[ValueFilter]:
+    """Get the filters of the mapping that can hold changes back, see `logger.filters`."""
+    return [entry.filter for entry in mapping if entry is not None and entry.filter is not None and entry.filter.min_interval]
+
+
+async def store_held(filters: list[ValueFilter], writer: BaseWriter, now: float | None = None) -> int:
+    """Hand the held back changes that are due to the writer.
+
+    Returns
+    -------
+    int
+        Number of stored changes.
+
+    """
+    count = 0
+    for value_filter in filters:
+        row = value_filter.release(now)
+        if row is not None:
+            await writer.put(row)
+            count += 1
+    return count
+
+
+async def release_held(filters: list[ValueFilter], writer: BaseWriter, interval: float = RELEASE_INTERVAL) -> None:
+    """Store the changes held back by `min_interval` once due, until cancelled.
+
+    Otherwise the last change of a group address going quiet would only
+    be stored with its next telegram. Failures are logged and retried with
+    the next check.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await store_held(filters, writer)
+        except Exception as err:
+            logging.exception("Couldn't store held back changes.")
+            logging.exception(err)
+
+
+async def flush_capture(capture: CaptureWriter) -> None:
+    """Flush the capture every `flush_interval` seconds, until cancelled.
+
+    Otherwise the telegrams captured before the bus goes quiet would stay
+    buffered until the next one. Failures are logged and retried with the
+    next flush.
+    """
+    while True:
+        await asyncio.sleep(capture.flush_interval)
+        try:
+            capture.flush()
+        except OSError as err:
+            logging.exception("Couldn't flush the capture.")
+            logging.exception(err)
+
+
+async def log_telegrams(
+    xknx: XKNX,
+    mapping: GATable,
+    status: Data | None,
+    writer: BaseWriter,
+    *,
+    maintenance: Coroutine | None = None,
+    capture: CaptureWriter | None = None,
+    shared: SharedValues | None = None,
+) -> None:
+    """Hand all received telegrams to the writer until xknx stops.
+
+    The maintenance, e.g. `maintain_partitions`, runs alongside, as does
+    storing the changes held back by `min_interval`, see `release_held`.
+    With a capture the telegrams are also captured raw, ahead of decoding
+    them, and flushed while the bus is quiet, see `flush_capture`. With shared values the values are also published, see `get_rx_cb`.
+    """
+    writer.start()
+    task = asyncio.create_task(maintenance) if maintenance is not None else None
+    filters = held_filters(mapping)
+    release_task = asyncio.create_task(release_held(filters, writer)) if filters else None
+    flush_task = asyncio.create_task(flush_capture(capture)) if capture is not None else None
+    if capture is not None:
+        xknx.telegram_queue.register_telegram_received_cb(capture.telegram_received)
+    rx_cb = await get_rx_cb(mapping, None, status, writer, shared)
+    xknx.telegram_queue.register_telegram_received_cb(rx_cb)
+    try:
+        await xknx.start()
+        await xknx.stop()
+    finally:
+        if task is not None:
+            task.cancel()
+        if release_task is not None:
+            release_task.cancel()
+        if flush_task is not None:
+            flush_task.cancel()
+        # Don't lose what is still held back or queued
+        try:
+            await store_held(filters, writer, math.inf)
+        except Exception as err:
+            logging.exception("Couldn't store held back changes.")
+            logging.exception(err)
+        await writer.close()
+        if capture is not None:
+            capture.close()
+        if shared is not None:
+            shared.close()
+
+
+async def capture_telegrams(xknx: XKNX, capture: CaptureWriter, status: Data | None) -> None:
+    """Capture all received telegrams raw until xknx stops, see `logger.capture`."""
+
+    def capture_rx_cb(telegram: Telegram) -> None:
+        capture.telegram_received(telegram)
+        if status is not None:
+            status.last_rx_time = dt.datetime.now()
+            status.data_dict["captured"] = capture.count
+
+    xknx.telegram_queue.register_telegram_received_cb(capture_rx_cb)
+    flush_task = asyncio.create_task(flush_capture(capture))
+    try:
         await xknx.start()
         await xknx.stop()
+    finally:
+        flush_task.cancel()
+        capture.close()
@@ -0,0 +1,103 @@
+"""Database helpers around the generated schemas."""
+
+from sqlalchemy import DDL, MetaData, Table, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from logger.mapping import GATable
+
+# Postgres functions rendering raw addresses, e.g. `SELECT knx_ga(dst) FROM switch`
+PG_FUNCTIONS = (
+    "CREATE OR REPLACE FUNCTION knx_ga(address integer) RETURNS text AS $$ SELECT (address >> 11) || '/' || ((address >> 8) & 7) || '/' || (address & 255) $$ LANGUAGE SQL IMMUTABLE",
+    "CREATE OR REPLACE FUNCTION knx_ia(address integer) RETURNS text AS $$ SELECT (address >> 12) || '.' || ((address >> 8) & 15) || '.' || (address & 255) $$ LANGUAGE SQL IMMUTABLE",
+)
+
+
+def ga_sql(column: str) -> str:
+    """Render a raw group address column as `a/b/c` in portable SQL."""
+    return f"CAST(({column} >> 11) & 31 AS TEXT) || '/' || CAST(({column} >> 8) & 7 AS TEXT) || '/' || CAST({column} & 255 AS TEXT)"
+
+
+def ia_sql(column: str) -> str:
+    """Render a raw individual address column as `a.b.c` in portable SQL."""
+    return f"CAST(({column} >> 12) & 15 AS TEXT) || '.' || CAST(({column} >> 8) & 15 AS TEXT) || '.' || CAST({column} & 255 AS TEXT)"
+
+
+def view_name(table: Table) -> str:
+    """Name of the view rendering the addresses of a table."""
+    return f"{table.name}_view"
+
+
+def get_view_sql(table: Table) -> str:
+    """Create a view of a table with `src` and `dst` rendered as strings."""
+    columns = []
+    for column in table.columns:
+        if column.name == "src":
+            columns.append(f"{ia_sql(column.name)} AS src")
+        elif column.name == "dst":
+            columns.append(f"{ga_sql(column.name)} AS dst")
+        else:
+            columns.append(column.name)
+    return f"CREATE VIEW {view_name(table)} AS SELECT {', '.join(columns)} FROM {table.name}"  # noqa: S608
+
+
+def add_address_views(metadata: MetaData) -> None:
+    """Create helper views (and postgres functions) along with the tables.
+
+    For schemas storing `src` and `dst` as raw integers. Each table gets
+    a view `<table>_view` showing the `a.b.c` and `a/b/c` forms, postgres
+    additionally gets the functions `knx_ia` and `knx_ga`.
+    """
+    for sql in PG_FUNCTIONS:
+        event.listen(metadata, "before_create", DDL(sql).execute_if(dialect="postgresql"))
+
+    for table in metadata.tables.values():
+        if "dst" not in table.columns:
+            continue
+        event.listen(table, "after_create", DDL(get_view_sql(table)))
+        event.listen(table, "before_drop", DDL(f"DROP VIEW IF EXISTS {view_name(table)}"))
+
+
+def sync_groupaddresses(session: Session, ga_table: GATable) -> int:
+    """Maintain the groupaddress table from the mapping, doesn't commit.
+
+    Only for schemas storing the names in a groupaddress table instead of
+    each row. New addresses are inserted and changed ones updated, so a
+    renamed group address is a single row update. Addresses no longer
+    mapped are kept for their history.
+
+    Parameters
+    ----------
+    session : Session
+        Session of the database
+    ga_table : GATable
+        The compiled mapping
+
+    Returns
+    -------
+    int
+        Number of inserted or updated group addresses.
+
+    """
+    entries = [entry for entry in ga_table if entry is not None]
+    if not entries:
+        return 0
+    table = entries[0].table.metadata.tables.get("groupaddress")
+    if table is None:
+        return 0
+
+    existing = {row.address: row for row in session.execute(select(table))}
+    inserts = []
+    changes = 0
+    for entry in entries:
+        address = entry.columns["dst"]
+        values = {"name": entry.name, "dtype": entry.dtype, "unit": entry.unit}
+        row = existing.get(address)
+        if row is None:
+            inserts.append({"address": address, **values})
+        elif any(getattr(row, key) != value for key, value in values.items()):
+            session.execute(update(table).where(table.c.address == address).values(**values))
+            changes += 1
+
+    if inserts:
+        session.execute(insert(table), inserts)
+    return changes + len(inserts)
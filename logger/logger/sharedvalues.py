@@ -0,0 +1,215 @@
+"""Last values of all group addresses in shared memory, for other local processes.
+
+The runner writes the last numeric value of each group address to a memory
+mapped file, by default `/dev/shm/knx-logger-values`. Other processes map the
+same file with `SharedValuesReader` and read the live state without a syscall
+or a request per read:
+
+    with SharedValuesReader() as values:
+        values.get("1/2/3")
+
+The file is a 16 byte header (magic, version, slot size and slot count)
+followed by one 32 byte slot per raw group address, little endian:
+
+======  =======  ================================================
+offset  type     field
+======  =======  ================================================
+0       uint32   sequence, odd while the slot is written
+4       uint8    kind of the value, see the `KIND_` constants
+8       int64    time of reception, microseconds since the epoch
+16      8 byte   value, float64 or int64 depending on the kind
+24      uint16   raw individual address of the source
+======  =======  ================================================
+
+There is a single writer, the slots are a seqlock: readers retry while the
+sequence is odd or changed during their read, so they never block it.
+Strings, times and dates aren't shared, see `logger.lastvalue` for those.
+"""
+
+import datetime as dt
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from types import TracebackType
+from typing import Any, NamedTuple, Self
+
+from xknx.telegram import GroupAddress, IndividualAddress
+
+from logger.capture import EPOCH
+
+MAGIC = b"KNXLV\x00"
+VERSION = 1
+HEADER = struct.Struct("<6sHHI2x")
+SLOT = struct.Struct("<IB3xqQH6x")
+SEQUENCE = struct.Struct("<I")
+FIELDS = struct.Struct("<B3xqQH")
+SLOT_COUNT = 2**16
+SIZE = HEADER.size + SLOT_COUNT * SLOT.size
+
+KIND_EMPTY = 0
+KIND_FLOAT = 1
+KIND_INT = 2
+KIND_BOOL = 3
+
+FLOAT64 = struct.Struct("<d")
+INT64 = struct.Struct("<q")
+UINT64 = struct.Struct("<Q")
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+# Reads of a slot before giving up, only reached if the writer is stuck mid-write
+MAX_RETRIES = 1000
+
+DEFAULT_PATH = Path("/dev/shm") / "knx-logger-values" if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir()) / "knx-logger-values"  # noqa: S108
+
+
+class SharedValue(NamedTuple):
+    """A value read from shared memory."""
+
+    value: float | int | bool
+    time: dt.datetime
+    src: IndividualAddress
+    sequence: int
+
+
+def encode(value: Any) -> tuple[int, int] | None:
+    """Get kind and bits of a value, None if it isn't numeric or an int beyond int64."""
+    if isinstance(value, bool):
+        return KIND_BOOL, int(value)
+    if isinstance(value, int):
+        if not INT64_MIN <= value <= INT64_MAX:
+            return None
+        return KIND_INT, UINT64.unpack(INT64.pack(value))[0]
+    if isinstance(value, float):
+        return KIND_FLOAT, UINT64.unpack(FLOAT64.pack(value))[0]
+    return None
+
+
+def decode(kind: int, bits: int) -> float | int | bool:
+    """Get the value of kind and bits, see `encode`."""
+    if kind == KIND_FLOAT:
+        return FLOAT64.unpack(UINT64.pack(bits))[0]
+    if kind == KIND_BOOL:
+        return bool(bits)
+    return INT64.unpack(UINT64.pack(bits))[0]
+
+
+def slot_offset(raw: int) -> int:
+    """Get the offset of the slot of a raw group address."""
+    return HEADER.size + raw * SLOT.size
+
+
+class SharedValues:
+    """The writer of the shared values, there must be only one per file."""
+
+    def __init__(self, path: Path = DEFAULT_PATH) -> None:
+        """Create or reuse the file, the previous values are cleared."""
+        self.path = Path(path)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != SIZE:
+                os.ftruncate(fd, SIZE)
+            self._mmap = mmap.mmap(fd, SIZE, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        # Readers mapping the file meanwhile see empty slots
+        self._mmap[HEADER.size :] = bytes(SIZE - HEADER.size)
+        self._mmap[: HEADER.size] = HEADER.pack(MAGIC, VERSION, SLOT.size, SLOT_COUNT)
+        self.updates = 0
+
+    def update(self, raw: int, value: Any, src: IndividualAddress, time: dt.datetime) -> bool:
+        """Publish the value of a raw group address.
+
+        Returns
+        -------
+            True if the value is published
+            False if it isn't numeric or doesn't fit, the slot keeps the previous one
+
+        """
+        encoded = encode(value)
+        if encoded is None:
+            return False
+        kind, bits = encoded
+        offset = slot_offset(raw)
+        buffer = self._mmap
+        (sequence,) = SEQUENCE.unpack_from(buffer, offset)
+        # Odd while writing, readers retry
+        SEQUENCE.pack_into(buffer, offset, (sequence + 1) & 0xFFFFFFFF)
+        FIELDS.pack_into(buffer, offset + SEQUENCE.size, kind, (time - EPOCH) // dt.timedelta(microseconds=1), bits, src.raw)
+        SEQUENCE.pack_into(buffer, offset, (sequence + 2) & 0xFFFFFFFF)
+        self.updates += 1
+        return True
+
+    def close(self) -> None:
+        """Unmap the file, it is kept for the readers."""
+        self._mmap.close()
+
+
+class SharedValuesReader:
+    """Read the shared values of another process."""
+
+    def __init__(self, path: Path = DEFAULT_PATH) -> None:
+        """Map the file of a writer.
+
+        Raises
+        ------
+        ValueError
+            If it isn't a file of shared values of this version.
+
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as file_:
+            self._mmap = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) != SIZE or HEADER.unpack_from(self._mmap) != (MAGIC, VERSION, SLOT.size, SLOT_COUNT):
+            self._mmap.close()
+            error_msg = f"{path} isn't a file of shared values of version {VERSION}."
+            raise ValueError(error_msg)
+
+    def read(self, raw: int) -> tuple[int, int, int, int, int] | None:
+        """Read the slot of a raw group address consistently.
+
+        Returns
+        -------
+        tuple | None
+            Sequence, kind, timestamp, bits of the value and raw source, None if the slot is empty.
+
+        Raises
+        ------
+        TimeoutError
+            If the slot didn't settle, i.e. the writer died while writing it.
+
+        """
+        offset = slot_offset(raw)
+        buffer = self._mmap
+        for _ in range(MAX_RETRIES):
+            (before,) = SEQUENCE.unpack_from(buffer, offset)
+            if before & 1:
+                continue
+            kind, timestamp, bits, src = FIELDS.unpack_from(buffer, offset + SEQUENCE.size)
+            (after,) = SEQUENCE.unpack_from(buffer, offset)
+            if before == after:
+                return None if kind == KIND_EMPTY else (before, kind, timestamp, bits, src)
+        error_msg = f"Slot {raw} is still being written."
+        raise TimeoutError(error_msg)
+
+    def get(self, address: str | int) -> SharedValue | None:
+        """Get the value of a group address, e.g. `1/2/3`, None if there is none."""
+        slot = self.read(GroupAddress(address).raw)
+        if slot is None:
+            return None
+        sequence, kind, timestamp, bits, src = slot
+        return SharedValue(decode(kind, bits), EPOCH + dt.timedelta(microseconds=timestamp), IndividualAddress(src), sequence)
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+    def __enter__(self) -> Self:
+        """Use the reader as context manager."""
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None) -> None:
+        """Unmap the file."""
+        self.close()
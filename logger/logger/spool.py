@@ -0,0 +1,276 @@
+"""Durable on-disk spool for rows the database didn't take.
+
+While the database is unreachable the writers append their failed batches
+to the spool instead of dropping them, and replay them in bulk once a
+flush succeeds again, see `logger.writer.BaseWriter`.
+
+The spool is a directory of append-only segments `spool-<number>.bin`.
+Each record is a row, a 4 byte big endian length followed by the json of
+`[table name, {column: value}]`. A batch is fsync'd as a whole. Segments
+are removed once replayed, a crash during a replay replays the segment
+again, i.e. rows are delivered at least once.
+"""
+
+import datetime as dt
+import json
+import logging
+import os
+import struct
+import time
+from collections.abc import Callable, Iterator
+from functools import cache
+from pathlib import Path
+from threading import Lock
+from typing import IO, Any
+
+from sqlalchemy import MetaData, Table
+from sqlalchemy.orm import Session
+
+HEADER = struct.Struct(">I")
+SEGMENT_GLOB = "spool-*.bin"
+
+# A row to insert: (table, {column: value}), see `logger.writer.Row`
+Row = tuple[Table, dict[str, Any]]
+
+
+def _json_default(value: Any) -> str:
+    """Encode times and dates for json."""
+    if isinstance(value, dt.date | dt.time):
+        return value.isoformat()
+    error_msg = f"Can't spool {value!r}."
+    raise TypeError(error_msg)
+
+
+def encode(row: Row) -> bytes:
+    """Encode a row as length prefixed record."""
+    table, values = row
+    payload = json.dumps([table.name, values], default=_json_default, separators=(",", ":")).encode()
+    return HEADER.pack(len(payload)) + payload
+
+
+@cache
+def _parsers(table: Table) -> dict[str, Callable[[str], Any]]:
+    """Get the parsers of the time and date columns of a table."""
+    parsers = {}
+    for column in table.columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        if python_type in (dt.datetime, dt.date, dt.time):
+            parsers[column.name] = python_type.fromisoformat
+    return parsers
+
+
+def decode(payload: bytes, metadata: MetaData) -> Row:
+    """Decode the payload of a record into a row of a table of the metadata."""
+    name, values = json.loads(payload)
+    table = metadata.tables[name]
+    for column, parse in _parsers(table).items():
+        if values.get(column) is not None:
+            values[column] = parse(values[column])
+    return table, values
+
+
+class Spool:
+    """Append-only spool of rows with bounded size.
+
+    Appends, replays and closing are serialized, e.g. the threaded writer
+    spools from the loop and from its thread.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        metadata: MetaData,
+        *,
+        max_bytes: int = 2**30,
+        segment_bytes: int = 2**24,
+    ) -> None:
+        """Initialize the spool, rows spooled before are kept.
+
+        Parameters
+        ----------
+        directory : Path
+            Directory of the segments, created if missing
+        metadata : MetaData
+            Schema of the spooled rows
+        max_bytes : int
+            Maximum size of all segments, further rows are dropped, defaults to 1 GiB
+        segment_bytes : int
+            Size after which a new segment is started, defaults to 16 MiB
+
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.metadata = metadata
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+
+        self.rows_spooled = 0
+        self.rows_replayed = 0
+        self.rows_dropped = 0
+        self.replay_rate = 0.0
+
+        self._lock = Lock()
+        self._file: IO[bytes] | None = None
+        self._offset = 0  # Replayed bytes of the oldest segment
+        self.size = sum(path.stat().st_size for path in self.segments())
+
+    def segments(self) -> list[Path]:
+        """Get the segments, oldest first."""
+        return sorted(self.directory.glob(SEGMENT_GLOB), key=lambda path: int(path.stem.split("-")[1]))
+
+    @property
+    def pending_bytes(self) -> int:
+        """Size of the rows still to replay."""
+        return self.size - self._offset
+
+    @property
+    def pending(self) -> bool:
+        """Check if there are rows to replay."""
+        return self.pending_bytes > 0
+
+    def append(self, batch: list[Row]) -> bool:
+        """Append a batch and fsync it.
+
+        Returns
+        -------
+            True if the batch is spooled
+            False if it is dropped, as the spool is full
+
+        """
+        data = b"".join(encode(row) for row in batch)
+        with self._lock:
+            return self._append(data, len(batch))
+
+    def _append(self, data: bytes, rows: int) -> bool:
+        """Append encoded rows, see `append`."""
+        if self.size + len(data) > self.max_bytes:
+            self.rows_dropped += rows
+            logging.error("Spool is full, dropped %i rows.", rows)
+            return False
+
+        file = self._segment(len(data))
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+        self.size += len(data)
+        self.rows_spooled += rows
+        return True
+
+    def _segment(self, length: int) -> IO[bytes]:
+        """Get the segment to append to, starts a new one when full."""
+        if self._file is not None and self._file.tell() and self._file.tell() + length > self.segment_bytes:
+            self._close_segment()
+        if self._file is None:
+            segments = self.segments()
+            number = int(segments[-1].stem.split("-")[1]) + 1 if segments else 0
+            self._file = (self.directory / f"spool-{number:08d}.bin").open("ab")
+        return self._file
+
+    def _close_segment(self) -> None:
+        """Close the segment appended to, the next append starts a new one."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self, path: Path, offset: int = 0) -> Iterator[tuple[int, Row]]:
+        """Read the rows of a segment, with the offset following each.
+
+        A truncated record at the end, e.g. after a crash, ends the segment.
+        """
+        with path.open("rb") as file_:
+            data = file_.read()
+        while offset + HEADER.size <= len(data):
+            (length,) = HEADER.unpack_from(data, offset)
+            end = offset + HEADER.size + length
+            if end > len(data):
+                logging.warning("Truncated record at %i of %s.", offset, path)
+                break
+            yield end, decode(data[offset + HEADER.size : end], self.metadata)
+            offset = end
+
+    def replay(
+        self,
+        session: Session,
+        write: Callable[[Session, list[Row]], Any],
+        *,
+        batch_size: int = 500,
+        max_rows: int | None = None,
+    ) -> int:
+        """Write spooled rows in batches and commit each, oldest first.
+
+        Stops after `max_rows` rows, the rest is replayed next time.
+        Errors are raised, the failed batch stays in the spool.
+
+        Parameters
+        ----------
+        session : Session
+            Session to write to
+        write : Callable
+            Writes a batch without committing, e.g. `logger.writer.insert_rows`
+        batch_size : int
+            Maximum number of rows per commit, defaults to 500
+        max_rows : int | None
+            Maximum number of rows to replay, defaults to all
+
+        Returns
+        -------
+        int
+            Number of replayed rows.
+
+        """
+        with self._lock:
+            return self._replay(session, write, batch_size, max_rows)
+
+    def _replay(self, session: Session, write: Callable[[Session, list[Row]], Any], batch_size: int, max_rows: int | None) -> int:
+        """Replay the spooled rows, see `replay`."""
+        start = time.perf_counter()
+        count = 0
+        for path in self.segments():
+            if max_rows is not None and count >= max_rows:
+                break
+            # Appends go to a new segment from now on
+            if self._file is not None and Path(self._file.name) == path:
+                self._close_segment()
+
+            batch: list[Row] = []
+            end = self._offset
+            complete = True
+            for end, row in self.read(path, self._offset):
+                batch.append(row)
+                if len(batch) >= batch_size or (max_rows is not None and count + len(batch) >= max_rows):
+                    count += self._commit(session, write, batch, end)
+                    batch = []
+                    if max_rows is not None and count >= max_rows:
+                        complete = False
+                        break
+            if batch:
+                count += self._commit(session, write, batch, end)
+            if not complete:
+                break
+
+            # Replayed, drop the segment
+            self.size -= path.stat().st_size
+            self._offset = 0
+            path.unlink()
+
+        duration = time.perf_counter() - start
+        if count:
+            self.replay_rate = count / duration if duration else float(count)
+            logging.info("Replayed %i spooled rows in %.3fs.", count, duration)
+        return count
+
+    def _commit(self, session: Session, write: Callable[[Session, list[Row]], Any], batch: list[Row], end: int) -> int:
+        """Write and commit a batch, then mark it as replayed."""
+        write(session, batch)
+        session.commit()
+        self._offset = end
+        self.rows_replayed += len(batch)
+        return len(batch)
+
+    def close(self) -> None:
+        """Close the segment appended to."""
+        with self._lock:
+            self._close_segment()
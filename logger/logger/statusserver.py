@@ -2,13 +2,62 @@
 
 """Provide simple status of the logger."""
 
+import asyncio
 import json
 import logging
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime as dt
 from datetime import timedelta
+from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from threading import Thread
+from typing import Any
+from urllib.parse import parse_qs
+
+from xknx.exceptions import CouldNotParseAddress
+from xknx.telegram import GroupAddress
+
+from logger.export import CONTENT_TYPES, ExportSource
+from logger.lastvalue import LastValues, to_json
+from logger.metrics import Metrics
+from logger.stream import TelegramStream
+
+# Seconds an idle connection is kept open by the `AsyncStatusServer`
+KEEP_ALIVE_TIMEOUT = 60.0
+METRICS_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+VALUES_PATH = "/values"
+STREAM_PATH = "/stream"
+STREAM_TYPES = {"sse": b"text/event-stream", "ndjson": b"application/x-ndjson"}
+# Seconds without telegrams before a stream gets a heartbeat
+STREAM_HEARTBEAT = 15.0
+EXPORT_PATH = "/export"
+
+
+class StatusDict(dict):
+    """Dict counting its changes, so a serialised copy can be reused until it changes."""
+
+    version = 0
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """Set an item and count the change."""
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key: Any) -> None:
+        """Delete an item and count the change."""
+        super().__delitem__(key)
+        self.version += 1
+
+    def update(self, *args, **kwargs) -> None:
+        """Update the items and count the change."""
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def clear(self) -> None:
+        """Remove all items and count the change."""
+        super().clear()
+        self.version += 1
 
 
 @dataclass
@@ -18,12 +67,61 @@ class Data:
     last_rx_time: dt
     max_delta: timedelta
     data_dict: dict
+    metrics: Metrics = field(default_factory=Metrics)
+    values: LastValues = field(default_factory=LastValues)
+    stream: TelegramStream = field(default_factory=TelegramStream)
+
+    def __post_init__(self) -> None:
+        """Count the changes of the data dict, see `StatusDict`."""
+        if not isinstance(self.data_dict, StatusDict):
+            self.data_dict = StatusDict(self.data_dict)
 
     @property
     def valid(self) -> bool:
         """Return validty, i.e. younger than the max_delta."""
         return (self.last_rx_time - dt.now()) < self.max_delta
 
+    @property
+    def version(self) -> tuple:
+        """Key changing whenever the served status does."""
+        return (getattr(self.data_dict, "version", None), self.last_rx_time, self.valid)
+
+
+def get_status(data: Data) -> str:
+    """Serialise the data dict to json, with `all_good` set from its validity."""
+    data_clean: dict[str, str | bool] = {"all_good": False}
+    all_good = True
+
+    # Make objects serializiable, on a copy as writers update it meanwhile
+    try:
+        for key, val in dict(data.data_dict).items():
+            data_clean[key] = str(val)
+    except Exception as err:
+        all_good = False
+        logging.warning("Error: %s", err)
+
+    data_clean["all_good"] = all_good & data.valid
+    return json.dumps(data_clean, ensure_ascii=False)
+
+
+def is_values_path(path: str) -> bool:
+    """Check if a path asks for last values, i.e. `/values` or `/values/<ga>`."""
+    return path == VALUES_PATH or path.startswith(VALUES_PATH + "/")
+
+
+def get_values(data: Data, path: str) -> tuple[HTTPStatus, bytes]:
+    """Get the json of all last values at `/values`, or of one at e.g. `/values/1/2/3`."""
+    address = path.removeprefix(VALUES_PATH).strip("/")
+    if not address:
+        return HTTPStatus.OK, data.values.json()
+    try:
+        value = data.values.get(address)
+    except CouldNotParseAddress:
+        return HTTPStatus.BAD_REQUEST, to_json({"error": f"Invalid group address {address}."})
+    if value is None:
+        return HTTPStatus.NOT_FOUND, to_json({"error": f"No value of {address} yet."})
+    return HTTPStatus.OK, to_json(asdict(value))
+
 
 def get_server(data: Data) -> HTTPServer:
     """Closure for data."""
@@ -41,22 +139,21 @@ def get_server(data: Data) -> HTTPServer:
             self._set_headers()
 
         def do_GET(self) -> None:  # noqa: N802
-            """Serve the data tuple."""
-            data_clean: dict[str, str | bool] = {"all_good": False}
-            all_good = True
-
-            # Make objects serializiable
-            try:
-                for key, val in data.data_dict.items():
-                    data_clean[key] = str(val)
-            except Exception as err:
-                all_good = False
-                logging.warning("Error: %s", err)
+            """Serve the data tuple, the metrics at `/metrics` or the last values at `/values`."""
+            if self.path == "/metrics":
+                self._send_metrics()
+                return
+            if is_values_path(self.path):
+                self._send_values()
+                return
+            if self.path.partition("?")[0] in (STREAM_PATH, EXPORT_PATH):
+                # A stream would block this single threaded server
+                self.send_error(HTTPStatus.NOT_IMPLEMENTED, "Streams need the AsyncStatusServer.")
+                return
 
             # Dump it to json
             try:
-                data_clean["all_good"] = all_good & data.valid
-                data_json = json.dumps(data_clean, ensure_ascii=False)
+                data_json = get_status(data)
                 # Set header and body
                 self._set_headers()
                 self.wfile.write(data_json.encode("utf-8"))
@@ -65,6 +162,24 @@ def get_server(data: Data) -> HTTPServer:
             except Exception as err:
                 logging.warning("Error: %s", err)
 
+        def _send_metrics(self) -> None:
+            """Serve the metrics in the Prometheus text format."""
+            body = data.metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-type", METRICS_TYPE.decode())
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_values(self) -> None:
+            """Serve the last values as json."""
+            status, body = get_values(data, self.path)
+            self.send_response(status)
+            self.send_header("Content-type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
         def log_request(self, *args, **kwargs) -> None:
             """Only log requests as logging.debug."""
             logging.debug("Successfull request.")
@@ -109,6 +224,230 @@ class StatusServer:
         httpd.serve_forever()
 
 
+class AsyncStatusServer:
+    """Status server on the event loop of the logger.
+
+    Serves the same as the `StatusServer`, but without a thread: requests
+    are handled between the telegrams. The data is changed on the loop too,
+    the `logger.writer.ThreadedBatchWriter` hands its updates over, so it
+    isn't read while it is changed. Connections are kept alive and the json
+    is only serialised again once the data changed, see `Data.version`. Requests
+    aren't logged. Additionally the decoded telegrams are streamed live at
+    `/stream`, see `_stream`, and with an export source the history at
+    `/export`, see `_export`.
+    """
+
+    def __init__(self, data: Data, port: int = 8080, host: str | None = None, export: ExportSource | None = None) -> None:
+        """Initialize the server.
+
+        Parameters
+        ----------
+        data : Data
+            Dataclass to transport payload
+        port : int
+            Port of the server, defaults to 8080
+        host : str | None
+            Interface to listen on, defaults to all
+        export : ExportSource | None
+            Database to serve the history of, see `logger.export`
+
+        """
+        if not isinstance(data, Data):
+            raise TypeError
+        self.data = data
+        self.port = port
+        self.host = host
+        self.export = export
+        self.server: asyncio.Server | None = None
+        self._task: asyncio.Task | None = None
+        self._status: tuple[tuple, bytes] | None = None
+
+    async def start(self) -> None:
+        """Start serving on the running loop, until `close` or the loop ends."""
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        # Cancelling the task, e.g. at the end of `asyncio.run`, closes the server
+        self._task = asyncio.create_task(self.server.serve_forever())
+        logging.info("Starting async status server on port %i...", self.port)
+
+    async def close(self) -> None:
+        """Stop serving and close the server."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._task is not None:
+            self._task.cancel()
+
+    def status(self) -> bytes:
+        """Get the serialised status, reused until the data changes."""
+        version = self.data.version
+        if self._status is None or self._status[0] != version:
+            self._status = (version, get_status(self.data).encode("utf-8"))
+        return self._status[1]
+
+    def respond(self, path: str) -> tuple[HTTPStatus, bytes, bytes]:
+        """Get status, content type and body of a GET of a path."""
+        if path == "/metrics":
+            return HTTPStatus.OK, METRICS_TYPE, self.data.metrics.render().encode("utf-8")
+        if is_values_path(path):
+            status, body = get_values(self.data, path)
+            return status, b"application/json", body
+        return HTTPStatus.OK, b"application/json", self.status()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of a connection until it is closed."""
+        try:
+            while True:
+                request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                request_line, *header_lines = request.decode("latin-1").split("\r\n")
+                method, path, version = request_line.split(" ", 2)
+                headers = {name.strip().lower(): value.strip().lower() for name, _, value in (line.partition(":") for line in header_lines if line)}
+                connection = headers.get("connection", "")
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                target, _, query = path.partition("?")
+                if method == "GET" and target == STREAM_PATH:
+                    # Streams until the client is gone
+                    await self._stream(reader, writer, query)
+                    break
+                if method == "GET" and target == EXPORT_PATH:
+                    await self._export(writer, query)
+                    break
+
+                if method in ("GET", "HEAD"):
+                    status, content_type, body = self.respond(target)
+                else:
+                    status, content_type, body = HTTPStatus.METHOD_NOT_ALLOWED, b"text/plain", b""
+                writer.write(response_head(status, content_type, keep_alive=keep_alive, length=len(body)))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (TimeoutError, ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            # Idle, gone or garbled, drop the connection
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _error(writer: asyncio.StreamWriter, status: HTTPStatus, error: str) -> None:
+        """Answer with an error and close the connection."""
+        body = to_json({"error": error})
+        writer.write(response_head(status, b"application/json", keep_alive=False, length=len(body)) + body)
+        await writer.drain()
+
+    async def _stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, query: str) -> None:
+        """Stream the decoded telegrams, see `logger.stream`.
+
+        The query selects the format, `format=sse` (default) or `format=ndjson`,
+        and optionally filters, e.g. `ga=1/2/3&ga=1/2/4&dtype=DPST-9-1`.
+        """
+        params = parse_qs(query)
+        stream_format = params.get("format", ["sse"])[0]
+        content_type = STREAM_TYPES.get(stream_format)
+        if content_type is None:
+            await self._error(writer, HTTPStatus.BAD_REQUEST, f"Unknown format '{stream_format}', use one of {tuple(STREAM_TYPES)}.")
+            return
+        try:
+            addresses = frozenset(GroupAddress(address).raw for address in params.get("ga", [])) or None
+        except CouldNotParseAddress as err:
+            await self._error(writer, HTTPStatus.BAD_REQUEST, f"Invalid group address: {err}")
+            return
+        subscriber = self.data.stream.subscribe(addresses, frozenset(params.get("dtype", [])) or None)
+        if subscriber is None:
+            await self._error(writer, HTTPStatus.SERVICE_UNAVAILABLE, "Too many subscribers.")
+            return
+
+        sse = stream_format == "sse"
+        queue = subscriber.queue
+        writer.write(response_head(HTTPStatus.OK, content_type, keep_alive=False))
+        # Nothing is expected from the client, completes once it is gone
+        closed = asyncio.ensure_future(reader.read(1))
+        reported = 0
+        try:
+            while True:
+                get = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait((get, closed), timeout=STREAM_HEARTBEAT, return_when=asyncio.FIRST_COMPLETED)
+                if get not in done:
+                    get.cancel()
+                    if closed in done:
+                        break
+                    # Keeps proxies from closing the idle stream
+                    data = b": heartbeat\n\n" if sse else b"\n"
+                else:
+                    # Everything buffered meanwhile goes in one chunk
+                    events = [get.result()]
+                    while not queue.empty():
+                        events.append(queue.get_nowait())
+                    data = b""
+                    if subscriber.dropped != reported:
+                        reported = subscriber.dropped
+                        notice = to_json({"dropped": reported})
+                        data += b"event: dropped\ndata: " + notice + b"\n\n" if sse else notice + b"\n"
+                    data += b"".join(b"event: telegram\ndata: " + event + b"\n\n" for event in events) if sse else b"\n".join(events) + b"\n"
+                writer.write(chunk(data))
+                await writer.drain()
+        finally:
+            closed.cancel()
+            self.data.stream.unsubscribe(subscriber)
+
+    async def _export(self, writer: asyncio.StreamWriter, query: str) -> None:
+        """Stream the history of group addresses, see `logger.export`.
+
+        E.g. `/export?ga=1/2/3&ga=1/2/4&start=2024-01-01&end=2024-02-01&format=csv`,
+        all mapped group addresses without `ga`. The database is read chunk
+        by chunk by a thread of its own, only as fast as the client takes it.
+        """
+        if self.export is None:
+            await self._error(writer, HTTPStatus.NOT_FOUND, "There is no database to export from.")
+            return
+        params = parse_qs(query)
+        try:
+            start, end = (dt.fromisoformat(params[key][0]) if key in params else None for key in ("start", "end"))
+            export_format = params.get("format", ["ndjson"])[0]
+            chunks = self.export.export(params.get("ga", []), start, end, export_format)
+        except ValueError as err:
+            await self._error(writer, HTTPStatus.BAD_REQUEST, str(err))
+            return
+
+        loop = asyncio.get_running_loop()
+        # One thread, the cursors are used by the thread that opened them
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+        writer.write(response_head(HTTPStatus.OK, CONTENT_TYPES[export_format], keep_alive=False))
+        try:
+            while True:
+                try:
+                    data = await loop.run_in_executor(executor, next, chunks, None)
+                except Exception:
+                    # Without the last chunk the client sees the response isn't complete
+                    logging.exception("Couldn't export %s.", query)
+                    return
+                writer.write(chunk(data or b""))
+                await writer.drain()
+                if data is None:
+                    return
+        finally:
+            await loop.run_in_executor(executor, chunks.close)
+            executor.shutdown(wait=False)
+
+
+def chunk(data: bytes) -> bytes:
+    """Frame data as a chunk of a chunked response, empty data ends it."""
+    return b"%x\r\n%b\r\n" % (len(data), data)
+
+
+def response_head(status: HTTPStatus, content_type: bytes, *, keep_alive: bool, length: int | None = None) -> bytes:
+    """Get the status line and headers of a response, chunked without a length."""
+    return (
+        f"HTTP/1.1 {status.value} {status.phrase}".encode()
+        + b"\r\nContent-Type: "
+        + content_type
+        + (b"\r\nTransfer-Encoding: chunked\r\nCache-Control: no-cache" if length is None else b"\r\nContent-Length: " + str(length).encode())
+        + (b"\r\nConnection: keep-alive\r\n\r\n" if keep_alive else b"\r\nConnection: close\r\n\r\n")
+    )
+
+
 def main() -> None:
     """Run the server for eternity.
 
@@ -0,0 +1,94 @@
+"""Fan-out of the decoded telegrams to live subscribers.
+
+The receive callback publishes every decoded telegram, filtered or not.
+Each subscriber, e.g. a client of `/stream` of the status server, gets a
+bounded buffer of its own. If a subscriber doesn't keep up its buffer fills
+and further telegrams are dropped for it, counted in `Subscriber.dropped`,
+the ingest never waits for a subscriber.
+"""
+
+import asyncio
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from xknx.telegram import IndividualAddress
+
+from logger.lastvalue import to_json
+
+if TYPE_CHECKING:
+    from logger.mapping import GroupAddressEntry
+
+# Telegrams buffered per subscriber before dropping
+SUBSCRIBER_BUFFER = 1000
+MAX_SUBSCRIBERS = 64
+
+
+@dataclass(eq=False)
+class Subscriber:
+    """A subscriber with its filters and buffer."""
+
+    addresses: frozenset[int] | None = None
+    dtypes: frozenset[str] | None = None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(SUBSCRIBER_BUFFER))
+    dropped: int = 0
+
+    def wants(self, raw: int, dtype: str) -> bool:
+        """Check the filters, None matches everything."""
+        return (self.addresses is None or raw in self.addresses) and (self.dtypes is None or dtype in self.dtypes)
+
+
+class TelegramStream:
+    """Publish decoded telegrams to the subscribers.
+
+    Used from the event loop only, i.e. by the receive callback and the
+    `AsyncStatusServer`.
+    """
+
+    def __init__(self, max_subscribers: int = MAX_SUBSCRIBERS) -> None:
+        """Initialize the stream without subscribers."""
+        self.max_subscribers = max_subscribers
+        self.subscribers: list[Subscriber] = []
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, addresses: frozenset[int] | None = None, dtypes: frozenset[str] | None = None, buffer: int = SUBSCRIBER_BUFFER) -> Subscriber | None:
+        """Add a subscriber, None if there are `max_subscribers` already.
+
+        Parameters
+        ----------
+        addresses : frozenset[int] | None
+            Raw group addresses to get, defaults to all
+        dtypes : frozenset[str] | None
+            Dtypes to get, e.g. `DPST-9-1`, defaults to all
+        buffer : int
+            Telegrams buffered before dropping
+
+        """
+        if len(self.subscribers) >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(addresses, dtypes, asyncio.Queue(buffer))
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber."""
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+
+    def publish(self, entry: "GroupAddressEntry", raw: int, value: Any, src: IndividualAddress, time: dt.datetime) -> None:
+        """Hand a decoded telegram to the subscribers wanting it, serialised once as json."""
+        event = None
+        for subscriber in self.subscribers:
+            if not subscriber.wants(raw, entry.dtype):
+                continue
+            if event is None:
+                event = to_json(
+                    {"time": time, "src": str(src), "address": entry.address, "name": entry.name, "dtype": entry.dtype, "value": value, "unit": entry.unit},
+                )
+                self.published += 1
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.dropped += 1
+                self.dropped += 1
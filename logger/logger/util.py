@@ -1,43 +1,169 @@
 """Utility functions."""
 
+import datetime as dt
 import logging
-from collections.abc import Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
 from functools import cache
+from types import ModuleType
 from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 from xknx import dpt
 from xknx.dpt import DPTArray, DPTBool, DPTNumeric
 
+# Per dtype tables (logger.orm) or a single telegram table (logger.orm_unified)
+SCHEMAS = ("per_dtype", "unified")
+
+# Pragmas of the sqlite profile, see `apply_sqlite_profile`
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16384,  # in KiB, i.e. 16 MiB
+    "temp_store": "MEMORY",
+    "wal_autocheckpoint": 1000,  # in pages
+    "journal_size_limit": 64 * 1024 * 1024,  # in bytes
+}
+
+
+def get_orm(schema: str | ModuleType = "per_dtype") -> ModuleType:
+    """Get the generated orm module of a schema, see SCHEMAS.
+
+    A module is passed through, e.g. one generated with other options.
+    """
+    if isinstance(schema, ModuleType):
+        return schema
+
+    # not at the top, as they need to be generated
+    if schema == "per_dtype":
+        from logger import orm
+
+        return orm
+    if schema == "unified":
+        from logger import orm_unified
+
+        return orm_unified
+
+    error_msg = f"Unknown schema '{schema}', use one of {SCHEMAS}."
+    raise ValueError(error_msg)
+
+
+def utcnow() -> dt.datetime:
+    """Get the current time in UTC, without tzinfo like the ORM default."""
+    return dt.datetime.now(dt.UTC).replace(tzinfo=None)
+
 
 def is_binary(xknx_class: Any) -> bool:
     """Check if a dpt type is from a binary form."""
     return xknx_class in (dpt.DPTControlBlinds, dpt.DPTBinary, dpt.DPTControlDimming) or xknx_class.dpt_main_number == 1
 
 
+def apply_sqlite_profile(engine: Engine) -> bool:
+    """Apply `SQLITE_PRAGMAS` to every new connection of a sqlite engine.
+
+    Tuned for loggers on SD cards: The write-ahead log with `synchronous=NORMAL`
+    only syncs on checkpoints instead of every commit, a commit might be lost
+    on power loss but the database stays consistent. The log is checkpointed
+    every `wal_autocheckpoint` pages and truncated to `journal_size_limit`.
+
+    Returns
+    -------
+    bool
+        True if the engine is a sqlite engine, i.e. got the profile.
+
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+    return True
+
+
+# Checkpoint and truncate the write-ahead log, e.g. before closing
+SQLITE_CHECKPOINT = text("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
 @contextmanager
-def session_scope(addr: str) -> Generator[Session, None, None]:
-    """Provide context manager for sqlalchemy session."""
-    # not at the top, as it needs to be generated
-    from logger.orm import Base
+def session_scope(
+    addr: str,
+    schema: str | ModuleType = "per_dtype",
+    *,
+    sqlite_profile: bool = False,
+    create: bool = True,
+) -> Generator[Session, None, None]:
+    """Provide context manager for sqlalchemy session.
+
+    With `sqlite_profile` sqlite databases get the pragmas of
+    `apply_sqlite_profile`, e.g. for the logger, and the log is checkpointed
+    on exit. Missing tables are created unless `create` is False, e.g. for
+    readers. The engine is disposed on exit.
+    """
+    Base = get_orm(schema).Base  # noqa: N806
 
     engine = create_engine(addr, future=True)
-    Base.metadata.create_all(
-        engine,
-    )  # TODO: check if this can be refactored to only be done once per db, not for every session
+    checkpoint = sqlite_profile and apply_sqlite_profile(engine)
+    if create:
+        Base.metadata.create_all(
+            engine,
+        )  # TODO: check if this can be refactored to only be done once per db, not for every session
     session_cls = sessionmaker(engine, future=True)
     session = session_cls()
     try:
         yield session
         session.flush()
         session.commit()
+        if checkpoint:
+            session.execute(SQLITE_CHECKPOINT)
+            session.commit()
     except Exception:
         session.rollback()
         raise
     finally:
         session.close()
+        engine.dispose()
+
+
+def is_async_addr(addr: str) -> bool:
+    """Check if a db address uses an async driver, e.g. `sqlite+aiosqlite://`."""
+    return bool(make_url(addr).get_dialect().is_async)
+
+
+@asynccontextmanager
+async def async_session_scope(addr: str, schema: str | ModuleType = "per_dtype", *, sqlite_profile: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    """Provide async context manager for sqlalchemy session.
+
+    Async counterpart of `session_scope`, the address needs an async driver
+    like `sqlite+aiosqlite://` or `postgresql+asyncpg://`.
+    """
+    Base = get_orm(schema).Base  # noqa: N806
+
+    engine = create_async_engine(addr)
+    checkpoint = sqlite_profile and apply_sqlite_profile(engine.sync_engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_cls = async_sessionmaker(engine, expire_on_commit=False)
+    session = session_cls()
+    try:
+        yield session
+        await session.commit()
+        if checkpoint:
+            await session.execute(SQLITE_CHECKPOINT)
+            await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+        await engine.dispose()
 
 
 @cache
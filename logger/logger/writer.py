@@ -0,0 +1,780 @@
+"""Write-behind stage between the telegram callback and the database."""
+
+import asyncio
+import csv
+import datetime as dt
+import io
+import logging
+import queue
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Callable
+from functools import partial
+from threading import Thread
+from typing import Any
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from logger.metrics import pool_stats
+from logger.partition import route_rows
+from logger.rollup import update_rollups
+from logger.spool import Spool
+from logger.statusserver import Data
+from logger.util import session_scope
+
+# Marks the end of the queue, see `close`
+_STOP = object()
+
+# A row to insert: (table, {column: value})
+Row = tuple[Table, dict[str, Any]]
+
+# Batches replayed from the spool after each successful flush
+REPLAY_BATCHES = 10
+
+# Seconds between the attempts to queue the stop, see `ThreadedBatchWriter.close`
+STOP_TIMEOUT = 1.0
+
+
+def group_rows(batch: list[Row]) -> dict[Table, list[dict[str, Any]]]:
+    """Group the rows of a batch by their table."""
+    grouped: defaultdict[Table, list[dict[str, Any]]] = defaultdict(list)
+    for table, values in batch:
+        grouped[table].append(values)
+    return grouped
+
+
+def insert_rows(session: Session, batch: list[Row]) -> None:
+    """Insert rows with one executemany per table, doesn't commit.
+
+    Bypasses the unit of work of the ORM, the tables of `logger.orm`
+    are still the schema. Rows of tables partitioned by month go to the
+    sqlite database of their month, see `logger.partition.route_rows`.
+    """
+    for table, rows in route_rows(session, group_rows(batch)).items():
+        session.execute(insert(table), rows)
+
+
+# Postgres drivers whose connections can stream `COPY ... FROM STDIN`
+COPY_DRIVERS = ("psycopg2", "psycopg")
+
+
+def supports_copy(dialect: Dialect) -> bool:
+    """Check if rows can be streamed with `COPY` instead of INSERTs."""
+    return dialect.name == "postgresql" and dialect.driver in COPY_DRIVERS
+
+
+def get_copy_sql(dialect: Dialect, table: Table, columns: list[str]) -> str:
+    """Create the `COPY ... FROM STDIN` statement for some columns of a table."""
+    preparer = dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    return f"COPY {preparer.format_table(table)} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+
+
+def csv_field(value: Any) -> str:
+    """Render a value as csv field for `COPY` without `csv.QUOTE_NOTNULL`.
+
+    Strings are quoted, so only the unquoted empty field is read as NULL.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def to_csv(rows: list[dict[str, Any]], columns: list[str]) -> str:
+    """Render rows as csv for `COPY`.
+
+    All fields but NULLs are quoted, so only the unquoted empty field is read
+    as NULL. Falls back to `csv_field` before python 3.12, which added
+    `csv.QUOTE_NOTNULL`.
+    """
+    if sys.version_info < (3, 12):  # noqa: UP036
+        return "".join(",".join(csv_field(row[column]) for column in columns) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL, lineterminator="\n")
+    writer.writerows([row[column] for column in columns] for row in rows)
+    return buffer.getvalue()
+
+
+def copy_rows(session: Session, batch: list[Row]) -> None:
+    """Stream rows with one `COPY` per table, doesn't commit.
+
+    Needs a postgres session with psycopg2 or psycopg, see `supports_copy`.
+    The copy runs on the connection of the session, i.e. in its transaction.
+    """
+    connection = session.connection()
+    dbapi_connection = connection.connection.driver_connection
+    for table, rows in group_rows(batch).items():
+        # All rows of a table have the same keys, see `logger.mapping.compile_mapping`
+        columns = list(rows[0])
+        sql = get_copy_sql(connection.dialect, table, columns)
+        data = to_csv(rows, columns)
+        with dbapi_connection.cursor() as cursor:  # type: ignore [union-attr]
+            if connection.dialect.driver == "psycopg2":
+                cursor.copy_expert(sql, io.StringIO(data))
+            else:
+                with cursor.copy(sql) as copy:
+                    copy.write(data)
+
+
+def session_pool(session: Session | AsyncSession) -> Any:
+    """Get the connection pool of a session, None if it is bound to a connection."""
+    bind = session.get_bind()
+    return bind.pool if isinstance(bind, Engine) else None
+
+
+def write_rows(session: Session, batch: list[Row], *, use_copy: bool = True) -> None:
+    """Write rows with `copy_rows` where supported, `insert_rows` otherwise."""
+    if use_copy and supports_copy(session.get_bind().dialect):
+        copy_rows(session, batch)
+    else:
+        insert_rows(session, batch)
+
+
+class BaseWriter(ABC):
+    """Flush batches of rows and keep track of the statistics.
+
+    Rows are handed over with `put` between `start` and `close`.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = 500,
+        max_age: float = 0.25,
+        status: Data | None = None,
+        use_copy: bool = True,
+        rollups: bool = False,
+        spool: Spool | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Parameters
+        ----------
+        batch_size : int
+            Maximum number of rows per commit, defaults to 500
+        max_age : float
+            Maximum time in seconds a row waits for its commit, defaults to 0.25
+        status : Data | None
+            Status to populate with queue depth and flush latency
+        use_copy : bool
+            Stream the rows with `COPY` where supported, see `write_rows`
+        rollups : bool
+            Update the rollups with each batch, see `logger.rollup`
+        spool : Spool | None
+            Spool for batches failing to commit, replayed once commits succeed again
+
+        """
+        if batch_size < 1:
+            error_msg = f"Batch size must be positive, got {batch_size}."
+            raise ValueError(error_msg)
+
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.status = status
+        self.use_copy = use_copy
+        self.rollups = rollups
+        self.spool = spool
+
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.flush_latency = 0.0
+
+    @property
+    @abstractmethod
+    def depth(self) -> int:
+        """Return the number of rows waiting for their commit."""
+
+    @abstractmethod
+    def start(self) -> None:
+        """Start committing the rows put."""
+
+    @abstractmethod
+    async def put(self, row: Row) -> None:
+        """Queue a row for its commit."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Commit all pending rows and stop."""
+
+    def commit(self, session: Session, batch: list[Row]) -> bool:
+        """Commit a batch of rows through a sync session.
+
+        Parameters
+        ----------
+        session : Session
+            Session to commit with
+        batch : list
+            Rows to commit, see `Row`
+
+        Returns
+        -------
+            True on success
+            False on failure
+
+        """
+        start = time.perf_counter()
+        try:
+            self.write(session, batch)
+            session.commit()
+        except Exception as err:
+            session.rollback()
+            logging.exception("Couldn't save batch of %i rows.", len(batch))
+            logging.exception(err)
+            self._count_flush(len(batch), time.perf_counter() - start, ok=False)
+            self.spool_batch(batch)
+            return False
+        finally:
+            self.flush_latency = time.perf_counter() - start
+            self._populate_status()
+
+        self.rows_written += len(batch)
+        self._count_flush(len(batch), time.perf_counter() - start, ok=True)
+        logging.debug("Flushed %i rows in %.3fs.", len(batch), self.flush_latency)
+        self.replay(session)
+        return True
+
+    def spool_batch(self, batch: list[Row]) -> None:
+        """Keep a failed batch in the spool, count it as failed without."""
+        if self.spool is None or not self.spool.append(batch):
+            self.rows_failed += len(batch)
+
+    def replay(self, session: Session) -> int:
+        """Replay some batches of the spool, after a successful flush.
+
+        Returns
+        -------
+        int
+            Number of replayed rows.
+
+        """
+        if self.spool is None or not self.spool.pending:
+            return 0
+        try:
+            count = self.spool.replay(session, self.write, batch_size=self.batch_size, max_rows=self.batch_size * REPLAY_BATCHES)
+        except Exception as err:
+            session.rollback()
+            logging.exception("Couldn't replay the spool.")
+            logging.exception(err)
+            return 0
+        finally:
+            self._populate_status()
+        self.rows_written += count
+        self._count_replay(count)
+        return count
+
+    def write(self, session: Session, batch: list[Row]) -> None:
+        """Write a batch and update its rollups, doesn't commit."""
+        write_rows(session, batch, use_copy=self.use_copy)
+        if self.rollups:
+            update_rollups(session, batch)
+
+    def _pool(self) -> Any:
+        """Get the connection pool of the session, None without a session."""
+        return None
+
+    def _count_flush(self, rows: int, latency: float, *, ok: bool) -> None:
+        """Count a flush taking `latency` seconds in the metrics, see `logger.metrics`."""
+        if self.status is None:
+            return
+        metrics = self.status.metrics
+        metrics.commit_latency.observe(latency)
+        if ok:
+            metrics.written += rows
+        else:
+            metrics.failed["commit"] += rows
+
+    def _count_replay(self, rows: int) -> None:
+        """Count the rows replayed from the spool in the metrics."""
+        if self.status is not None:
+            self.status.metrics.written += rows
+
+    def _populate_status(self) -> None:
+        """Expose queue depth, flush latency and the connection pool."""
+        if self.status is None:
+            return
+        self.status.data_dict["queue_depth"] = self.depth
+        self.status.data_dict["flush_latency"] = dt.timedelta(seconds=self.flush_latency)
+        gauges = self.status.metrics.gauges
+        gauges["queue_depth"] = self.depth
+        pool = self._pool()
+        if pool is not None:
+            for name, value in pool_stats(pool).items():
+                gauges[f"db_pool_{name}"] = value
+        if self.spool is not None:
+            self.status.data_dict["spool_bytes"] = self.spool.pending_bytes
+            self.status.data_dict["spool_replay_rate"] = self.spool.replay_rate
+            gauges["spool_bytes"] = self.spool.pending_bytes
+
+
+class LoopWriter(BaseWriter):
+    """Collect rows in batches on the running loop.
+
+    The receive callback only puts rows into a bounded queue. A flusher task
+    drains the queue and commits once `batch_size` rows are pending or the
+    oldest pending row is older than `max_age` seconds, whatever comes first,
+    see `aflush`.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = 500,
+        max_age: float = 0.25,
+        max_queue: int = 10_000,
+        status: Data | None = None,
+        use_copy: bool = True,
+        rollups: bool = False,
+        spool: Spool | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Parameters
+        ----------
+        batch_size : int
+            Maximum number of rows per commit, defaults to 500
+        max_age : float
+            Maximum time in seconds a row waits for its commit, defaults to 0.25
+        max_queue : int
+            Maximum number of queued rows before `put` blocks, defaults to 10000
+        status : Data | None
+            Status to populate with queue depth and flush latency
+        use_copy : bool
+            Stream the rows with `COPY` where supported, see `write_rows`
+        rollups : bool
+            Update the rollups with each batch, see `logger.rollup`
+        spool : Spool | None
+            Spool for batches failing to commit, replayed once commits succeed again
+
+        """
+        super().__init__(batch_size=batch_size, max_age=max_age, status=status, use_copy=use_copy, rollups=rollups, spool=spool)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        """Return the number of rows waiting for their commit."""
+        return self.queue.qsize()
+
+    async def put(self, row: Row) -> None:
+        """Queue a row, wait if the queue is full."""
+        await self.queue.put(row)
+
+    def start(self) -> None:
+        """Start the flusher task on the running loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        """Flush all pending rows and stop the flusher task."""
+        if self._task is None:
+            return
+        await self.queue.put(_STOP)
+        await self._task
+        self._task = None
+        if self.spool is not None:
+            self.spool.close()
+
+    async def run(self) -> None:
+        """Collect batches from the queue and flush them until stopped."""
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self.queue.get()
+            if first is _STOP:
+                self._populate_status()
+                return
+            batch = [first]
+            stop = False
+            deadline = loop.time() + self.max_age
+
+            while len(batch) < self.batch_size:
+                try:
+                    row = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self.queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if row is _STOP:
+                    stop = True
+                    break
+                batch.append(row)
+
+            await self.aflush(batch)
+            if stop:
+                return
+
+    @abstractmethod
+    async def aflush(self, batch: list[Row]) -> bool:
+        """Commit a batch of rows from the loop.
+
+        Returns
+        -------
+            True on success
+            False on failure
+
+        """
+
+
+class BatchWriter(LoopWriter):
+    """Commit decoded rows to the database in batches, see `LoopWriter`.
+
+    The commits block the running loop, use the `ThreadedBatchWriter` to
+    keep them away from the knx connection. Postgres batches are streamed
+    with `COPY` instead of INSERTs, see `write_rows`.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        batch_size: int = 500,
+        max_age: float = 0.25,
+        max_queue: int = 10_000,
+        status: Data | None = None,
+        use_copy: bool = True,
+        rollups: bool = False,
+        spool: Spool | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Parameters
+        ----------
+        session : Session
+            Session used to commit the rows
+        batch_size : int
+            Maximum number of rows per commit, defaults to 500
+        max_age : float
+            Maximum time in seconds a row waits for its commit, defaults to 0.25
+        max_queue : int
+            Maximum number of queued rows before `put` blocks, defaults to 10000
+        status : Data | None
+            Status to populate with queue depth and flush latency
+        use_copy : bool
+            Stream the rows with `COPY` where supported, see `write_rows`
+        rollups : bool
+            Update the rollups with each batch, see `logger.rollup`
+        spool : Spool | None
+            Spool for batches failing to commit, replayed once commits succeed again
+
+        """
+        super().__init__(batch_size=batch_size, max_age=max_age, max_queue=max_queue, status=status, use_copy=use_copy, rollups=rollups, spool=spool)
+        self.session = session
+
+    def _pool(self) -> Any:
+        """Get the connection pool of the session."""
+        return session_pool(self.session)
+
+    def flush(self, batch: list[Row]) -> bool:
+        """Commit a batch of rows, see `BaseWriter.commit`."""
+        return self.commit(self.session, batch)
+
+    async def aflush(self, batch: list[Row]) -> bool:
+        """Commit a batch of rows from the loop, see `flush`."""
+        return self.flush(batch)
+
+
+class AsyncBatchWriter(LoopWriter):
+    """Commit decoded rows in batches through an `AsyncSession`.
+
+    Batching follows the `LoopWriter`, but the commits are awaited, so
+    neither threads nor blocking calls are involved.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        batch_size: int = 500,
+        max_age: float = 0.25,
+        max_queue: int = 10_000,
+        status: Data | None = None,
+        rollups: bool = False,
+        spool: Spool | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            Session used to commit the rows
+        batch_size : int
+            Maximum number of rows per commit, defaults to 500
+        max_age : float
+            Maximum time in seconds a row waits for its commit, defaults to 0.25
+        max_queue : int
+            Maximum number of queued rows before `put` blocks, defaults to 10000
+        status : Data | None
+            Status to populate with queue depth and flush latency
+        rollups : bool
+            Update the rollups with each batch, see `logger.rollup`
+        spool : Spool | None
+            Spool for batches failing to commit, replayed once commits succeed again
+
+        """
+        super().__init__(batch_size=batch_size, max_age=max_age, max_queue=max_queue, status=status, rollups=rollups, spool=spool)
+        self.async_session = session
+
+    def _pool(self) -> Any:
+        """Get the connection pool of the async session."""
+        return session_pool(self.async_session)
+
+    async def aflush(self, batch: list[Row]) -> bool:
+        """Commit a batch of rows.
+
+        Parameters
+        ----------
+        batch : list
+            Rows to commit, see `Row`
+
+        Returns
+        -------
+            True on success
+            False on failure
+
+        """
+        start = time.perf_counter()
+        try:
+            await self.async_session.run_sync(self.write, batch)
+            await self.async_session.commit()
+        except Exception as err:
+            await self.async_session.rollback()
+            logging.exception("Couldn't save batch of %i rows.", len(batch))
+            logging.exception(err)
+            self._count_flush(len(batch), time.perf_counter() - start, ok=False)
+            # Keep the fsync off the loop
+            await asyncio.to_thread(self.spool_batch, batch)
+            return False
+        finally:
+            self.flush_latency = time.perf_counter() - start
+            self._populate_status()
+
+        self.rows_written += len(batch)
+        self._count_flush(len(batch), time.perf_counter() - start, ok=True)
+        logging.debug("Flushed %i rows in %.3fs.", len(batch), self.flush_latency)
+        await self.async_session.run_sync(self.replay)
+        return True
+
+
+class ThreadedBatchWriter(BaseWriter):
+    """Commit decoded rows in batches from a dedicated writer thread.
+
+    The writer thread owns the engine and session, the event loop only puts
+    rows into a thread-safe queue. Batching follows the `BatchWriter`. A full
+    queue doesn't block the loop, `put` spools the row instead, or raises
+    `queue.Full` without a spool. Errors of a flush are logged and the thread
+    carries on, rows left in the queue by a thread that died are spooled by
+    `close`.
+    """
+
+    def __init__(
+        self,
+        db_addr: str,
+        *,
+        schema: str = "per_dtype",
+        sqlite_profile: bool = False,
+        batch_size: int = 500,
+        max_age: float = 0.25,
+        max_queue: int = 10_000,
+        status: Data | None = None,
+        use_copy: bool = True,
+        rollups: bool = False,
+        spool: Spool | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Parameters
+        ----------
+        db_addr : str
+            Address of the database, the session is created by the thread
+        schema : str
+            Schema of the database, see `logger.util.SCHEMAS`
+        sqlite_profile : bool
+            Open sqlite databases with the profile of `logger.util.apply_sqlite_profile`
+        batch_size : int
+            Maximum number of rows per commit, defaults to 500
+        max_age : float
+            Maximum time in seconds a row waits for its commit, defaults to 0.25
+        max_queue : int
+            Maximum number of queued rows, defaults to 10000
+        status : Data | None
+            Status to populate with queue depth and flush latency
+        use_copy : bool
+            Stream the rows with `COPY` where supported, see `write_rows`
+        rollups : bool
+            Update the rollups with each batch, see `logger.rollup`
+        spool : Spool | None
+            Spool for batches failing to commit, replayed once commits succeed again
+
+        """
+        super().__init__(batch_size=batch_size, max_age=max_age, status=status, use_copy=use_copy, rollups=rollups, spool=spool)
+        self.db_addr = db_addr
+        self.schema = schema
+        self.sqlite_profile = sqlite_profile
+        self.session: Session | None = None
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def depth(self) -> int:
+        """Return the number of rows waiting for their commit."""
+        return self.queue.qsize()
+
+    def _pool(self) -> Any:
+        """Get the connection pool of the session, None outside of the thread."""
+        return session_pool(self.session) if self.session is not None else None
+
+    def flush(self, batch: list[Row]) -> bool:
+        """Commit a batch of rows from the writer thread, see `BaseWriter.commit`."""
+        if self.session is None:
+            error_msg = "Writer has no session."
+            raise RuntimeError(error_msg)
+        return self.commit(self.session, batch)
+
+    async def put(self, row: Row) -> None:
+        """Queue a row without blocking the loop, spool it if the queue is full.
+
+        Raises
+        ------
+        queue.Full
+            In case the queue is full and there is no spool.
+
+        """
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            if self.spool is None:
+                raise
+            # Keep the fsync off the loop
+            await asyncio.to_thread(self.spool_batch, [row])
+
+    def start(self) -> None:
+        """Start the writer thread, from the loop serving the status if there is one."""
+        if self._thread is None:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._loop = None
+            self._thread = Thread(target=self.run, name="logger-writer", daemon=True)
+            self._thread.start()
+
+    async def close(self) -> None:
+        """Flush all pending rows and stop the writer thread."""
+        if self._thread is None:
+            return
+        while self._thread.is_alive():
+            try:
+                await asyncio.to_thread(self.queue.put, _STOP, timeout=STOP_TIMEOUT)
+            except queue.Full:
+                continue
+            break
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+        await asyncio.to_thread(self._spool_queued)
+        if self.spool is not None:
+            self.spool.close()
+
+    def _on_loop(self, callback: Callable[[], None]) -> None:
+        """Update the status on the loop, not while it is serialised there."""
+        if self._loop is None or self._loop.is_closed():
+            callback()
+            return
+        try:
+            self._loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # The loop was closed meanwhile
+            callback()
+
+    def _count_flush(self, rows: int, latency: float, *, ok: bool) -> None:
+        """Count a flush in the metrics on the loop, see `BaseWriter._count_flush`."""
+        self._on_loop(partial(super()._count_flush, rows, latency, ok=ok))
+
+    def _count_replay(self, rows: int) -> None:
+        """Count replayed rows in the metrics on the loop, see `BaseWriter._count_replay`."""
+        self._on_loop(partial(super()._count_replay, rows))
+
+    def _populate_status(self) -> None:
+        """Populate the status on the loop, see `BaseWriter._populate_status`."""
+        self._on_loop(super()._populate_status)
+
+    def _spool_queued(self) -> None:
+        """Spool the rows left in the queue, e.g. by a writer thread that died."""
+        batch = []
+        while True:
+            try:
+                row = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not _STOP:
+                batch.append(row)
+        if batch:
+            logging.error("Writer thread left %i rows.", len(batch))
+            self.spool_batch(batch)
+
+    def run(self) -> None:
+        """Collect batches from the queue and flush them until stopped."""
+        try:
+            with session_scope(self.db_addr, self.schema, sqlite_profile=self.sqlite_profile) as session:
+                self.session = session
+                try:
+                    self._run()
+                finally:
+                    self.session = None
+        except Exception:
+            logging.exception("Writer thread stopped.")
+
+    def _run(self) -> None:
+        """Loop of the writer thread."""
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            try:
+                if batch:
+                    self.flush(batch)
+                else:
+                    self._populate_status()
+            except Exception:
+                # E.g. the spool failed, the thread carries on
+                logging.exception("Couldn't flush batch of %i rows.", len(batch))
+                self.rows_failed += len(batch)
+
+    def _next_batch(self) -> tuple[list[Row], bool]:
+        """Collect the next batch from the queue.
+
+        Returns
+        -------
+        tuple
+            The rows and whether the writer is stopped.
+
+        """
+        first = self.queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_age
+
+        while len(batch) < self.batch_size:
+            try:
+                row = self.queue.get_nowait()
+            except queue.Empty:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    row = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if row is _STOP:
+                return batch, True
+            batch.append(row)
+        return batch, False
@@ -0,0 +1,28 @@
+"""Mapping, telegrams and status shared by the tests."""
+
+from datetime import datetime as dt
+from datetime import timedelta
+
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram
+from xknx.telegram.apci import GroupValueRead, GroupValueWrite
+
+from logger.statusserver import Data
+
+SRC = IndividualAddress("1.1.1")
+MAPPING = {
+    "1/2/3": {"dtype": "DPST-9-1", "name": "Temperature", "on_change": True},
+    "1/2/4": {"dtype": "DPST-10-1", "name": "Time"},
+    "1/2/5": {"dtype": "DPST-1-1", "name": "Switch"},
+}
+
+
+def telegram(dst: str, value: DPTArray | DPTBinary | GroupValueWrite | GroupValueRead, src: IndividualAddress = SRC) -> Telegram:
+    """Get a telegram to a ga, a bare value is written."""
+    payload = value if isinstance(value, GroupValueWrite | GroupValueRead) else GroupValueWrite(value)
+    return Telegram(destination_address=GroupAddress(dst), source_address=src, payload=payload)
+
+
+def status() -> Data:
+    """Get a fresh status."""
+    return Data(last_rx_time=dt.now(), max_delta=timedelta(minutes=5), data_dict={})
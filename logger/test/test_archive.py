@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Test the Parquet archive of old history."""
+
+import datetime as dt
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from xknx.telegram import IndividualAddress
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from logger.archive import archive, archive_table, is_archivable, read_archive  # noqa: E402
+from logger.export import export, query_rows, resolve  # noqa: E402
+from logger.mapping import GATable, compile_mapping  # noqa: E402
+from logger.util import get_orm, session_scope  # noqa: E402
+from logger.writer import write_rows  # noqa: E402
+
+MAPPING = {
+    "1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"},
+    "1/2/10": {"dtype": "DPST-9-1", "name": "Outside"},
+    "1/2/4": {"dtype": "DPST-1-1", "name": "Switch"},
+    "1/2/5": {"dtype": "DPST-10-1", "name": "Time"},
+}
+START = dt.datetime(2024, 1, 30)
+SRC = IndividualAddress("1.1.1")
+
+
+def history(db_addr: str, schema: str, start: dt.datetime = START, days: int = 4) -> GATable:
+    """Store a value of each group address every 6 hours."""
+    ga_table = compile_mapping(MAPPING, schema)
+    entries = resolve(ga_table, [])
+    rows = []
+    for step in range(days * 4):
+        time = start + dt.timedelta(hours=6 * step)
+        for entry in entries:
+            value = {"DPST-9-1": 20.0 + step, "DPST-1-1": step % 2, "DPST-10-1": dt.time(step % 24, 0)}[entry.dtype]
+            rows.append(entry.row(value, SRC, time))
+    with session_scope(db_addr, schema) as session:
+        write_rows(session, rows)
+    return ga_table
+
+
+def count_rows(db_addr: str, schema: str) -> int:
+    """Count the rows of all logging tables."""
+    with session_scope(db_addr, schema) as session:
+        return sum(session.scalar(select(func.count()).select_from(table)) or 0 for table in get_orm(schema).Base.metadata.sorted_tables if is_archivable(table))
+
+
+@pytest.mark.parametrize("schema", ["per_dtype", "unified"])
+def test_archive(tmp_path: Path, schema: str) -> None:
+    """Old rows are moved to monthly files, sorted by group address and time."""
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    ga_table = history(db_addr, schema)
+    before = dt.datetime(2024, 2, 2)
+    metadata = get_orm(schema).Base.metadata
+    with session_scope(db_addr, schema) as session:
+        moved = sum(archive_table(session, table, tmp_path / "archive", before, chunk_size=5) for table in metadata.sorted_tables if is_archivable(table))
+    # 12 rows per group address in January and February each
+    assert moved == 4 * 12
+    assert count_rows(db_addr, schema) == 4 * 4
+
+    files = sorted(path.relative_to(tmp_path / "archive").as_posix() for path in (tmp_path / "archive").rglob("*.parquet"))
+    if schema == "per_dtype":
+        assert files == ["switch/2024-01.parquet", "switch/2024-02.parquet", "temperature/2024-01.parquet", "temperature/2024-02.parquet", "time/2024-01.parquet", "time/2024-02.parquet"]
+    else:
+        assert len(files) == 6  # noqa: PLR2004
+        assert all(file_.startswith("telegram/dtype_") for file_ in files)
+
+    table = get_orm(schema).Base.metadata.tables["temperature" if schema == "per_dtype" else "telegram"]
+    path = tmp_path / "archive" / ("temperature/2024-01.parquet" if schema == "per_dtype" else "telegram/dtype_900001/2024-01.parquet")
+    archived = pq.read_table(path)
+    assert archived.schema.names == list(table.columns.keys())
+    rows = archived.to_pylist()
+    assert len(rows) == 2 * 8
+    assert [(row["dst"], row["time"]) for row in rows] == sorted((row["dst"], row["time"]) for row in rows)
+    assert pq.ParquetFile(path).metadata.row_group(0).column(archived.schema.names.index("name")).encodings.count("RLE_DICTIONARY") == 1
+
+    # The archive and the database are read as one
+    entries = resolve(ga_table, ["1/2/3", "1/2/5"])
+    with session_scope(db_addr, schema) as session:
+        union = list(query_rows(session, entries, dt.datetime(2024, 1, 31), archive=tmp_path / "archive"))
+    assert len(union) == 2 * 12
+    assert [row.time for row in union] == sorted(row.time for row in union)
+    assert union[0].value == pytest.approx(24.0)
+    assert union[1].value == dt.time(4, 0)
+    assert [row.src for row in union[:2]] == ["1.1.1", "1.1.1"]
+    assert len(list(read_archive(tmp_path / "archive", entries, end=dt.datetime(2024, 1, 31)))) == 2 * 4
+
+
+def test_archive_again(tmp_path: Path) -> None:
+    """A month archived again is merged into its file, rows archived already are skipped."""
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    root = tmp_path / "archive"
+    ga_table = history(db_addr, "per_dtype", dt.datetime(2020, 1, 1), days=2)
+    assert archive(db_addr, root, days=30) == 4 * 8
+    # A copy of archived rows, as if their deletion failed, and later rows of the same month
+    with session_scope(db_addr) as session:
+        table = get_orm("per_dtype").Base.metadata.tables["temperature"]
+        copies = pq.read_table(root / "temperature" / "2020-01.parquet").to_pylist()[:2]
+        session.execute(table.insert(), copies)
+    history(db_addr, "per_dtype", dt.datetime(2020, 1, 3), days=1)
+    assert archive(db_addr, root, days=30) == 4 * 4 + 2
+    assert count_rows(db_addr, "per_dtype") == 0
+
+    rows = pq.read_table(root / "temperature" / "2020-01.parquet").to_pylist()
+    keys = [(row["dst"], row["time"], row["id_"]) for row in rows]
+    assert keys == sorted(set(keys))
+    assert len(rows) == 2 * (8 + 4)
+
+    entries = resolve(ga_table, ["1/2/10"])
+    lines = b"".join(export(db_addr, entries, archive=root)).splitlines()
+    assert len(lines) == 8 + 4
+    assert json.loads(lines[0])["name"] == "Outside"
+
+
+def test_optional_pyarrow(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The module imports without pyarrow, which is only needed for the files."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    monkeypatch.delitem(sys.modules, "logger.archive")
+    module = importlib.import_module("logger.archive")
+    with pytest.raises(ImportError):
+        module.load_pyarrow()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
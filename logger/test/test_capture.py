@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test the raw capture of telegrams."""
+
+import asyncio
+import datetime as dt
+from pathlib import Path
+
+import pytest
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import GroupAddress, IndividualAddress
+from xknx.telegram.apci import GroupValueRead
+
+from logger.capture import FILE_HEADER, FLAG_BINARY, FLAG_GROUP, FLAG_TRUNCATED, RECORD, CaptureFile, CaptureWriter, capture_files, capture_name, pack, read
+from logger.mapping import compile_mapping
+from logger.runner import flush_capture
+from test.helpers import telegram
+
+# 2024-01-02 03:04:05.678901 UTC
+TIMESTAMP = 1_704_164_645_678_901
+HOUR = 3600 * 1_000_000
+
+
+def test_capture_name() -> None:
+    """Files are named by the hour of the timestamp."""
+    assert capture_name(TIMESTAMP) == "knx-20240102-03.cap"
+
+
+def test_pack() -> None:
+    """Records have a fixed size, payloads are zero padded or cut off."""
+    record = pack(telegram("1/2/3", DPTArray((0x0C, 0x1A))), TIMESTAMP)
+    assert len(record) == RECORD.size
+    assert RECORD.unpack(record) == (TIMESTAMP, 0x1101, GroupAddress("1/2/3").raw, 0x80, FLAG_GROUP, 2, b"\x0c\x1a" + bytes(14))
+
+    record = pack(telegram("1/2/3", DPTBinary(1)), TIMESTAMP)
+    assert RECORD.unpack(record)[4:6] == (FLAG_GROUP | FLAG_BINARY, 1)
+
+    record = pack(telegram("1/2/3", GroupValueRead()), TIMESTAMP)
+    assert RECORD.unpack(record)[3:6] == (0, FLAG_GROUP, 0)
+
+    record = pack(telegram("1/2/3", DPTArray(tuple(range(20)))), TIMESTAMP)
+    assert RECORD.unpack(record)[4:7] == (FLAG_GROUP | FLAG_TRUNCATED, 16, bytes(range(16)))
+
+
+def test_roundtrip(tmp_path: Path) -> None:
+    """Captured telegrams are read back as records, rotated per hour."""
+    writer = CaptureWriter(tmp_path)
+    writer.append(telegram("1/2/3", DPTArray((0x0C, 0x1A))), TIMESTAMP)
+    writer.append(telegram("0/0/1", DPTBinary(1)), TIMESTAMP + 1)
+    writer.append(telegram("1/2/3", GroupValueRead()), TIMESTAMP + HOUR)
+    writer.close()
+    assert writer.count == 3  # noqa: PLR2004
+    assert [path.name for path in capture_files(tmp_path)] == ["knx-20240102-03.cap", "knx-20240102-04.cap"]
+
+    with CaptureFile(tmp_path / "knx-20240102-03.cap") as capture:
+        assert len(capture) == 2  # noqa: PLR2004
+        first, second = capture
+        assert first.time == dt.datetime(2024, 1, 2, 3, 4, 5, 678901)
+        assert first.source_address == IndividualAddress("1.1.1")
+        assert first.destination_address == GroupAddress("1/2/3")
+        assert first.apci == 0x80  # noqa: PLR2004
+        assert first.raw_value == (0x0C, 0x1A)
+        payload = first.payload
+        assert isinstance(payload, memoryview)
+        assert payload.tobytes() == b"\x0c\x1a"
+        payload.release()
+        assert second.raw_value == 1
+        assert capture[-1].dst == GroupAddress("0/0/1").raw
+        with pytest.raises(IndexError):
+            capture[2]
+
+    records = [record.fields[:6] for record in read(tmp_path)]
+    assert [fields[0] for fields in records] == [TIMESTAMP, TIMESTAMP + 1, TIMESTAMP + HOUR]
+
+
+@pytest.mark.asyncio
+async def test_flush_capture(tmp_path: Path) -> None:
+    """The last telegrams before the bus goes quiet are flushed too."""
+    writer = CaptureWriter(tmp_path, flush_interval=0.05)
+    writer.append(telegram("1/2/3", DPTBinary(1)), TIMESTAMP)
+    path = tmp_path / capture_name(TIMESTAMP)
+    assert path.stat().st_size == 0
+
+    task = asyncio.create_task(flush_capture(writer))
+    await asyncio.sleep(0.2)
+    assert path.stat().st_size == FILE_HEADER.size + RECORD.size
+    task.cancel()
+    writer.close()
+
+
+def test_decode_later(tmp_path: Path) -> None:
+    """The raw values go through the decoders of the mapping."""
+    writer = CaptureWriter(tmp_path)
+    writer.append(telegram("1/2/3", DPTArray((0x0C, 0x1A))), TIMESTAMP)
+    writer.close()
+
+    ga_table = compile_mapping({"1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"}})
+    (record,) = read(tmp_path)
+    entry = ga_table[record.dst]
+    assert entry is not None
+    assert entry.decode(record.raw_value) == pytest.approx(21.0, abs=0.01)
+
+
+def test_truncated(tmp_path: Path) -> None:
+    """A record cut off by a crash is ignored and dropped before appending."""
+    writer = CaptureWriter(tmp_path)
+    writer.append(telegram("1/2/3", GroupValueRead()), TIMESTAMP)
+    writer.close()
+    path = tmp_path / capture_name(TIMESTAMP)
+    with path.open("ab") as file_:
+        file_.write(b"\x01\x02\x03")
+    with CaptureFile(path) as capture:
+        assert len(capture) == 1
+
+    writer = CaptureWriter(tmp_path)
+    writer.append(telegram("1/2/3", GroupValueRead()), TIMESTAMP + 2)
+    writer.close()
+    assert (path.stat().st_size - FILE_HEADER.size) % RECORD.size == 0
+    with CaptureFile(path) as capture:
+        assert [record.timestamp for record in capture] == [TIMESTAMP, TIMESTAMP + 2]
+
+
+def test_invalid_file(tmp_path: Path) -> None:
+    """Other files are refused."""
+    path = tmp_path / "knx-20240102-03.cap"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="too short"):
+        CaptureFile(path)
+    path.write_bytes(b"X" * 64)
+    with pytest.raises(ValueError, match="isn't a capture file"):
+        CaptureFile(path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Test the schema options of the orm generator."""
+
+from types import ModuleType
+
+import pytest
+from sqlalchemy import select, text
+from xknx.dpt import DPTArray
+from xknx.telegram import GroupAddress, IndividualAddress
+
+from logger.codegen.gen_orm import ORMGenerator, SchemaOptions, UnifiedORMGenerator
+from logger.mapping import compile_mapping
+from logger.runner import get_rx_cb
+from logger.schema import sync_groupaddresses
+from logger.util import session_scope
+from test.helpers import telegram
+
+SRC = "1.2.3"
+DST = "3/4/5"
+MAPPING = {DST: {"dtype": "DPST-9-1", "name": "Temperature"}}
+
+
+def generate(generator: type[ORMGenerator | UnifiedORMGenerator], options: SchemaOptions) -> ModuleType:
+    """Generate a schema and load it as module."""
+    module = ModuleType(f"orm_{generator.__name__}")
+    exec(compile(generator.get_source(options), module.__name__, "exec"), module.__dict__)  # noqa: S102
+    return module
+
+
+def test_default_source() -> None:
+    """The default options generate the checked in schemas."""
+    source = ORMGenerator.get_source(SchemaOptions())
+    assert "types.String" in source
+    assert "add_address_views" not in source
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("generator", "table_name"), [(ORMGenerator, "temperature"), (UnifiedORMGenerator, "telegram")])
+async def test_int_addresses(generator: type[ORMGenerator | UnifiedORMGenerator], table_name: str) -> None:
+    """Addresses are stored as raw integers and rendered by the views."""
+    module = generate(generator, SchemaOptions(int_addresses=True))
+    table = module.Base.metadata.tables[table_name]
+
+    with session_scope("sqlite://", schema=module) as session:
+        rx_cb = await get_rx_cb(compile_mapping(MAPPING, schema=module), session, None)
+        assert await rx_cb(telegram(DST, DPTArray((0x0C, 0x1A)), IndividualAddress(SRC)))
+
+        src, dst = session.execute(select(table.c.src, table.c.dst)).one()
+        assert src == IndividualAddress(SRC).raw
+        assert dst == GroupAddress(DST).raw
+
+        src, dst = session.execute(text(f"SELECT src, dst FROM {table_name}_view")).one()  # noqa: S608
+        assert src == SRC
+        assert dst == DST
+
+        # Range queries on the main group
+        main_group = select(table.c.dst).where(table.c.dst.between(3 << 11, (4 << 11) - 1))
+        assert session.execute(main_group).scalar_one() == GroupAddress(DST).raw
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("generator", [ORMGenerator, UnifiedORMGenerator])
+async def test_name_table(generator: type[ORMGenerator | UnifiedORMGenerator]) -> None:
+    """Names are stored once per group address and can be changed in place."""
+    module = generate(generator, SchemaOptions(name_table=True))
+    table_name = "telegram" if generator is UnifiedORMGenerator else "temperature"
+    table = module.Base.metadata.tables[table_name]
+    assert "name" not in table.columns
+
+    with session_scope("sqlite://", schema=module) as session:
+        ga_table = compile_mapping(MAPPING, schema=module)
+        assert sync_groupaddresses(session, ga_table) == 1
+        assert sync_groupaddresses(session, ga_table) == 0
+
+        rx_cb = await get_rx_cb(ga_table, session, None)
+        assert await rx_cb(telegram(DST, DPTArray((0x0C, 0x1A)), IndividualAddress(SRC)))
+        assert await rx_cb(telegram(DST, DPTArray((0x0C, 0x1A)), IndividualAddress(SRC)))
+
+        # Renaming is a single row update
+        renamed = compile_mapping({DST: {"dtype": "DPST-9-1", "name": "Outside"}}, schema=module)
+        assert sync_groupaddresses(session, renamed) == 1
+
+        names = select(module.GroupAddress.name).join(table, table.c.dst == module.GroupAddress.address)
+        assert session.execute(names).scalars().all() == ["Outside", "Outside"]
+
+        groupaddress = session.execute(select(module.GroupAddress)).scalar_one()
+        assert (groupaddress.address, groupaddress.dtype, groupaddress.unit) == (DST, "DPST-9-1", "°C")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Test the fast decoders against xknx."""
+
+import random
+import struct
+from typing import Any
+
+import pytest
+from xknx.dpt import DPTArray
+
+from logger.decoders import get_fast_decoder
+from logger.dtype_matcher import DTYPE2XKNX
+
+# The dpt subclasses, their class attributes aren't known to the type checker
+XKNX_CLASSES: dict[str, Any] = DTYPE2XKNX
+
+
+def fast_dtypes(payload_length: int) -> list[str]:
+    """Get all dtypes with a fast decoder and the given payload length."""
+    return [dtype for dtype, xknx_class in XKNX_CLASSES.items() if get_fast_decoder(xknx_class) is not None and xknx_class.payload_length == payload_length]
+
+
+def decode(decoder: Any, value_raw: tuple) -> tuple[bool, bytes | None]:
+    """Decode and make the result comparable bit by bit, flag failures."""
+    try:
+        value = decoder(value_raw)
+    except Exception:
+        return False, None
+    return True, struct.pack(">d", value)
+
+
+def assert_bit_exact(dtype: str, payloads: Any) -> None:
+    """Compare fast decoder and xknx for all payloads."""
+    xknx_class = XKNX_CLASSES[dtype]
+    fast_decoder = get_fast_decoder(xknx_class)
+
+    def xknx_decoder(value_raw: tuple) -> Any:
+        return xknx_class.from_knx(DPTArray(value_raw))
+
+    for value_raw in payloads:
+        assert decode(fast_decoder, value_raw) == decode(xknx_decoder, value_raw), value_raw
+
+
+def test_families() -> None:
+    """The frequent families are covered."""
+    assert {XKNX_CLASSES[dtype].dpt_main_number for dtype in fast_dtypes(1)} == {5}
+    assert {XKNX_CLASSES[dtype].dpt_main_number for dtype in fast_dtypes(2)} == {9}
+    assert {XKNX_CLASSES[dtype].dpt_main_number for dtype in fast_dtypes(4)} == {14}
+    assert get_fast_decoder(DTYPE2XKNX["DPST-10-1"]) is None
+
+
+@pytest.mark.parametrize("dtype", fast_dtypes(1))
+def test_1byte(dtype: str) -> None:
+    """Every possible payload decodes like xknx."""
+    assert_bit_exact(dtype, ((value,) for value in range(2**8)))
+
+
+@pytest.mark.parametrize("dtype", fast_dtypes(2))
+def test_2byte(dtype: str) -> None:
+    """Every possible payload decodes like xknx."""
+    assert_bit_exact(dtype, ((value >> 8, value & 0xFF) for value in range(2**16)))
+
+
+@pytest.mark.parametrize("dtype", fast_dtypes(4)[:3])
+def test_4byte(dtype: str) -> None:
+    """Every exponent and sign, with random mantissas, decodes like xknx.
+
+    All 2**32 payloads would take too long, all decoders of the family are the same.
+    """
+    rng = random.Random(dtype)
+    payloads = [tuple((high << 23 | mantissa).to_bytes(4, "big")) for high in range(2**9) for mantissa in (0, 1, 2**23 - 1, *(rng.randrange(2**23) for _ in range(64)))]
+    assert_bit_exact(dtype, payloads)
+
+
+def test_wrong_length() -> None:
+    """Payloads of the wrong length raise."""
+    for dtype in ("DPST-5-1", "DPST-9-1", "DPST-14-56"):
+        decoder = get_fast_decoder(DTYPE2XKNX[dtype])
+        assert decoder is not None
+        with pytest.raises(Exception):  # noqa: B017, PT011
+            decoder((1, 2, 3))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
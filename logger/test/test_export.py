@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Test the export of the history."""
+
+import asyncio
+import csv
+import datetime as dt
+import io
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from xknx.telegram import IndividualAddress
+
+from logger.export import ExportSource, encode, entry_query, export, query_rows, resolve
+from logger.mapping import GATable, compile_mapping
+from logger.statusserver import AsyncStatusServer, Data
+from logger.util import session_scope
+from logger.writer import write_rows
+
+MAPPING = {
+    "1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"},
+    "1/2/4": {"dtype": "DPST-1-1", "name": "Switch"},
+    "1/2/5": {"dtype": "DPST-10-1", "name": "Time"},
+}
+START = dt.datetime(2024, 1, 2, 3, 0, 0)
+SRC = IndividualAddress("1.1.1")
+
+
+def history(db_addr: str, schema: str) -> GATable:
+    """Store a minute of values, interleaved across the tables."""
+    ga_table = compile_mapping(MAPPING, schema)
+    temperature, switch, clock = (ga_table[raw] for raw in (0x0A03, 0x0A04, 0x0A05))
+    assert temperature is not None
+    assert switch is not None
+    assert clock is not None
+    rows = []
+    for second in range(60):
+        time = START + dt.timedelta(seconds=second)
+        if second % 2:
+            rows.append(switch.row(second % 4 == 1, SRC, time))
+        else:
+            rows.append(temperature.row(20 + second / 10, SRC, time))
+    rows.append(clock.row(dt.time(13, 30), SRC, START))
+    with session_scope(db_addr, schema) as session:
+        write_rows(session, rows)
+    return ga_table
+
+
+@pytest.mark.parametrize(("schema", "index"), [("per_dtype", "ix_temperature_dst_time"), ("unified", "ix_telegram_dst_time")])
+def test_index(schema: str, index: str) -> None:
+    """The rows of a group address are read from the index in order, without sorting them first."""
+    entry = compile_mapping(MAPPING, schema)[0x0A03]
+    assert entry is not None
+    with session_scope("sqlite://", schema) as session:
+        query = entry_query(entry.table, entry, None, None).compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+        plan = " ".join(row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.parametrize("schema", ["per_dtype", "unified"])
+def test_query_rows(tmp_path: Path, schema: str) -> None:
+    """Rows of several tables are merged by time, within the range."""
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    ga_table = history(db_addr, schema)
+    entries = resolve(ga_table, ["1/2/3", "1/2/4"])
+    with session_scope(db_addr, schema) as session:
+        rows = list(query_rows(session, entries, START + dt.timedelta(seconds=10), START + dt.timedelta(seconds=20), chunk_size=3))
+    assert [row.time.second for row in rows] == list(range(10, 20))
+    assert [row.address for row in rows[:2]] == ["1/2/3", "1/2/4"]
+    assert rows[0].value == pytest.approx(21.0)
+    assert rows[1].value == 0
+    assert rows[0].src == "1.1.1"
+    assert rows[0].unit == "°C"
+
+    with session_scope(db_addr, schema) as session:
+        assert len(list(query_rows(session, resolve(ga_table, [])))) == 61  # noqa: PLR2004
+
+
+def test_resolve() -> None:
+    """Invalid and unmapped addresses are refused."""
+    ga_table = compile_mapping(MAPPING)
+    assert [entry.address for entry in resolve(ga_table, ["1/2/5", "1/2/3"])] == ["1/2/5", "1/2/3"]
+    with pytest.raises(ValueError, match="Invalid"):
+        resolve(ga_table, ["1/2/x"])
+    with pytest.raises(ValueError, match="mapped"):
+        resolve(ga_table, ["1/2/6"])
+
+
+def test_export(tmp_path: Path) -> None:
+    """The output comes in chunks, csv with a header."""
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    ga_table = history(db_addr, "per_dtype")
+
+    chunks = list(export(db_addr, resolve(ga_table, ["1/2/3", "1/2/5"]), export_format="csv", chunk_size=10))
+    assert len(chunks) == 5  # noqa: PLR2004
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert len(rows) == 31  # noqa: PLR2004
+    assert rows[0] == {"time": "2024-01-02T03:00:00", "address": "1/2/3", "name": "Temperature", "src": "1.1.1", "value": "20.0", "unit": "°C"}
+    assert rows[1]["value"] == "13:30:00"
+
+    lines = b"".join(export(db_addr, resolve(ga_table, ["1/2/4"]), start=START + dt.timedelta(seconds=30))).splitlines()
+    assert len(lines) == 15  # noqa: PLR2004
+    assert json.loads(lines[0]) == {"time": "2024-01-02T03:00:31", "address": "1/2/4", "name": "Switch", "src": "1.1.1", "value": 0, "unit": ""}
+
+    with pytest.raises(ValueError, match="Unknown format"):
+        export(db_addr, [], export_format="xml")
+    assert list(encode([], "csv")) == [b"time,address,name,src,value,unit\n"]
+
+
+async def get(port: int, target: str) -> tuple[str, dict[str, str], bytes]:
+    """Request a target and read the whole response, chunked or not."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    status_line, *lines = head.strip().split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines)}
+    if "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = b""
+        while size := int(await reader.readuntil(b"\r\n"), 16):
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+    writer.close()
+    await writer.wait_closed()
+    return status_line, headers, body
+
+
+@pytest.mark.asyncio
+async def test_status_server(tmp_path: Path) -> None:
+    """The history is served at /export."""
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    ga_table = history(db_addr, "per_dtype")
+    data = Data(last_rx_time=dt.datetime.now(), max_delta=dt.timedelta(minutes=5), data_dict={})
+    server = AsyncStatusServer(data, port=0, host="127.0.0.1", export=ExportSource(db_addr, ga_table, chunk_size=7))
+    await server.start()
+    try:
+        status_line, headers, body = await get(server.port, "/export?ga=1/2/3&start=2024-01-02T03:00:50&format=csv")
+        assert status_line == "HTTP/1.1 200 OK"
+        assert headers["content-type"] == "text/csv; charset=utf-8"
+        assert headers["transfer-encoding"] == "chunked"
+        assert [row["time"][-2:] for row in csv.DictReader(io.StringIO(body.decode("utf-8")))] == ["50", "52", "54", "56", "58"]
+
+        status_line, headers, body = await get(server.port, "/export?ga=1/2/5")
+        assert headers["content-type"] == "application/x-ndjson"
+        assert json.loads(body)["value"] == "13:30:00"
+
+        status_line, _, body = await get(server.port, "/export?ga=1/2/6")
+        assert status_line == "HTTP/1.1 400 Bad Request"
+        assert json.loads(body) == {"error": "Group address 1/2/6 isn't mapped."}
+        status_line, _, _ = await get(server.port, "/export?start=yesterday")
+        assert status_line == "HTTP/1.1 400 Bad Request"
+    finally:
+        await server.close()
+
+    server = AsyncStatusServer(data, port=0, host="127.0.0.1")
+    await server.start()
+    try:
+        status_line, _, _ = await get(server.port, "/export?ga=1/2/3")
+        assert status_line == "HTTP/1.1 404 Not Found"
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Test the deadband and deduplication filters."""
+
+import math
+
+import pytest
+from sqlalchemy import func, select
+from xknx.dpt import DPTArray, DPTBinary
+
+from logger import orm
+from logger.filters import ValueFilter, get_filter
+from logger.mapping import compile_mapping
+from logger.runner import get_rx_cb, held_filters, store_held
+from logger.util import session_scope
+from logger.writer import BatchWriter
+from test.helpers import telegram
+
+
+def accepted(value_filter: ValueFilter, values: list, interval: float = 1.0) -> list:
+    """Get the values passing a filter, received every `interval` seconds."""
+    return [value for idx, value in enumerate(values) if value_filter.accept(value, now=idx * interval)]
+
+
+def test_no_options() -> None:
+    """Entries without filter fields get no filter."""
+    assert get_filter("1/2/3", {"dtype": "DPST-9-1", "name": "Temperature"}) is None
+
+
+def test_deadband() -> None:
+    """Values within the deadband of the last stored value are dropped, drifts are not."""
+    value_filter = ValueFilter(deadband=0.5)
+    assert accepted(value_filter, [20.0, 20.2, 20.4, 20.6, 20.7, 19.0]) == [20.0, 20.6, 19.0]
+    assert value_filter.dropped == 3  # noqa: PLR2004
+
+
+def test_deadband_relative() -> None:
+    """The relative deadband scales with the last stored value."""
+    value_filter = ValueFilter(deadband_relative=0.1)
+    assert accepted(value_filter, [1000, 1050, 1101, 1150, 1300]) == [1000, 1101, 1300]
+
+
+def test_on_change() -> None:
+    """Only changes are stored, every edge is kept."""
+    value_filter = ValueFilter(on_change=True)
+    assert accepted(value_filter, [0, 0, 1, 1, 1, 0, 0, 1]) == [0, 1, 0, 1]
+
+
+def test_on_change_non_numeric() -> None:
+    """Values without a distance are compared for equality."""
+    value_filter = ValueFilter(on_change=True, deadband=1)
+    assert accepted(value_filter, ["a", "a", "b", None, None]) == ["a", "b", None]
+
+
+def test_min_interval() -> None:
+    """After a stored value the next waits for the interval."""
+    value_filter = ValueFilter(min_interval=2.5)
+    assert accepted(value_filter, [1, 2, 3, 4, 5, 6, 7]) == [1, 4, 7]
+
+
+def test_min_interval_toggle() -> None:
+    """A change held back by the interval is stored once it ends, unless it is undone."""
+    value_filter = ValueFilter(on_change=True, min_interval=10)
+    assert value_filter.accept(1, now=0)
+    assert not value_filter.accept(0, now=1)
+    assert value_filter.release(now=5) is None
+    assert value_filter.release(now=10) == 0
+    assert value_filter.release(now=20) is None
+
+    # On and off again within the interval, back to the stored value
+    assert not value_filter.accept(1, now=11)
+    assert not value_filter.accept(0, now=12)
+    assert value_filter.held is None
+
+
+def test_heartbeat() -> None:
+    """Unchanged values are stored once the heartbeat is due."""
+    value_filter = ValueFilter(on_change=True, heartbeat=3)
+    assert accepted(value_filter, [5, 5, 5, 5, 5, 5, 5]) == [5, 5, 5]
+
+
+@pytest.mark.parametrize("meta", [{"deadband": -1}, {"min_interval": -0.1}, {"heartbeat": -5}])
+def test_invalid(meta: dict) -> None:
+    """Negative options are rejected at compile time."""
+    with pytest.raises(ValueError, match="must not be negative"):
+        compile_mapping({"1/2/3": {"dtype": "DPST-9-1", "name": "Temperature", **meta}})
+
+
+@pytest.mark.asyncio
+async def test_rx_cb() -> None:
+    """Filtered telegrams are handled, but not stored."""
+    mapping = {
+        "1/2/3": {"dtype": "DPST-9-4", "name": "Brightness", "deadband_relative": 0.05},
+        "1/2/4": {"dtype": "DPST-1-1", "name": "Switch", "on_change": True},
+    }
+    with session_scope("sqlite://") as session:
+        rx_cb = await get_rx_cb(compile_mapping(mapping), session, None)
+        for payload in ((0x2E, 0x00), (0x2E, 0x01), (0x2E, 0x02), (0x3E, 0x00)):
+            assert await rx_cb(telegram("1/2/3", DPTArray(payload)))
+        for value in (1, 1, 0, 0, 1):
+            assert await rx_cb(telegram("1/2/4", DPTBinary(value)))
+
+        assert session.execute(select(func.count()).select_from(orm.Lux)).scalar_one() == 2  # noqa: PLR2004
+        assert session.execute(select(orm.Switch.value)).scalars().all() == [1, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_rx_cb_toggle() -> None:
+    """Switched on and off within the interval, the final off is stored too."""
+    ga_table = compile_mapping({"1/2/4": {"dtype": "DPST-1-1", "name": "Switch", "on_change": True, "min_interval": 60}})
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session)
+        writer.start()
+        rx_cb = await get_rx_cb(ga_table, session, None, writer)
+        for value in (1, 0):
+            assert await rx_cb(telegram("1/2/4", DPTBinary(value)))
+        filters = held_filters(ga_table)
+        assert await store_held(filters, writer) == 0
+        assert await store_held(filters, writer, math.inf) == 1
+        await writer.close()
+
+        assert session.execute(select(orm.Switch.value).order_by(orm.Switch.id_)).scalars().all() == [1, 0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
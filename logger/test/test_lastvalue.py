@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Test the last value of each group address."""
+
+import json
+from datetime import datetime as dt
+from http import HTTPStatus
+
+import pytest
+from xknx.dpt import DPTArray
+from xknx.telegram import GroupAddress, IndividualAddress
+
+from logger.lastvalue import LastValues
+from logger.mapping import compile_mapping
+from logger.runner import get_rx_cb
+from logger.statusserver import AsyncStatusServer, get_values, is_values_path
+from logger.util import session_scope
+from logger.writer import BatchWriter
+from test.helpers import MAPPING, status, telegram
+
+TIME = dt(2024, 1, 2, 3, 4, 5)
+
+
+def test_last_values() -> None:
+    """Only the last value is kept, the json is reused until a value changes."""
+    ga_table = compile_mapping(MAPPING)
+    entry = ga_table[GroupAddress("1/2/3").raw]
+    assert entry is not None
+    values = LastValues()
+    assert values.get("1/2/3") is None
+
+    values.update(entry, GroupAddress("1/2/3").raw, 20.5, IndividualAddress("1.1.1"), TIME)
+    values.update(entry, GroupAddress("1/2/3").raw, 21.0, IndividualAddress("1.1.2"), TIME)
+    value = values.get("1/2/3")
+    assert value is not None
+    assert (value.name, value.value, value.unit, value.src) == ("Temperature", 21.0, "°C", "1.1.2")
+    assert values.get(GroupAddress("1/2/3").raw) == value
+    assert len(values) == 1
+
+    first = values.json()
+    assert values.json() is first
+    assert json.loads(first) == {"1/2/3": {"address": "1/2/3", "name": "Temperature", "value": 21.0, "unit": "°C", "src": "1.1.2", "time": "2024-01-02T03:04:05"}}
+
+
+@pytest.mark.asyncio
+async def test_rx_cb() -> None:
+    """Decoded values are kept, filtered ones too."""
+    data = status()
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, session, data, writer)
+        await rx_cb(telegram("1/2/3", DPTArray((0x0C, 0x1A))))
+        await rx_cb(telegram("1/2/3", DPTArray((0x0C, 0x1A))))
+        await rx_cb(telegram("1/2/4", DPTArray((0x2D, 0x1E, 0x00))))
+        await writer.close()
+
+    assert data.metrics.filtered == 1
+    assert data.values.get("1/2/3").value == pytest.approx(21.0, abs=0.01)  # type: ignore [union-attr]
+    assert json.loads(data.values.json())["1/2/4"]["value"] == "13:30:00"
+
+
+def test_get_values() -> None:
+    """All values, one or an error."""
+    data = status()
+    ga_table = compile_mapping(MAPPING)
+    data.values.update(ga_table[GroupAddress("1/2/3").raw], GroupAddress("1/2/3").raw, 21.0, IndividualAddress("1.1.1"), TIME)  # type: ignore [arg-type]
+
+    assert is_values_path("/values")
+    assert is_values_path("/values/1/2/3")
+    assert not is_values_path("/valuesx")
+
+    status_, body = get_values(data, "/values")
+    assert status_ == HTTPStatus.OK
+    assert list(json.loads(body)) == ["1/2/3"]
+    status_, body = get_values(data, "/values/1/2/3")
+    assert status_ == HTTPStatus.OK
+    assert json.loads(body)["value"] == 21.0  # noqa: PLR2004
+    assert get_values(data, "/values/1/2/4")[0] == HTTPStatus.NOT_FOUND
+    assert get_values(data, "/values/x")[0] == HTTPStatus.BAD_REQUEST
+
+    response = AsyncStatusServer(data).respond("/values/1/2/3")
+    assert response[:2] == (HTTPStatus.OK, b"application/json")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test the compiled ga mapping."""
+
+import datetime as dt
+
+import pytest
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram, TelegramDirection
+from xknx.telegram.apci import GroupValueWrite
+
+from logger import orm
+from logger.mapping import GA_COUNT, compile_mapping
+from logger.runner import get_rx_cb
+
+MAPPING = {
+    "1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"},
+    "0/0/1": {"dtype": "DPST-1-1", "name": "Switch"},
+    "31/7/255": {"dtype": "DPST-10-1", "name": "Time"},
+    "1/2/4": {"dtype": "DPST-20-60102", "name": "HVAC status"},
+}
+
+
+def test_compile() -> None:
+    """Every mapped ga gets its entry at the raw address."""
+    table = compile_mapping(MAPPING)
+    assert len(table) == GA_COUNT
+    assert sum(entry is not None for entry in table) == len(MAPPING)
+
+    entry = table[GroupAddress("1/2/3").raw]
+    assert entry is not None
+    assert entry.address == "1/2/3"
+    assert entry.name == "Temperature"
+    assert entry.unit == "°C"
+    assert entry.orm_class is orm.Temperature
+    assert entry.decode((0x0C, 0x1A)) == pytest.approx(21.0)
+
+
+def test_decoders() -> None:
+    """Binary, time and status values are translated for storage."""
+    table = compile_mapping(MAPPING)
+
+    switch = table[GroupAddress("0/0/1").raw]
+    assert switch is not None
+    assert switch.unit == ""
+    assert switch.decode(1) == 1
+
+    time = table[GroupAddress("31/7/255").raw]
+    assert time is not None
+    assert time.decode((0b00101101, 30, 59)) == dt.time(hour=13, minute=30, second=59)
+
+    hvac_status = table[GroupAddress("1/2/4").raw]
+    assert hvac_status is not None
+    assert hvac_status.decode((0b10100100,)) == 0
+
+
+def test_unknown_dtype() -> None:
+    """Uncovered dtypes are rejected at compile time."""
+    with pytest.raises(ValueError, match="DPST-0-0"):
+        compile_mapping({"1/2/3": {"dtype": "DPST-0-0", "name": "Unknown"}})
+
+
+@pytest.mark.asyncio
+async def test_unmapped_ga() -> None:
+    """Telegrams to unmapped gas are dropped."""
+    rx_cb = await get_rx_cb(compile_mapping(MAPPING), None, None)
+    tele = Telegram(
+        direction=TelegramDirection.INCOMING,
+        source_address=IndividualAddress("1.1.1"),
+        destination_address=GroupAddress("1/2/4"),
+        payload=GroupValueWrite(value=DPTArray((0x0C, 0x1A))),
+    )
+    assert not await rx_cb(tele)
+
+    tele.payload = GroupValueWrite(value=DPTBinary(1))
+    tele.destination_address = GroupAddress("1/2/3")
+    assert not await rx_cb(tele)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test the metrics of the status server."""
+
+import urllib.request
+from http.server import HTTPServer
+from threading import Thread
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram.apci import GroupValueRead
+
+from logger.metrics import Histogram, Metrics, escape
+from logger.runner import get_rx_cb
+from logger.statusserver import get_server
+from logger.util import session_scope
+from logger.writer import BatchWriter, session_pool
+from test.helpers import MAPPING, status, telegram
+
+
+def test_histogram() -> None:
+    """Buckets are rendered cumulative, values above all bounds only count for +Inf."""
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.render("latency") == [
+        'latency_bucket{le="0.1"} 2',
+        'latency_bucket{le="1.0"} 3',
+        'latency_bucket{le="+Inf"} 4',
+        "latency_sum 2.65",
+        "latency_count 4",
+    ]
+
+
+def test_render() -> None:
+    """Every metric gets its help and type."""
+    metrics = Metrics()
+    metrics.received = 3
+    metrics.decoded["DPST-9-1"] = 2
+    metrics.failed['un"mapped'] = 1
+    metrics.gauges["queue_depth"] = 5
+    text = metrics.render()
+    assert "# TYPE knx_logger_telegrams_received_total counter\nknx_logger_telegrams_received_total 3\n" in text
+    assert 'knx_logger_telegrams_decoded_total{dtype="DPST-9-1"} 2\n' in text
+    assert 'knx_logger_failures_total{reason="un\\"mapped"} 1\n' in text
+    assert "# TYPE knx_logger_decode_seconds histogram\n" in text
+    assert "# TYPE knx_logger_queue_depth gauge\nknx_logger_queue_depth 5\n" in text
+    assert escape('a"b\\') == 'a\\"b\\\\'
+
+
+@pytest.mark.asyncio
+async def test_rx_cb() -> None:
+    """The receive callback and the writer count every telegram."""
+    data = status()
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session, status=data)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, session, data, writer)
+        await rx_cb(telegram("1/2/3", DPTArray((0x0C, 0x1A))))
+        await rx_cb(telegram("1/2/3", DPTArray((0x0C, 0x1A))))
+        await rx_cb(telegram("1/2/5", DPTBinary(1)))
+        await rx_cb(telegram("1/2/5", GroupValueRead()))
+        await rx_cb(telegram("1/2/6", DPTBinary(1)))
+        await writer.close()
+
+    metrics = data.metrics
+    assert metrics.received == 5  # noqa: PLR2004
+    assert metrics.ignored == 1
+    assert metrics.decoded == {"DPST-9-1": 2, "DPST-1-1": 1}
+    assert metrics.filtered == 1
+    assert metrics.failed == {"unmapped": 1}
+    assert metrics.written == 2  # noqa: PLR2004
+    assert metrics.decode_latency.count == 3  # noqa: PLR2004
+    assert metrics.commit_latency.count == 1
+    assert metrics.gauges["queue_depth"] == 0
+
+
+def test_session_pool() -> None:
+    """Only sessions bound to an engine report its pool."""
+    engine = create_engine("sqlite://")
+    with Session(engine) as session:
+        assert session_pool(session) is engine.pool
+    with engine.connect() as connection, Session(connection) as session:
+        assert session_pool(session) is None
+    engine.dispose()
+
+
+def test_endpoint() -> None:
+    """The metrics are served at /metrics, the status elsewhere."""
+    data = status()
+    data.metrics.received = 7
+    httpd = HTTPServer(("127.0.0.1", 0), get_server(data))  # type: ignore [arg-type]
+    Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{httpd.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics") as response:  # noqa: S310
+            assert response.headers["Content-type"].startswith("text/plain")
+            assert "knx_logger_telegrams_received_total 7" in response.read().decode()
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-type"] == "application/json"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -11,12 +11,13 @@ from typing import Any
 import pytest
 from sqlalchemy import select
 from xknx.dpt import DPTArray, DPTBinary
-from xknx.telegram import Telegram, TelegramDirection
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram, TelegramDirection
 from xknx.telegram.apci import GroupValueWrite
 
-from logger import orm
+from logger import orm, orm_unified
 from logger.codegen.gen_orm import DTYPE_DOC_SEPERATION
 from logger.dtype_matcher import DTYPE2XKNX
+from logger.mapping import compile_mapping
 from logger.orm import KNXMixin
 from logger.runner import get_rx_cb
 from logger.util import is_binary, session_scope
@@ -140,7 +141,7 @@ def src() -> str:
 @pytest.fixture
 def dst() -> str:
     """Get a random KNX GA."""
-    return f"{random.randrange(0, 256)}/{random.randrange(0, 256)}/{random.randrange(0, 256)}"
+    return f"{random.randrange(0, 32)}/{random.randrange(0, 8)}/{random.randrange(0, 256)}"
 
 
 @pytest.mark.asyncio
@@ -162,8 +163,8 @@ async def test_orm_x(
     addr = "sqlite://"
     tele = Telegram(
         direction=TelegramDirection.INCOMING,
-        source_address=src,
-        destination_address=dst,
+        source_address=IndividualAddress(src),
+        destination_address=GroupAddress(dst),
         payload=payload,
     )
 
@@ -191,5 +192,40 @@ async def test_orm_x(
         assert item_from_db.dst == dst
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dtype", DTYPE2XKNX.keys())
+async def test_unified_x(
+    dtype: str,
+    name: str,
+    payload: GroupValueWrite,
+    src: Any,
+    dst: Any,
+) -> None:
+    """Test if a xknx message is correctly stored into the unified table."""
+    dtype_id, value_column = orm_unified.DTYPES[dtype]
+    mapping = compile_mapping({dst: {"dtype": dtype, "name": name}}, schema="unified")
+    tele = Telegram(
+        direction=TelegramDirection.INCOMING,
+        source_address=IndividualAddress(src),
+        destination_address=GroupAddress(dst),
+        payload=payload,
+    )
+
+    with session_scope("sqlite://", schema="unified") as session:
+        rx_cb = await get_rx_cb(mapping=mapping, db_session=session, status=None)
+        assert await rx_cb(tele)
+
+        item_from_db = session.execute(select(orm_unified.Telegram)).scalar_one()
+        assert item_from_db.dtype_id == dtype_id
+        assert item_from_db.name == name
+        assert item_from_db.src == src
+        assert item_from_db.dst == dst
+
+        # Only the value column of the dtype is used (random floats may be NaN, i.e. NULL)
+        values = {column.name: getattr(item_from_db, column.name) for column in orm_unified.Telegram.__table__.columns if column.name.startswith("value_")}
+        values.pop(value_column)
+        assert set(values.values()) == {None}
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Test the monthly partitions of the logging tables."""
+
+import datetime as dt
+from pathlib import Path
+from types import ModuleType
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateTable
+
+from logger import orm
+from logger.codegen.gen_orm import ORMGenerator, SchemaOptions, UnifiedORMGenerator
+from logger.export import query_rows, resolve
+from logger.mapping import compile_mapping
+from logger.partition import MAX_ATTACHED, create_partitions, drop_partitions, ensure_partitions, month_start, next_month, partitioned_tables, sqlite_path
+from logger.rollup import backfill, rollup_tables
+from logger.util import session_scope
+from logger.writer import insert_rows
+
+MAPPING = {"1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"}}
+JANUARY = dt.datetime(2024, 1, 1)
+FEBRUARY = dt.datetime(2024, 2, 1)
+
+
+def generate(generator: type[ORMGenerator | UnifiedORMGenerator]) -> ModuleType:
+    """Generate a partitioned schema and load it as module."""
+    module = ModuleType(f"orm_partitioned_{generator.__name__}")
+    source = generator.get_source(SchemaOptions(partition_by_month=True))
+    exec(compile(source, module.__name__, "exec"), module.__dict__)  # noqa: S102
+    return module
+
+
+def rows(module: ModuleType, times: list[dt.datetime]) -> list:
+    """Get temperature rows at the given times."""
+    entry = compile_mapping(MAPPING, schema=module)[0x0A03]
+    assert entry is not None
+    return [(entry.table, {**entry.columns, "time": time, "src": "1.1.1", entry.value_column: 21.5}) for time in times]
+
+
+def test_months() -> None:
+    """Months start on the first and roll over the year."""
+    assert month_start(dt.datetime(2024, 1, 31, 23, 59)) == JANUARY
+    assert next_month(JANUARY) == FEBRUARY
+    assert next_month(dt.datetime(2024, 12, 1)) == dt.datetime(2025, 1, 1)
+    assert sqlite_path("/data/knx.db", JANUARY) == "/data/knx_2024_01.db"
+    assert sqlite_path(None, JANUARY) == ":memory:"
+
+
+@pytest.mark.parametrize(("generator", "table_name"), [(ORMGenerator, "temperature"), (UnifiedORMGenerator, "telegram")])
+def test_postgres_ddl(generator: type[ORMGenerator | UnifiedORMGenerator], table_name: str) -> None:
+    """Postgres gets range partitions by time, with time in the primary key."""
+    module = generate(generator)
+    table = module.Base.metadata.tables[table_name]
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (time)" in ddl
+    assert "PRIMARY KEY (id_, time)" in ddl
+    assert "GENERATED BY DEFAULT AS IDENTITY" in ddl
+
+    session = MagicMock()
+    session.get_bind.return_value.dialect = make_url("postgresql+psycopg2://user@host/db").get_dialect()()
+    names = create_partitions(session, module.Base.metadata, JANUARY)
+    assert f"{table_name}_2024_01" in names
+    statements = [str(call.args[0]) for call in session.execute.call_args_list]
+    assert f"CREATE TABLE IF NOT EXISTS {table_name}_2024_01 PARTITION OF {table_name} FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-02-01 00:00:00')" in statements
+
+    session.reset_mock()
+    drop_partitions(session, module.Base.metadata, JANUARY)
+    assert f"DROP TABLE IF EXISTS {table_name}_2024_01" in [str(call.args[0]) for call in session.execute.call_args_list]
+
+
+@pytest.mark.parametrize("generator", [ORMGenerator, UnifiedORMGenerator])
+def test_sqlite_files(tmp_path: Path, generator: type[ORMGenerator | UnifiedORMGenerator]) -> None:
+    """Sqlite stores each month in its own file, dropped as a whole."""
+    module = generate(generator)
+    table = compile_mapping(MAPPING, schema=module)[0x0A03].table  # type: ignore [union-attr]
+    addr = f"sqlite:///{tmp_path / 'knx.db'}"
+
+    with session_scope(addr, schema=module) as session:
+        insert_rows(session, rows(module, [JANUARY, JANUARY + dt.timedelta(days=30), FEBRUARY]))
+        session.commit()
+
+        # The main database only holds the definitions
+        assert session.execute(select(func.count()).select_from(table)).scalar_one() == 0
+        for schema, expected in (("month_2024_01", 2), ("month_2024_02", 1)):
+            count = text(f"SELECT count(*) FROM {schema}.{table.name}")  # noqa: S608
+            assert session.execute(count).scalar_one() == expected
+        ids = text(f"SELECT id_ FROM month_2024_01.{table.name} ORDER BY id_")  # noqa: S608
+        assert session.execute(ids).scalars().all() == [1, 2]
+
+    assert (tmp_path / "knx_2024_01.db").exists()
+    assert (tmp_path / "knx_2024_02.db").exists()
+
+    # A new connection attaches the existing months again
+    with session_scope(addr, schema=module) as session:
+        insert_rows(session, rows(module, [FEBRUARY]))
+        session.commit()
+        count = text(f"SELECT count(*) FROM month_2024_02.{table.name}")  # noqa: S608
+        assert session.execute(count).scalar_one() == 2  # noqa: PLR2004
+
+        assert drop_partitions(session, module.Base.metadata, JANUARY) == ["month_2024_01"]
+    assert not (tmp_path / "knx_2024_01.db").exists()
+    assert (tmp_path / "knx_2024_02.db").exists()
+
+
+def test_many_months(tmp_path: Path) -> None:
+    """A connection keeps at most `MAX_ATTACHED` months, they are read month by month."""
+    module = generate(ORMGenerator)
+    metadata = module.Base.metadata
+    addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    months = [JANUARY]
+    while len(months) < MAX_ATTACHED + 2:
+        months.append(next_month(months[-1]))
+
+    with session_scope(addr, schema=module) as session:
+        for month in months:
+            insert_rows(session, rows(module, [month, month + dt.timedelta(days=1)]))
+            session.commit()
+        attached = [row[1] for row in session.connection().exec_driver_sql("PRAGMA database_list") if row[1].startswith("month_")]
+        assert len(attached) == MAX_ATTACHED
+        assert "month_2024_10" in attached
+
+    entries = resolve(compile_mapping(MAPPING, schema=module), [])
+    with session_scope(addr, schema=module) as session:
+        exported = list(query_rows(session, entries, FEBRUARY, months[-1], chunk_size=3))
+        assert len(exported) == 2 * (len(months) - 2)
+        assert [row.time for row in exported] == sorted(row.time for row in exported)
+
+        rollup_tables(metadata)
+        assert backfill(session, metadata) == 2 * len(months)
+        session.commit()
+        hour = metadata.tables["rollup_hour"]
+        assert session.execute(select(func.sum(hour.c.value_count))).scalar_one() == 2 * len(months)
+
+
+def test_ensure_partitions(tmp_path: Path) -> None:
+    """The current and the next month are created ahead."""
+    module = generate(ORMGenerator)
+    with session_scope(f"sqlite:///{tmp_path / 'knx.db'}", schema=module) as session:
+        assert ensure_partitions(session, module.Base.metadata, dt.datetime(2024, 12, 24)) == ["month_2024_12", "month_2025_01"]
+    assert (tmp_path / "knx_2025_01.db").exists()
+
+
+def test_not_partitioned() -> None:
+    """The default schemas aren't partitioned."""
+    with session_scope("sqlite://") as session:
+        assert partitioned_tables(orm.Base.metadata) == []
+        assert ensure_partitions(session, orm.Base.metadata) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Test the parallel replay of capture files."""
+
+import datetime as dt
+from collections import Counter
+from pathlib import Path
+from types import ModuleType
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram
+from xknx.telegram.apci import GroupValueRead, GroupValueWrite
+
+from logger import orm
+from logger.capture import CaptureFile, CaptureWriter, capture_files
+from logger.codegen.gen_orm import ORMGenerator, SchemaOptions
+from logger.mapping import compile_mapping
+from logger.replay import capture_months, decode_records, prepare, replay, replay_file
+from logger.util import session_scope
+
+# 2024-01-02 03:00:00 UTC
+TIMESTAMP = 1_704_164_400_000_000
+SECOND = 1_000_000
+HOUR = 3600 * SECOND
+
+MAPPING = {
+    "1/2/3": {"dtype": "DPST-9-1", "name": "Temperature", "on_change": True},
+    "1/2/4": {"dtype": "DPST-1-1", "name": "Switch"},
+}
+
+
+def capture(directory: Path) -> None:
+    """Capture two hours of telegrams."""
+    writer = CaptureWriter(directory)
+    src = IndividualAddress("1.1.1")
+    for hour in range(2):
+        start = TIMESTAMP + hour * HOUR
+        payloads = [
+            ("1/2/3", GroupValueWrite(DPTArray((0x0C, 0x1A)))),
+            ("1/2/3", GroupValueWrite(DPTArray((0x0C, 0x1A)))),  # Unchanged, filtered
+            ("1/2/3", GroupValueWrite(DPTArray((0x0C, 0x1B)))),
+            ("1/2/4", GroupValueWrite(DPTBinary(1))),
+            ("1/2/4", GroupValueRead()),  # Ignored
+            ("1/2/5", GroupValueWrite(DPTBinary(1))),  # Unmapped
+        ]
+        for idx, (dst, payload) in enumerate(payloads):
+            writer.append(Telegram(destination_address=GroupAddress(dst), source_address=src, payload=payload), start + idx * SECOND)
+    writer.close()
+
+
+def test_decode_records(tmp_path: Path) -> None:
+    """Records are decoded like received telegrams."""
+    capture(tmp_path)
+    ga_table = compile_mapping(MAPPING)
+    stats: Counter = Counter()
+    with CaptureFile(next(tmp_path.iterdir())) as records:
+        rows = list(decode_records(records, ga_table, stats))
+    assert stats == {"rows": 3, "filtered": 1, "ignored": 1, "unmapped": 1}
+    table, values = rows[0]
+    assert table is orm.Temperature.__table__
+    assert values["dst"] == "1/2/3"
+    assert values["src"] == "1.1.1"
+    assert values["value"] == pytest.approx(21.0, abs=0.01)
+    assert rows[2][1]["value"] == 1
+
+    stats.clear()
+    list(decode_records(CaptureFile(next(tmp_path.iterdir())), compile_mapping(MAPPING), stats, filters=False))
+    assert stats["rows"] == 4  # noqa: PLR2004
+
+
+def test_replay(tmp_path: Path) -> None:
+    """All files are loaded by the workers."""
+    capture(tmp_path / "captures")
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    stats = replay([tmp_path / "captures"], db_addr, MAPPING, workers=2, chunk_size=2)
+    assert stats["files"] == 2  # noqa: PLR2004
+    assert stats["rows"] == 6  # noqa: PLR2004
+    assert not stats["failed_files"]
+
+    with session_scope(db_addr) as session:
+        temperatures: list[dt.datetime] = list(session.execute(select(orm.Temperature.time).order_by(orm.Temperature.time)).scalars())
+        switches: list[int] = list(session.execute(select(orm.Switch.value)).scalars())
+    assert [time.hour for time in temperatures] == [3, 3, 4, 4]
+    assert switches == [1, 1]
+
+
+def test_replay_twice(tmp_path: Path) -> None:
+    """Replaying again duplicates the rows, unless they are replaced."""
+    capture(tmp_path / "captures")
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+
+    def counts() -> tuple[int, int]:
+        with session_scope(db_addr) as session:
+            return tuple(session.execute(select(func.count()).select_from(table)).scalar_one() for table in (orm.Temperature, orm.Switch))  # type: ignore [return-value]
+
+    replay([tmp_path / "captures"], db_addr, MAPPING, workers=2)
+    assert counts() == (4, 2)
+    stats = replay([tmp_path / "captures"], db_addr, MAPPING, workers=2, chunk_size=2, replace=True)
+    assert stats["replaced"] == 6  # noqa: PLR2004
+    assert counts() == (4, 2)
+    replay([tmp_path / "captures"], db_addr, MAPPING, workers=2)
+    assert counts() == (8, 4)
+
+
+def test_prepare(tmp_path: Path) -> None:
+    """Group addresses and the partitions of the captured months exist ahead of the workers."""
+    capture(tmp_path / "captures")
+    files = capture_files(tmp_path / "captures")
+    assert capture_months(files) == [dt.datetime(2024, 1, 1)]
+
+    module = ModuleType("orm_replay")
+    exec(compile(ORMGenerator.get_source(SchemaOptions(name_table=True, partition_by_month=True)), module.__name__, "exec"), module.__dict__)  # noqa: S102
+    metadata = module.Base.metadata
+    ga_table = compile_mapping(MAPPING, schema=module)
+
+    # Postgres needs the partitions of the past months
+    postgres = MagicMock()
+    postgres.get_bind.return_value.dialect = make_url("postgresql+psycopg2://user@host/db").get_dialect()()
+    postgres.execute.return_value = []
+    prepare(postgres, metadata, ga_table, capture_months(files))
+    statements = [str(call.args[0]) for call in postgres.execute.call_args_list]
+    assert any(statement.startswith("CREATE TABLE IF NOT EXISTS temperature_2024_01 PARTITION OF temperature") for statement in statements)
+
+    db_addr = f"sqlite:///{tmp_path / 'knx.db'}"
+    with session_scope(db_addr, schema=module) as session:
+        prepare(session, metadata, ga_table, capture_months(files))
+    for path in files:
+        replay_file(path, db_addr, MAPPING, module)
+
+    assert (tmp_path / "knx_2024_01.db").exists()
+    with session_scope(db_addr, schema=module) as session:
+        assert session.execute(select(module.GroupAddress.address).order_by(module.GroupAddress.address)).scalars().all() == ["1/2/3", "1/2/4"]
+        session.connection().exec_driver_sql("ATTACH DATABASE ? AS month_2024_01", (str(tmp_path / "knx_2024_01.db"),))
+        assert session.connection().exec_driver_sql("SELECT count(*) FROM month_2024_01.temperature").scalar_one() == 4  # noqa: PLR2004
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
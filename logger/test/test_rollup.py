@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test the incremental rollups."""
+
+import datetime as dt
+from types import ModuleType
+
+import pytest
+from sqlalchemy import select
+from xknx.telegram import IndividualAddress
+
+from logger.codegen.gen_orm import ORMGenerator, SchemaOptions, UnifiedORMGenerator
+from logger.mapping import compile_mapping
+from logger.rollup import aggregate, backfill, is_numeric, rollup_tables, row_value
+from logger.util import session_scope
+from logger.writer import BatchWriter, Row, insert_rows
+
+MAPPING = {
+    "1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"},
+    "1/2/4": {"dtype": "DPST-1-1", "name": "Switch"},
+    "1/2/5": {"dtype": "DPST-10-1", "name": "Time"},
+    "1/2/6": {"dtype": "DPST-17-1", "name": "Scene"},
+    "1/2/7": {"dtype": "DPST-20-102", "name": "HVAC mode"},
+}
+START = dt.datetime(2024, 1, 1, 12, 0, 0)
+
+
+def generate(generator: type[ORMGenerator | UnifiedORMGenerator]) -> ModuleType:
+    """Generate a schema with rollups and load it as module."""
+    module = ModuleType(f"orm_rollup_{generator.__name__}")
+    exec(compile(generator.get_source(SchemaOptions()), module.__name__, "exec"), module.__dict__)  # noqa: S102
+    rollup_tables(module.Base.metadata)
+    return module
+
+
+def get_rows(module: ModuleType) -> list[Row]:
+    """Get rows of two minutes, one value per 20 seconds."""
+    ga_table = compile_mapping(MAPPING, schema=module)
+    temperature, switch, time, scene, mode = (ga_table[raw] for raw in range(0x0A03, 0x0A08))
+    assert temperature is not None
+    assert switch is not None
+    assert time is not None
+    assert scene is not None
+    assert mode is not None
+
+    rows = []
+    for idx, value in enumerate((20.0, 21.0, 24.0, 19.0, 20.0, 20.0)):
+        at = START + dt.timedelta(seconds=20 * idx)
+        rows.append(temperature.row(value, IndividualAddress("1.1.1"), at))
+        rows.append(switch.row(idx % 2, IndividualAddress("1.1.1"), at))
+        rows.append(time.row(dt.time(12), IndividualAddress("1.1.1"), at))
+        rows.append(scene.row(idx, IndividualAddress("1.1.1"), at))
+        rows.append(mode.row(idx % 3, IndividualAddress("1.1.1"), at))
+    return rows
+
+
+def rollups(session: object, module: ModuleType, resolution: str) -> dict:
+    """Get the rollups of a resolution by group address and bucket."""
+    table = rollup_tables(module.Base.metadata)[resolution]
+    result = session.execute(select(table).order_by(table.c.dst, table.c.bucket))  # type: ignore [attr-defined]
+    return {(row.dst, row.bucket): (row.value_count, row.value_min, row.value_max, row.value_avg) for row in result}
+
+
+# Switches, times, scenes and enums aren't rolled up
+EXPECTED_MINUTE = {
+    ("1/2/3", START): (3, 20.0, 24.0, pytest.approx(65 / 3)),
+    ("1/2/3", START + dt.timedelta(minutes=1)): (3, 19.0, 20.0, pytest.approx(59 / 3)),
+}
+EXPECTED_HOUR = {
+    ("1/2/3", START): (6, 19.0, 24.0, pytest.approx(124 / 6)),
+}
+
+
+def test_row_value() -> None:
+    """Only numeric values are rolled up."""
+    assert row_value({"value": 1.5}) == 1.5  # noqa: PLR2004
+    assert row_value({"value_int": None, "value_float": 2.5}) == 2.5  # noqa: PLR2004
+    assert row_value({"value": dt.time(12)}) is None
+    assert row_value({"value": True}) is None
+    assert row_value({"value": float("nan")}) is None
+
+
+def test_is_numeric() -> None:
+    """Quantities are rolled up, identifiers and enums aren't."""
+    assert all(is_numeric(dtype) for dtype in ("DPST-9-1", "DPST-14-56", "DPST-5-1", "DPST-12-1", "DPST-13-10"))
+    assert not any(is_numeric(dtype) for dtype in ("DPST-1-1", "DPST-5-6", "DPST-17-1", "DPST-20-102", "DPST-232-600"))
+
+
+def test_aggregate() -> None:
+    """Samples are aggregated per group address and bucket."""
+    samples = [("1/2/3", START, 1.0), ("1/2/3", START + dt.timedelta(seconds=59), 3.0), ("1/2/3", START + dt.timedelta(minutes=1), 5.0)]
+    minutes = aggregate(samples, "minute")
+    assert len(minutes) == 2  # noqa: PLR2004
+    assert minutes["1/2/3", START].value_sum == 4.0  # noqa: PLR2004
+    assert len(aggregate(samples, "hour")) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("generator", [ORMGenerator, UnifiedORMGenerator])
+async def test_incremental(generator: type[ORMGenerator | UnifiedORMGenerator]) -> None:
+    """Batches are merged into the rollups as they are flushed."""
+    module = generate(generator)
+    with session_scope("sqlite://", schema=module) as session:
+        writer = BatchWriter(session, batch_size=4, max_age=60, rollups=True)
+        writer.start()
+        for row in get_rows(module):
+            await writer.put(row)
+        await writer.close()
+
+        assert rollups(session, module, "minute") == EXPECTED_MINUTE
+        assert rollups(session, module, "hour") == EXPECTED_HOUR
+
+
+@pytest.mark.parametrize("generator", [ORMGenerator, UnifiedORMGenerator])
+def test_backfill(generator: type[ORMGenerator | UnifiedORMGenerator]) -> None:
+    """Rollups are computed from the history, repeatedly."""
+    module = generate(generator)
+    with session_scope("sqlite://", schema=module) as session:
+        insert_rows(session, get_rows(module))
+        assert backfill(session, module.Base.metadata) == 6  # noqa: PLR2004
+        assert backfill(session, module.Base.metadata) == 6  # noqa: PLR2004
+        assert rollups(session, module, "minute") == EXPECTED_MINUTE
+        assert rollups(session, module, "hour") == EXPECTED_HOUR
+
+        # Later hours only
+        assert backfill(session, module.Base.metadata, since=START + dt.timedelta(hours=1)) == 0
+        assert rollups(session, module, "hour") == EXPECTED_HOUR
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
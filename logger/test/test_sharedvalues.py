@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Test the last values in shared memory."""
+
+import datetime as dt
+import struct
+from pathlib import Path
+from typing import Any
+
+import pytest
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram
+from xknx.telegram.apci import GroupValueWrite
+
+from logger.runner import get_rx_cb
+from logger.sharedvalues import HEADER, KIND_FLOAT, SEQUENCE, SIZE, SharedValues, SharedValuesReader, decode, encode, slot_offset
+from logger.util import session_scope
+from logger.writer import BatchWriter
+
+TIME = dt.datetime(2024, 1, 2, 3, 4, 5, 678901)
+SRC = IndividualAddress("1.1.1")
+MAPPING = {
+    "1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"},
+    "1/2/4": {"dtype": "DPST-1-1", "name": "Switch"},
+    "1/2/5": {"dtype": "DPST-10-1", "name": "Time"},
+}
+
+
+@pytest.mark.parametrize("value", [21.5, -3, 2**40, 2**63 - 1, -(2**63), True, False, float("inf")])
+def test_encode(value: float | bool) -> None:  # noqa: FBT001
+    """Values survive encoding with their type."""
+    encoded = encode(value)
+    assert encoded is not None
+    decoded = decode(*encoded)
+    assert decoded == value
+    assert type(decoded) is type(value)
+    assert encode("text") is None
+
+
+@pytest.mark.parametrize("value", [2**63, -(2**63) - 1, 2**64])
+def test_encode_out_of_range(tmp_path: Path, value: int) -> None:
+    """Ints beyond int64 aren't shared, the slot keeps the previous value."""
+    assert encode(value) is None
+    shared = SharedValues(tmp_path / "values")
+    assert shared.update(5, 1.0, SRC, TIME)
+    assert not shared.update(5, value, SRC, TIME)
+    shared.close()
+    with SharedValuesReader(tmp_path / "values") as reader:
+        assert reader.get(5).value == 1.0  # type: ignore [union-attr]
+
+
+class BrokenSharedValues(SharedValues):
+    """Shared values failing to pack any value."""
+
+    def update(self, *_args: Any) -> bool:
+        """Fail like a value out of range of its field."""
+        error_msg = "argument out of range"
+        raise struct.error(error_msg)
+
+
+@pytest.mark.asyncio
+async def test_rx_cb_unshared(tmp_path: Path) -> None:
+    """A value that can't be shared is still stored."""
+    shared = BrokenSharedValues(tmp_path / "values")
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, session, None, writer, shared)
+        telegram = Telegram(destination_address=GroupAddress("1/2/3"), source_address=SRC, payload=GroupValueWrite(DPTArray((0x0C, 0x1A))))
+        assert await rx_cb(telegram)
+        await writer.close()
+        assert writer.rows_written == 1
+    shared.close()
+
+
+def test_roundtrip(tmp_path: Path) -> None:
+    """A reader sees the values of the writer, of the same file."""
+    path = tmp_path / "values"
+    shared = SharedValues(path)
+    assert path.stat().st_size == SIZE
+    with SharedValuesReader(path) as reader:
+        assert reader.get("1/2/3") is None
+        assert shared.update(GroupAddress("1/2/3").raw, 21.5, SRC, TIME)
+        assert not shared.update(GroupAddress("1/2/4").raw, dt.time(13, 30), SRC, TIME)
+
+        value = reader.get("1/2/3")
+        assert value is not None
+        assert (value.value, value.time, value.src, value.sequence) == (21.5, TIME, SRC, 2)
+        assert reader.get("1/2/4") is None
+
+        shared.update(GroupAddress("1/2/3").raw, 22.0, SRC, TIME)
+        assert reader.get("1/2/3").sequence == 4  # type: ignore [union-attr]  # noqa: PLR2004
+    shared.close()
+
+    # A restarted writer clears the values
+    SharedValues(path).close()
+    with SharedValuesReader(path) as reader:
+        assert reader.get("1/2/3") is None
+
+
+def test_torn_write(tmp_path: Path) -> None:
+    """A slot with an odd sequence isn't read."""
+    path = tmp_path / "values"
+    shared = SharedValues(path)
+    shared.update(5, 1.0, SRC, TIME)
+    shared.close()
+    with path.open("r+b") as file_:
+        file_.seek(slot_offset(5))
+        file_.write(SEQUENCE.pack(3))
+    with SharedValuesReader(path) as reader, pytest.raises(TimeoutError):
+        reader.read(5)
+
+
+def test_invalid_file(tmp_path: Path) -> None:
+    """Other files are refused."""
+    path = tmp_path / "values"
+    path.write_bytes(bytes(HEADER.size))
+    with pytest.raises(ValueError, match="isn't a file of shared values"):
+        SharedValuesReader(path)
+
+
+@pytest.mark.asyncio
+async def test_rx_cb(tmp_path: Path) -> None:
+    """The receive callback publishes the numeric values."""
+    shared = SharedValues(tmp_path / "values")
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, session, None, writer, shared)
+        source = IndividualAddress("1.1.7")
+        for dst, payload in (("1/2/3", DPTArray((0x0C, 0x1A))), ("1/2/4", DPTBinary(1)), ("1/2/5", DPTArray((0x2D, 0x1E, 0x00)))):
+            assert await rx_cb(Telegram(destination_address=GroupAddress(dst), source_address=source, payload=GroupValueWrite(payload)))
+        await writer.close()
+    shared.close()
+
+    with SharedValuesReader(tmp_path / "values") as reader:
+        temperature = reader.get("1/2/3")
+        assert temperature is not None
+        assert temperature.value == pytest.approx(21.0, abs=0.01)
+        assert temperature.src == source
+        assert reader.read(GroupAddress("1/2/3").raw)[1] == KIND_FLOAT  # type: ignore [index]
+        assert reader.get("1/2/4").value == 1  # type: ignore [union-attr]
+        assert reader.get("1/2/5") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
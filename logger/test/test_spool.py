@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Test the durable spool of the writers."""
+
+import asyncio
+import datetime as dt
+import queue
+from collections.abc import Sequence
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from logger import orm
+from logger.spool import HEADER, Spool, decode, encode
+from logger.statusserver import Data
+from logger.util import session_scope
+from logger.writer import BatchWriter, Row, ThreadedBatchWriter, insert_rows
+
+TIME = dt.datetime(2024, 1, 2, 3, 4, 5, 678901)
+
+
+def temperature(idx: int) -> Row:
+    """Get a temperature row."""
+    return (orm.Temperature.__table__, {"name": "Temperature", "dst": "1/2/3", "src": "1.1.1", "time": TIME + timedelta(seconds=idx), "value": 20.0 + idx})
+
+
+def count(session: Session) -> int:
+    """Count the stored temperatures."""
+    return session.execute(select(func.count()).select_from(orm.Temperature)).scalar_one()
+
+
+def test_encode() -> None:
+    """Records are length prefixed and decode to the same row."""
+    rows = [
+        temperature(0),
+        (orm.Time.__table__, {"name": "Time", "dst": "1/2/4", "src": "1.1.1", "time": TIME, "value": dt.time(13, 30)}),
+        (orm.Date.__table__, {"name": "Date", "dst": "1/2/5", "src": "1.1.1", "time": TIME, "value": dt.date(2024, 1, 2)}),
+        (orm.Temperature.__table__, {"name": "Temperature", "dst": "1/2/3", "src": "1.1.1", "time": TIME, "value": None}),
+    ]
+    for row in rows:
+        record = encode(row)
+        (length,) = HEADER.unpack_from(record)
+        assert length == len(record) - HEADER.size
+        assert decode(record[HEADER.size :], orm.Base.metadata) == row
+
+
+def test_replay(tmp_path: Path) -> None:
+    """Spooled rows survive a restart and are replayed oldest first over several segments."""
+    spool = Spool(tmp_path, orm.Base.metadata, segment_bytes=1024)
+    for idx in range(0, 40, 10):
+        assert spool.append([temperature(idx + offset) for offset in range(10)])
+    spool.close()
+    assert len(spool.segments()) > 1
+
+    spool = Spool(tmp_path, orm.Base.metadata, segment_bytes=1024)
+    assert spool.pending
+    with session_scope("sqlite://") as session:
+        assert spool.replay(session, insert_rows, batch_size=8, max_rows=16) == 16  # noqa: PLR2004
+        assert count(session) == 16  # noqa: PLR2004
+        assert spool.pending
+
+        assert spool.replay(session, insert_rows, batch_size=8) == 24  # noqa: PLR2004
+        values: Sequence[Any] = session.execute(select(orm.Temperature.value, orm.Temperature.time).order_by(orm.Temperature.id_)).all()
+        assert values == [(20.0 + idx, TIME + timedelta(seconds=idx)) for idx in range(40)]
+
+    assert not spool.pending
+    assert spool.segments() == []
+    assert spool.rows_replayed == 40  # noqa: PLR2004
+    assert spool.replay_rate > 0
+
+
+def test_bounded(tmp_path: Path) -> None:
+    """A full spool drops further batches."""
+    spool = Spool(tmp_path, orm.Base.metadata, max_bytes=len(encode(temperature(0))) * 15)
+    assert spool.append([temperature(idx) for idx in range(10)])
+    assert not spool.append([temperature(idx) for idx in range(10)])
+    assert spool.rows_dropped == 10  # noqa: PLR2004
+    assert spool.size <= spool.max_bytes
+
+
+def test_truncated(tmp_path: Path) -> None:
+    """A torn record at the end of a segment is skipped."""
+    spool = Spool(tmp_path, orm.Base.metadata)
+    spool.append([temperature(0), temperature(1)])
+    spool.close()
+    (segment,) = spool.segments()
+    with segment.open("ab") as file_:
+        file_.write(encode(temperature(2))[:-5])
+
+    assert [row for _, row in spool.read(segment)] == [temperature(0), temperature(1)]
+
+
+class FlakyWriter(BatchWriter):
+    """Writer with a database that can be taken down."""
+
+    down = False
+
+    def write(self, session: Session, batch: list[Row]) -> None:
+        """Fail while the database is down."""
+        if self.down:
+            error_msg = "database is down"
+            raise OperationalError("INSERT", {}, ConnectionError(error_msg))  # noqa: EM101
+        super().write(session, batch)
+
+
+@pytest.mark.asyncio
+async def test_writer_fallback(tmp_path: Path) -> None:
+    """Batches failing while the database is down are spooled and replayed once it is back."""
+    status = Data(last_rx_time=dt.datetime.now(), max_delta=timedelta(minutes=5), data_dict={})
+    spool = Spool(tmp_path, orm.Base.metadata)
+    with session_scope("sqlite://") as session:
+        writer = FlakyWriter(session, batch_size=5, max_age=60, status=status, spool=spool)
+        writer.down = True
+        writer.start()
+        for idx in range(20):
+            await writer.put(temperature(idx))
+        await writer.close()
+
+        assert count(session) == 0
+        assert writer.rows_failed == 0
+        assert spool.rows_spooled == 20  # noqa: PLR2004
+        assert status.data_dict["spool_bytes"] == spool.size > 0
+
+        writer.down = False
+        writer.start()
+        for idx in range(20, 25):
+            await writer.put(temperature(idx))
+        await writer.close()
+
+        assert count(session) == 25  # noqa: PLR2004
+        assert writer.rows_written == 25  # noqa: PLR2004
+        assert status.data_dict["spool_bytes"] == 0
+        assert status.data_dict["spool_replay_rate"] > 0
+
+
+@pytest.mark.asyncio
+async def test_threaded_writer_dies(tmp_path: Path) -> None:
+    """A writer thread that can't open the database neither loses rows nor blocks the close."""
+    spool = Spool(tmp_path, orm.Base.metadata)
+    writer = ThreadedBatchWriter("sqlite:////nonexistent/dir/x.db", max_queue=5, spool=spool)
+    writer.start()
+    for idx in range(20):
+        await writer.put(temperature(idx))
+    await asyncio.wait_for(writer.close(), timeout=10)
+    assert spool.rows_spooled == 20  # noqa: PLR2004
+
+    writer = ThreadedBatchWriter("sqlite:////nonexistent/dir/x.db", max_queue=5)
+    writer.start()
+    for idx in range(5):
+        await writer.put(temperature(idx))
+    with pytest.raises(queue.Full):
+        await writer.put(temperature(5))
+    await asyncio.wait_for(writer.close(), timeout=10)
+    assert writer.rows_failed == 5  # noqa: PLR2004
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test the status servers."""
+
+import asyncio
+import json
+from datetime import datetime as dt
+from datetime import timedelta
+
+import pytest
+
+from logger.statusserver import AsyncStatusServer, Data, StatusDict
+
+
+def status() -> Data:
+    """Get a fresh status."""
+    return Data(last_rx_time=dt.now(), max_delta=timedelta(minutes=5), data_dict={"last_rx": "nothing"})
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request_line: str, headers: str = "") -> tuple[str, dict[str, str], bytes]:
+    """Send a request and read its response."""
+    writer.write(f"{request_line}\r\nHost: localhost\r\n{headers}\r\n".encode())
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    status_line, *lines = head.strip().split("\r\n")
+    response_headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines)}
+    body = await reader.readexactly(int(response_headers["content-length"])) if not request_line.startswith("HEAD") else b""
+    return status_line, response_headers, body
+
+
+def test_status_dict() -> None:
+    """Changes are counted."""
+    data = status()
+    assert isinstance(data.data_dict, StatusDict)
+    version = data.version
+    assert data.version == version
+    data.data_dict["queue_depth"] = 1
+    assert data.version != version
+    version = data.version
+    data.data_dict.update(queue_depth=2)
+    assert data.version != version
+
+
+@pytest.mark.asyncio
+async def test_keep_alive() -> None:
+    """Several requests are answered on one connection."""
+    data = status()
+    server = AsyncStatusServer(data, port=0, host="127.0.0.1")
+    await server.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        status_line, headers, body = await request(reader, writer, "GET / HTTP/1.1")
+        assert status_line == "HTTP/1.1 200 OK"
+        assert headers["content-type"] == "application/json"
+        assert headers["connection"] == "keep-alive"
+        assert json.loads(body) == {"all_good": True, "last_rx": "nothing"}
+
+        data.data_dict["last_rx"] = "something"
+        _, _, body = await request(reader, writer, "GET /status?x=1 HTTP/1.1")
+        assert json.loads(body)["last_rx"] == "something"
+
+        status_line, headers, body = await request(reader, writer, "HEAD / HTTP/1.1")
+        assert status_line == "HTTP/1.1 200 OK"
+        assert int(headers["content-length"]) > 0
+
+        data.metrics.received = 3
+        _, headers, body = await request(reader, writer, "GET /metrics HTTP/1.1")
+        assert headers["content-type"].startswith("text/plain")
+        assert b"knx_logger_telegrams_received_total 3\n" in body
+
+        status_line, _, _ = await request(reader, writer, "POST / HTTP/1.1", "Content-Length: 0\r\n")
+        assert status_line == "HTTP/1.1 405 Method Not Allowed"
+
+        _, headers, _ = await request(reader, writer, "GET / HTTP/1.1", "Connection: close\r\n")
+        assert headers["connection"] == "close"
+        assert await reader.read() == b""
+        writer.close()
+
+        # HTTP/1.0 closes unless asked to keep alive
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        _, headers, _ = await request(reader, writer, "GET / HTTP/1.0")
+        assert headers["connection"] == "close"
+        writer.close()
+    finally:
+        await server.close()
+
+
+def test_cached_status() -> None:
+    """The json is only serialised again after a change."""
+    data = status()
+    server = AsyncStatusServer(data)
+    first = server.status()
+    assert server.status() is first
+    data.data_dict["queue_depth"] = 1
+    assert server.status() is not first
+    assert json.loads(server.status())["queue_depth"] == "1"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
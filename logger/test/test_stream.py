@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Test the live stream of decoded telegrams."""
+
+import asyncio
+import json
+from datetime import datetime as dt
+
+import pytest
+from xknx.dpt import DPTArray
+from xknx.telegram import GroupAddress
+
+from logger.mapping import compile_mapping
+from logger.runner import get_rx_cb
+from logger.statusserver import AsyncStatusServer
+from logger.stream import TelegramStream
+from logger.util import session_scope
+from logger.writer import BatchWriter
+from test.helpers import MAPPING, SRC, status, telegram
+
+TIME = dt(2024, 1, 2, 3, 4, 5)
+BUFFER = 2
+OVERFLOW = 5
+
+
+async def read_chunk(reader: asyncio.StreamReader) -> bytes:
+    """Read a chunk of a chunked response."""
+    size = int(await reader.readuntil(b"\r\n"), 16)
+    chunk = await reader.readexactly(size)
+    assert await reader.readexactly(2) == b"\r\n"
+    return chunk
+
+
+async def open_stream(port: int, query: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, str, dict[str, str]]:
+    """Request the stream and read the head of the response."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /stream{query} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    status_line, *lines = head.strip().split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines)}
+    return reader, writer, status_line, headers
+
+
+def test_filters_and_drops() -> None:
+    """Subscribers only get what they want and drop what they can't keep."""
+    ga_table = compile_mapping(MAPPING)
+    temperature = ga_table[GroupAddress("1/2/3").raw]
+    clock = ga_table[GroupAddress("1/2/4").raw]
+    assert temperature is not None
+    assert clock is not None
+
+    stream = TelegramStream(max_subscribers=3)
+    everything = stream.subscribe(buffer=BUFFER)
+    by_address = stream.subscribe(addresses=frozenset({GroupAddress("1/2/4").raw}))
+    by_dtype = stream.subscribe(dtypes=frozenset({"DPST-9-1"}))
+    assert everything is not None
+    assert by_address is not None
+    assert by_dtype is not None
+    assert stream.subscribe() is None
+
+    temperatures = (20.0, 20.5, 21.0)
+    for value in temperatures:
+        stream.publish(temperature, GroupAddress("1/2/3").raw, value, SRC, TIME)
+    stream.publish(clock, GroupAddress("1/2/4").raw, "13:30:00", SRC, TIME)
+
+    assert everything.queue.qsize() == BUFFER
+    assert everything.dropped == len(temperatures) + 1 - BUFFER
+    assert stream.dropped == everything.dropped
+    assert by_address.queue.qsize() == 1
+    assert by_dtype.queue.qsize() == len(temperatures)
+    assert json.loads(by_address.queue.get_nowait()) == {
+        "time": "2024-01-02T03:04:05",
+        "src": "1.1.1",
+        "address": "1/2/4",
+        "name": "Time",
+        "dtype": "DPST-10-1",
+        "value": "13:30:00",
+        "unit": "",
+    }
+
+    stream.unsubscribe(everything)
+    assert stream.subscribe() is not None
+
+
+@pytest.mark.asyncio
+async def test_sse() -> None:
+    """Decoded telegrams are streamed as events, filtered by group address."""
+    data = status()
+    server = AsyncStatusServer(data, port=0, host="127.0.0.1")
+    await server.start()
+    try:
+        reader, writer, status_line, headers = await open_stream(server.port, "?ga=1/2/3")
+        assert status_line == "HTTP/1.1 200 OK"
+        assert headers["content-type"] == "text/event-stream"
+        assert headers["transfer-encoding"] == "chunked"
+        # Subscribed before the head is sent
+        assert len(data.stream.subscribers) == 1
+
+        with session_scope("sqlite://") as session:
+            batch_writer = BatchWriter(session)
+            batch_writer.start()
+            rx_cb = await get_rx_cb(MAPPING, session, data, batch_writer)
+            # The second temperature is filtered from the database, not from the stream
+            telegrams = [telegram("1/2/4", DPTArray((0x2D, 0x1E, 0x00))), telegram("1/2/3", DPTArray((0x0C, 0x1A))), telegram("1/2/3", DPTArray((0x0C, 0x1A)))]
+            for telegram_ in telegrams:
+                await rx_cb(telegram_)
+            await batch_writer.close()
+
+        events = b""
+        while events.count(b"\n\n") < sum(telegram_.destination_address == GroupAddress("1/2/3") for telegram_ in telegrams):
+            events += await read_chunk(reader)
+        for event in events.split(b"\n\n")[:-1]:
+            name, _, payload = event.partition(b"\n")
+            assert name == b"event: telegram"
+            assert payload.startswith(b"data: ")
+            assert json.loads(payload[6:])["address"] == "1/2/3"
+
+        writer.close()
+        await writer.wait_closed()
+        # The subscription ends with the connection
+        for _ in range(100):
+            if not data.stream.subscribers:
+                break
+            await asyncio.sleep(0.01)
+        assert not data.stream.subscribers
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_ndjson_dropped() -> None:
+    """A slow client is told how many telegrams it missed."""
+    ga_table = compile_mapping(MAPPING)
+    entry = ga_table[GroupAddress("1/2/3").raw]
+    assert entry is not None
+    data = status()
+    server = AsyncStatusServer(data, port=0, host="127.0.0.1")
+    await server.start()
+    try:
+        reader, writer, status_line, headers = await open_stream(server.port, "?format=ndjson&dtype=DPST-9-1")
+        assert status_line == "HTTP/1.1 200 OK"
+        assert headers["content-type"] == "application/x-ndjson"
+        subscriber = data.stream.subscribers[0]
+
+        # More than the buffer without giving the server a chance to send
+        for value in range(subscriber.queue.maxsize + OVERFLOW):
+            data.stream.publish(entry, GroupAddress("1/2/3").raw, value, SRC, TIME)
+        assert subscriber.dropped == OVERFLOW
+
+        lines = (await read_chunk(reader)).splitlines()
+        assert json.loads(lines[0]) == {"dropped": OVERFLOW}
+        assert [json.loads(line)["value"] for line in lines[1:]] == list(range(subscriber.queue.maxsize))
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["?format=xml", "?ga=not-an-address"])
+async def test_bad_request(query: str) -> None:
+    """Invalid formats and addresses are rejected."""
+    data = status()
+    server = AsyncStatusServer(data, port=0, host="127.0.0.1")
+    await server.start()
+    try:
+        reader, writer, status_line, headers = await open_stream(server.port, query)
+        assert status_line == "HTTP/1.1 400 Bad Request"
+        assert "error" in json.loads(await reader.readexactly(int(headers["content-length"])))
+        assert not data.stream.subscribers
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Test the database utilities."""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from logger.util import SQLITE_PRAGMAS, async_session_scope, session_scope
+
+
+def test_sqlite_profile(tmp_path: Path) -> None:
+    """Sqlite gets the write-ahead log and the tuned pragmas."""
+    db_path = tmp_path / "profile.db"
+    with session_scope(f"sqlite:///{db_path}", sqlite_profile=True) as session:
+        assert session.execute(text("PRAGMA journal_mode")).scalar_one() == "wal"
+        assert session.execute(text("PRAGMA synchronous")).scalar_one() == 1  # NORMAL
+        assert session.execute(text("PRAGMA temp_store")).scalar_one() == 2  # MEMORY  # noqa: PLR2004
+        assert session.execute(text("PRAGMA cache_size")).scalar_one() == SQLITE_PRAGMAS["cache_size"]
+        assert session.execute(text("PRAGMA wal_autocheckpoint")).scalar_one() == SQLITE_PRAGMAS["wal_autocheckpoint"]
+
+    # The log is checkpointed and truncated on exit
+    wal_path = tmp_path / "profile.db-wal"
+    assert not wal_path.exists() or wal_path.stat().st_size == 0
+
+
+def test_sqlite_profile_disabled(tmp_path: Path) -> None:
+    """Without the profile sqlite keeps its defaults."""
+    with session_scope(f"sqlite:///{tmp_path / 'default.db'}") as session:
+        assert session.execute(text("PRAGMA journal_mode")).scalar_one() == "delete"
+        assert session.execute(text("PRAGMA synchronous")).scalar_one() == 2  # FULL  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_async_sqlite_profile(tmp_path: Path) -> None:
+    """The async driver gets the same profile."""
+    pytest.importorskip("aiosqlite")
+    async with async_session_scope(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}", sqlite_profile=True) as session:
+        assert (await session.execute(text("PRAGMA journal_mode"))).scalar_one() == "wal"
+        assert (await session.execute(text("PRAGMA synchronous"))).scalar_one() == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
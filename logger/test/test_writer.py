@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Test the batched write-behind stage."""
+
+import asyncio
+import csv
+import io
+import threading
+import time
+from datetime import datetime as dt
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from xknx.dpt import DPTArray
+from xknx.telegram import GroupAddress, IndividualAddress, Telegram, TelegramDirection
+from xknx.telegram.apci import GroupValueWrite
+
+from logger import orm
+from logger.runner import get_rx_cb
+from logger.statusserver import Data
+from logger.util import async_session_scope, is_async_addr, session_scope
+from logger.writer import AsyncBatchWriter, BatchWriter, ThreadedBatchWriter, csv_field, supports_copy, to_csv, write_rows
+
+MAPPING = {"1/2/3": {"dtype": "DPST-9-1", "name": "Temperature"}}
+
+
+def temperature(value: int) -> Telegram:
+    """Get a temperature telegram."""
+    return Telegram(
+        direction=TelegramDirection.INCOMING,
+        source_address=IndividualAddress("1.1.1"),
+        destination_address=GroupAddress("1/2/3"),
+        payload=GroupValueWrite(value=DPTArray((0x0C, value))),
+    )
+
+
+def count(session: Session) -> int:
+    """Count the stored temperatures."""
+    return session.execute(select(func.count()).select_from(orm.Temperature)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_flush_by_size() -> None:
+    """A full batch is committed without waiting for the age limit."""
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session, batch_size=10, max_age=60)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, session, None, writer)
+
+        for idx in range(25):
+            assert await rx_cb(temperature(idx))
+        await asyncio.sleep(0.1)
+        assert count(session) == 20  # noqa: PLR2004
+
+        await writer.close()
+        assert count(session) == 25  # noqa: PLR2004
+        assert writer.rows_written == 25  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_flush_by_age() -> None:
+    """A partial batch is committed once it is old enough."""
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session, batch_size=500, max_age=0.05)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, session, None, writer)
+
+        assert await rx_cb(temperature(1))
+        assert count(session) == 0
+        await asyncio.sleep(0.2)
+        assert count(session) == 1
+
+        await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_status() -> None:
+    """Queue depth and flush latency are exposed."""
+    status = Data(last_rx_time=dt.now(), max_delta=timedelta(minutes=5), data_dict={})
+    with session_scope("sqlite://") as session:
+        writer = BatchWriter(session, batch_size=2, status=status)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, session, status, writer)
+
+        assert await rx_cb(temperature(1))
+        assert await rx_cb(temperature(2))
+        await writer.close()
+
+    assert status.data_dict["queue_depth"] == 0
+    assert status.data_dict["flush_latency"] > timedelta()
+
+
+class SlowWriter(ThreadedBatchWriter):
+    """Writer with a database that needs long for each commit."""
+
+    delay = 0.2
+
+    def flush(self, batch: list) -> bool:
+        """Stall, then commit."""
+        time.sleep(self.delay)
+        return super().flush(batch)
+
+
+@pytest.mark.asyncio
+async def test_slow_db_doesnt_stall_rx(tmp_path: Path) -> None:
+    """Reception latency stays flat while the database is slow."""
+    addr = f"sqlite:///{tmp_path / 'slow.db'}"
+    writer = SlowWriter(addr, batch_size=5, max_age=0.01)
+    writer.start()
+    rx_cb = await get_rx_cb(MAPPING, None, None, writer)
+
+    loop = asyncio.get_running_loop()
+    interval = 0.01
+    latencies = []
+    lags = []
+    for idx in range(50):
+        scheduled = loop.time()
+        assert await rx_cb(temperature(idx))
+        latencies.append(loop.time() - scheduled)
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - scheduled - interval)
+
+    # 50 telegrams take about 10 slow commits, none of them shows up on the loop
+    assert max(latencies) < SlowWriter.delay / 4
+    assert max(lags) < SlowWriter.delay / 4
+
+    await writer.close()
+    assert writer.rows_written == 50  # noqa: PLR2004
+    with session_scope(addr) as session:
+        assert count(session) == 50  # noqa: PLR2004
+
+
+class ThreadCheckingWriter(ThreadedBatchWriter):
+    """Writer recording the threads its status is changed from."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the writer with no threads recorded yet."""
+        super().__init__(*args, **kwargs)
+        self.threads: set[int] = set()
+
+    def _populate_status(self) -> None:
+        """Record the thread that populates the status."""
+        self._on_loop(lambda: self.threads.add(threading.get_ident()))
+        super()._populate_status()
+
+
+@pytest.mark.asyncio
+async def test_threaded_status(tmp_path: Path) -> None:
+    """The writer thread hands its status updates to the loop."""
+    status = Data(last_rx_time=dt.now(), max_delta=timedelta(minutes=5), data_dict={})
+    writer = ThreadCheckingWriter(f"sqlite:///{tmp_path / 'status.db'}", batch_size=2, max_age=0.01, status=status)
+    writer.start()
+    rx_cb = await get_rx_cb(MAPPING, None, status, writer)
+
+    for idx in range(10):
+        assert await rx_cb(temperature(idx))
+    await writer.close()
+    await asyncio.sleep(0)
+
+    assert writer.threads == {threading.get_ident()}
+    assert status.metrics.written == 10  # noqa: PLR2004
+    assert status.data_dict["queue_depth"] == 0
+
+
+@pytest.mark.parametrize(
+    ("addr", "is_async"),
+    [
+        ("sqlite://", False),
+        ("sqlite+aiosqlite://", True),
+        ("postgresql://user@host/db", False),
+        ("postgresql+asyncpg://user@host/db", True),
+    ],
+)
+def test_is_async_addr(addr: str, *, is_async: bool) -> None:
+    """The driver of the address selects the backend."""
+    assert is_async_addr(addr) == is_async
+
+
+@pytest.mark.asyncio
+async def test_async_writer(tmp_path: Path) -> None:
+    """Rows are committed through an async session."""
+    pytest.importorskip("aiosqlite")
+    db_path = tmp_path / "async.db"
+
+    async with async_session_scope(f"sqlite+aiosqlite:///{db_path}") as session:
+        writer = AsyncBatchWriter(session, batch_size=10, max_age=60)
+        writer.start()
+        rx_cb = await get_rx_cb(MAPPING, None, None, writer)
+        for idx in range(15):
+            assert await rx_cb(temperature(idx))
+        await writer.close()
+        assert writer.rows_written == 15  # noqa: PLR2004
+
+    with session_scope(f"sqlite:///{db_path}") as session:
+        assert count(session) == 15  # noqa: PLR2004
+
+
+def postgres_session(addr: str) -> MagicMock:
+    """Mock a session of a postgres database, down to the dbapi cursor."""
+    dialect = make_url(addr).get_dialect()()
+    session = MagicMock()
+    session.get_bind.return_value.dialect = dialect
+    session.connection.return_value.dialect = dialect
+    return session
+
+
+@pytest.mark.parametrize(
+    ("addr", "use_copy"),
+    [
+        ("postgresql+psycopg2://user@host/db", True),
+        ("postgresql+psycopg://user@host/db", True),
+        ("postgresql+asyncpg://user@host/db", False),
+        ("postgresql+pg8000://user@host/db", False),
+        ("sqlite://", False),
+    ],
+)
+def test_supports_copy(addr: str, *, use_copy: bool) -> None:
+    """Only postgres drivers with `COPY FROM STDIN` support are selected."""
+    assert supports_copy(make_url(addr).get_dialect()()) == use_copy
+
+
+@pytest.mark.parametrize("driver", ["psycopg2", "psycopg"])
+def test_copy_rows(driver: str) -> None:
+    """Postgres batches are streamed as csv with one `COPY` per table."""
+    session = postgres_session(f"postgresql+{driver}://user@host/db")
+    cursor = session.connection.return_value.connection.driver_connection.cursor.return_value.__enter__.return_value
+    time_ = dt(2024, 1, 2, 3, 4, 5)
+    batch = [
+        (orm.Temperature.__table__, {"name": 'Living "room"', "dst": "1/2/3", "src": "1.1.1", "time": time_, "value": 21.5}),
+        (orm.Switch.__table__, {"name": "Light", "dst": "1/2/4", "src": "1.1.1", "time": time_, "value": 1}),
+        (orm.Temperature.__table__, {"name": "", "dst": "1/2/3", "src": "1.1.1", "time": time_, "value": None}),
+    ]
+
+    write_rows(session, batch)
+
+    session.execute.assert_not_called()
+    if driver == "psycopg2":
+        calls = [(call.args[0], call.args[1].getvalue()) for call in cursor.copy_expert.call_args_list]
+    else:
+        copy = cursor.copy.return_value.__enter__.return_value
+        calls = [(call.args[0], copy.write.call_args_list[idx].args[0]) for idx, call in enumerate(cursor.copy.call_args_list)]
+
+    assert [sql for sql, _ in calls] == [
+        "COPY temperature (name, dst, src, time, value) FROM STDIN WITH (FORMAT csv)",
+        "COPY switch (name, dst, src, time, value) FROM STDIN WITH (FORMAT csv)",
+    ]
+    rows = list(csv.reader(io.StringIO(calls[0][1])))
+    assert rows == [
+        ['Living "room"', "1/2/3", "1.1.1", "2024-01-02 03:04:05", "21.5"],
+        ["", "1/2/3", "1.1.1", "2024-01-02 03:04:05", ""],
+    ]
+    # Empty strings are quoted, NULLs aren't
+    line = calls[0][1].splitlines()[1]
+    assert line.startswith('"",')
+    assert line.endswith(",")
+
+
+def test_to_csv() -> None:
+    """Only NULLs are rendered as the unquoted empty field."""
+    rows: list[dict[str, Any]] = [{"name": 'a "b", c', "value": 1.5}, {"name": "", "value": None}]
+
+    data = to_csv(rows, ["name", "value"])
+
+    assert list(csv.reader(io.StringIO(data))) == [['a "b", c', "1.5"], ["", ""]]
+    assert data.splitlines()[1] == '"",'
+    assert [csv_field(value) for value in ('a "b", c', 1.5, "", None)] == ['"a ""b"", c"', "1.5", '""', ""]
+
+
+def test_copy_fallback() -> None:
+    """Other dialects, or a disabled copy, get INSERTs."""
+    session = postgres_session("postgresql+psycopg2://user@host/db")
+    batch = [(orm.Temperature.__table__, {"name": "Temperature", "dst": "1/2/3", "src": "1.1.1", "time": dt(2024, 1, 2), "value": 21.5})]
+    write_rows(session, batch, use_copy=False)
+    session.connection.assert_not_called()
+    session.execute.assert_called_once()
+
+    with session_scope("sqlite://") as sqlite_session:
+        write_rows(sqlite_session, batch)
+        assert count(sqlite_session) == 1
+
+
+def test_invalid_batch_size() -> None:
+    """Batches need at least one row."""
+    with session_scope("sqlite://") as session, pytest.raises(ValueError, match="Batch size"):
+        BatchWriter(session, batch_size=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])